@@ -1,7 +1,16 @@
-import os, asyncio, httpx
+import os, asyncio, httpx, weakref
 SCHWAB_API=os.getenv('SCHWAB_API_URL','https://api.schwabapi.com/trader')
+SCHWAB_MAX_CONCURRENCY=int(os.getenv('SCHWAB_MAX_CONCURRENCY','8'))
 from utils import token_manager as tm
 
+_LIMITS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def limiter() -> asyncio.Semaphore:
+    """Per-event-loop cap on in-flight Schwab market-data calls (scans fan out per symbol)."""
+    loop=asyncio.get_running_loop(); sem=_LIMITS.get(loop)
+    if sem is None: sem=_LIMITS[loop]=asyncio.Semaphore(SCHWAB_MAX_CONCURRENCY)
+    return sem
+
 def _headers():
     tok=tm.get_bearer(); h={'Accept':'application/json','Content-Type':'application/json'}
     if tok: h['Authorization']=f'Bearer {tok}'
@@ -37,3 +46,14 @@ async def quote_mid(symbol: str, is_option: bool=False) -> dict:
             return {"bid": bid, "ask": ask, "mid": mid}
     else:
         return {"bid": None, "ask": None, "mid": None}
+
+async def option_chain(symbol: str, **params) -> dict | None:
+    """Full chain (all expiries, both sides) in one call; `params` pass through (contractType, strikeCount, ...)."""
+    async with limiter():
+        async with httpx.AsyncClient(timeout=15) as client:
+            try:
+                r = await client.get(f"{SCHWAB_API}/marketdata/chains", headers=_headers(),
+                                     params={'symbol': symbol.upper(), **params})
+                return r.json() if r.status_code == 200 else None
+            except Exception:
+                return None
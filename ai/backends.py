@@ -0,0 +1,118 @@
+# ai/backends.py
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# ONNX Runtime is optional; without it only the numpy backends are tried
+try:
+    import onnxruntime as ort  # type: ignore
+    from skl2onnx import convert_sklearn  # type: ignore
+    from skl2onnx.common.data_types import FloatTensorType  # type: ignore
+except Exception:  # pragma: no cover
+    ort = None  # type: ignore
+
+
+class Compiled:
+    """
+    sklearn-shaped wrapper (`predict_proba`, `predict`, `classes_`) around a faster runtime.
+    Any runtime error falls through to the original estimator for that call.
+    """
+    backend = "sklearn"
+
+    def __init__(self, original: Any):
+        self.original = original
+        self.classes_ = getattr(original, "classes_", None)
+        self.n_features_in_ = getattr(original, "n_features_in_", None)
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        try:
+            return self._proba(np.asarray(X, dtype=float))
+        except Exception:
+            return self.original.predict_proba(X)
+
+    def predict(self, X: Any) -> np.ndarray:
+        return np.asarray(self.classes_)[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class LinearProba(Compiled):
+    """Logistic models as one GEMV + sigmoid/softmax, skipping sklearn's per-call input validation."""
+    backend = "numpy-linear"
+
+    def __init__(self, original: Any):
+        super().__init__(original)
+        if type(original).__name__ != "LogisticRegression":
+            raise TypeError(f"{type(original).__name__} is not a logistic model")
+        self.W = np.ascontiguousarray(np.asarray(original.coef_, dtype=float).T)
+        self.b = np.asarray(original.intercept_, dtype=float)
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        z = X @ self.W + self.b
+        if z.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-z[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        z = np.exp(z - z.max(axis=1, keepdims=True))
+        return z / z.sum(axis=1, keepdims=True)
+
+
+class OnnxProba(Compiled):
+    """Estimator converted with skl2onnx and run in an ONNX Runtime CPU session (float32 inputs)."""
+    backend = "onnxruntime"
+
+    def __init__(self, original: Any):
+        super().__init__(original)
+        if ort is None:
+            raise RuntimeError("onnxruntime/skl2onnx not installed")
+        n = int(self.n_features_in_)
+        onx = convert_sklearn(original, initial_types=[("X", FloatTensorType([None, n]))],
+                              options={id(original): {"zipmap": False}})
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = 1              # latency, not throughput: no thread hand-off per call
+        self.sess = ort.InferenceSession(onx.SerializeToString(), opts, providers=["CPUExecutionProvider"])
+        self.input = self.sess.get_inputs()[0].name
+        self.output = self.sess.get_outputs()[-1].name   # [label, probabilities]
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        return self.sess.run([self.output], {self.input: X.astype(np.float32)})[0]
+
+
+BACKENDS = {"onnx": (OnnxProba,), "numpy": (LinearProba,), "auto": (OnnxProba, LinearProba)}
+
+
+def compile_model(model: Any, *, backend: str = "auto", probe_rows: int = 256, atol: float = 1e-4,
+                  seed: int = 0) -> Tuple[Optional[Compiled], Dict[str, Any]]:
+    """
+    First backend in `backend` order that builds and reproduces `model.predict_proba` on
+    random probe rows within `atol` (and with the same argmax). (None, info) means serve the
+    original; `info` records what was tried and why it was rejected.
+    """
+    info: Dict[str, Any] = {"backend": "sklearn", "tried": {}}
+    n = getattr(model, "n_features_in_", None)
+    if backend in ("off", "sklearn", "") or not n or not hasattr(model, "predict_proba"):
+        return None, info
+    X = np.random.default_rng(seed).normal(0.0, 3.0, size=(probe_rows, int(n)))
+    try:
+        want = np.asarray(model.predict_proba(X), dtype=float)
+    except Exception as e:
+        info["tried"]["sklearn"] = repr(e)
+        return None, info
+    for cls in BACKENDS.get(backend, ()):
+        t0 = time.perf_counter()
+        try:
+            rt = cls(model)
+            got = rt._proba(X)
+        except Exception as e:
+            info["tried"][cls.backend] = repr(e)
+            continue
+        err = float(np.max(np.abs(got - want))) if got.shape == want.shape else float("inf")
+        if err > atol or not np.array_equal(got.argmax(axis=1), want.argmax(axis=1)):
+            info["tried"][cls.backend] = f"mismatch (max abs err {err:.2e})"
+            continue
+        info.update(backend=cls.backend, compileMs=round((time.perf_counter() - t0) * 1000.0, 1), maxAbsErr=err)
+        return rt, info
+    return None, info
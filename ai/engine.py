@@ -1,20 +1,18 @@
 # ai/engine.py
 from __future__ import annotations
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence, Union
 import math
 
-# joblib is optional; we degrade gracefully if it's not available
-try:
-    import joblib  # type: ignore
-except Exception:  # pragma: no cover
-    joblib = None  # type: ignore
+from .registry import REGISTRY, ModelSlot
 
-# Optional numeric helpers
+# Optional numeric helpers (the batch path and feature schema need numpy)
 try:
     import numpy as np  # type: ignore
+    from .schema import FeatureSchema
 except Exception:       # pragma: no cover
     np = None  # type: ignore
+    FeatureSchema = None  # type: ignore
 
 # Keys we expect in `features` when using the heuristic.
 # You can tweak this list to match what your fetcher produces.
@@ -25,6 +23,9 @@ FEATURE_KEYS: List[str] = [
     "vwap", "atr",
 ]
 
+# producer key names -> FEATURE_KEYS columns, compiled once per producer layout (ai/schema.py)
+SCHEMA = FeatureSchema(FEATURE_KEYS) if FeatureSchema is not None else None
+
 class AIEngine:
     """
     Tiny decision engine wrapper.
@@ -37,12 +38,20 @@ class AIEngine:
     """
 
     def __init__(self, model_path: Optional[str] = None):
-        self.model = None
-        if model_path and joblib:
-            try:
-                self.model = joblib.load(model_path)  # expects a sklearn-like estimator
-            except Exception:
-                self.model = None  # fail open to heuristic
+        # models are shared process-wide (loaded once, hot-swappable); a failed load means heuristic
+        self._slot: Optional[ModelSlot] = REGISTRY.slot(model_path) if model_path else None
+        self._model = None
+
+    @property
+    def model(self):
+        """Explicitly assigned model, else the registry's current version for `model_path`."""
+        if self._model is not None:
+            return self._model
+        return self._slot.model if self._slot is not None else None
+
+    @model.setter
+    def model(self, value) -> None:
+        self._model = value
 
     # ---------- public API ----------
 
@@ -51,7 +60,16 @@ class AIEngine:
         """
         Decide CALL / PUT / HOLD for `symbol`, using a model if available,
         otherwise a heuristic. `features` is a dict; `spot` is the current price.
+        Canonical FEATURE_KEYS names decide exactly as the scalar path does; producer names
+        (ema9/ema20/rsi14, see ai/schema.ALIASES) are now mapped instead of ignored, so rows
+        that only carried those keys (e.g. sandbox model mode) can turn from HOLD to SINGLE.
         """
+        if np is None:  # pragma: no cover
+            return self._propose_one(features, spot)
+        return self.propose_batch([features or {}])[0]
+
+    def _propose_one(self, features: Optional[Dict[str, Any]], spot: Optional[float]) -> Dict[str, Any]:
+        """Scalar reference path (no numpy): canonical FEATURE_KEYS names only."""
         # 1) Model path
         if self.model and features:
             side, conf = self._model_decide(features)
@@ -65,10 +83,85 @@ class AIEngine:
             return {"type": "HOLD", "confidence": conf}
         return {"type": "SINGLE", "side": side, "confidence": conf}
 
+    def propose_batch(self, rows: Union[Sequence[Dict[str, Any]], Any]) -> List[Dict[str, Any]]:
+        """
+        `propose` over many rows with one `predict_proba` call. `rows` is a list of feature
+        dicts (producer names mapped through SCHEMA) or a 2-D array in FEATURE_KEYS column
+        order (NaN = missing, e.g. from `SCHEMA.compile(...).matrix`). Returns one action per
+        row in the same normalized shape.
+        """
+        if np is None:  # pragma: no cover
+            return [self._propose_one(r, None) for r in rows]
+        X, present = self._matrix(rows)
+        n = X.shape[0]
+        side = np.zeros(n, dtype=int)                 # +1 CALL, -1 PUT, 0 HOLD
+        conf = np.full(n, 0.5)
+        # like `propose`: empty/None feature dicts skip the model
+        heur = np.array([not f for f in rows], dtype=bool) if isinstance(rows, (list, tuple)) else np.zeros(n, bool)
+        if not self.model:
+            heur[:] = True
+        model_rows = np.flatnonzero(~heur)
+        if model_rows.size:
+            ms, mc, fell = self._model_decide_batch(np.where(present, X, 0.0)[model_rows])
+            side[model_rows], conf[model_rows] = ms, mc
+            heur[model_rows[fell]] = True
+        if heur.any():
+            hs, hc = self._heuristic_batch(X[heur], present[heur])
+            side[heur], conf[heur] = hs, hc
+        return [{"type": "SINGLE", "side": "CALL" if s > 0 else "PUT", "confidence": float(c)} if s
+                else {"type": "HOLD", "confidence": float(c)} for s, c in zip(side.tolist(), conf.tolist())]
+
     # ---------- model helpers ----------
 
+    def _matrix(self, rows):
+        """(values, present) in FEATURE_KEYS order; unparseable/None dict values are absent."""
+        if not isinstance(rows, (list, tuple)):
+            X = np.asarray(rows, dtype=float).reshape(-1, len(FEATURE_KEYS))
+            return X, ~np.isnan(X)
+        return SCHEMA.from_dicts(rows)
+
+    @staticmethod
+    def _call_index(model) -> int:
+        try:
+            classes = list(getattr(model, "classes_"))
+            if "CALL" in classes:
+                return classes.index("CALL")
+            if "PUT" in classes and len(classes) == 2:
+                return 1 - classes.index("PUT")
+        except Exception:
+            pass
+        return 1
+
+    def _model_decide_batch(self, X):
+        """Vectorized `_model_decide`: (side, conf, fell_back) arrays for the rows of X."""
+        model = self.model                       # one read: a hot swap can't split a call
+        n = X.shape[0]
+        side, conf, fell = np.zeros(n, dtype=int), np.full(n, 0.5), np.zeros(n, dtype=bool)
+        if hasattr(model, "predict_proba"):
+            try:
+                P = np.asarray(model.predict_proba(X), dtype=float)
+                ci = self._call_index(model)
+                call_p = P[:, ci]
+                put_p = 1.0 - call_p if P.shape[1] == 2 else (P[:, 1] if ci == 1 else 1.0 - P[:, 1])
+                conf = np.maximum(call_p, put_p)
+                side = np.where(conf < 0.55, 0, np.where(call_p >= put_p, 1, -1))
+                return side, conf, fell
+            except Exception:
+                pass
+        if hasattr(model, "predict"):
+            try:
+                labels = [str(p).upper() for p in model.predict(X)]
+                up = np.array([l in ("1", "CALL", "LONG", "BUY", "UP") for l in labels])
+                dn = np.array([l in ("0", "PUT", "SHORT", "SELL", "DOWN") for l in labels])
+                side = np.where(up, 1, np.where(dn, -1, 0))
+                conf = np.where(up | dn, 0.65, 0.5)
+                return side, conf, ~(up | dn)
+            except Exception:
+                pass
+        return side, conf, ~fell
+
     def _vectorize(self, features: Dict[str, Any]):
-        """Map dict -> 2D array in FEATURE_KEYS order for sklearn."""
+        """Map dict -> 2D array in FEATURE_KEYS order for sklearn (scalar path; batches use SCHEMA)."""
         row = [float(features.get(k, 0.0) or 0.0) for k in FEATURE_KEYS]
         if np is not None:
             return np.array([row], dtype=float)
@@ -81,18 +174,19 @@ class AIEngine:
         If only predict() is available, use a modest fixed confidence.
         """
         X = self._vectorize(features)
+        model = self.model                       # one read: a hot swap can't split a call
 
         # predict_proba preferred
-        if hasattr(self.model, "predict_proba"):
+        if hasattr(model, "predict_proba"):
             try:
-                proba = self.model.predict_proba(X)[0]
+                proba = model.predict_proba(X)[0]
                 # Try to infer class ordering if available; else assume [PUT, CALL]
                 call_idx = 1
-                if hasattr(self.model, "classes_"):
+                if hasattr(model, "classes_"):
                     # If model.classes_ look like [0,1] we keep call_idx=1.
                     # If they look like ['CALL','PUT'], pick where 'CALL' is.
                     try:
-                        classes = list(getattr(self.model, "classes_"))
+                        classes = list(getattr(model, "classes_"))
                         if "CALL" in classes:
                             call_idx = classes.index("CALL")
                         elif "PUT" in classes and len(classes) == 2:
@@ -111,9 +205,9 @@ class AIEngine:
                 pass  # fall through to predict()
 
         # plain predict fallback
-        if hasattr(self.model, "predict"):
+        if hasattr(model, "predict"):
             try:
-                pred = self.model.predict(X)[0]
+                pred = model.predict(X)[0]
                 # Map common label varieties to CALL/PUT
                 label = str(pred).upper()
                 if label in ("1", "CALL", "LONG", "BUY", "UP"):
@@ -187,6 +281,36 @@ class AIEngine:
         return side, float(conf)
 
 
+    def _heuristic_batch(self, X, present):
+        """`_heuristic_decide` over rows: same votes, counted with column masks."""
+        c = {k: X[:, j] for j, k in enumerate(FEATURE_KEYS)}
+        h = {k: present[:, j] for j, k in enumerate(FEATURE_KEYS)}
+        n = X.shape[0]
+        calls, puts, total = np.zeros(n), np.zeros(n), np.zeros(n)
+
+        def add_vote(active, cond_call, cond_put):
+            nonlocal calls, puts, total
+            total = total + active
+            calls = calls + (active & cond_call & ~cond_put)
+            puts = puts + (active & cond_put & ~cond_call)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            add_vote(h["rsi"], c["rsi"] > 55, c["rsi"] < 45)
+            add_vote(h["macd"], c["macd"] > 0, c["macd"] < 0)
+            sig_only = ~h["macd"] & h["macd_signal"]
+            add_vote(sig_only, c["macd_signal"] > 0, c["macd_signal"] < 0)
+            add_vote(h["ma_fast"] & h["ma_slow"], c["ma_fast"] > c["ma_slow"], c["ma_fast"] < c["ma_slow"])
+            add_vote(h["close"] & h["vwap"], c["close"] > c["vwap"], c["close"] < c["vwap"])
+            pc = c["prev_close"]
+            pct = (c["close"] - pc) / np.abs(np.where(pc != 0, pc, 1.0)) * 100.0
+            add_vote(h["close"] & h["prev_close"] & (pc != 0), pct > +0.30, pct < -0.30)
+
+        decided = (total > 0) & (calls != puts)
+        side = np.where(decided, np.where(calls > puts, 1, -1), 0)
+        conf = np.where(decided, np.maximum(calls, puts) / np.maximum(total, 1.0), 0.5)
+        return side, conf
+
+
 # ---------- small util ----------
 
 def _to_float(x: Any) -> Optional[float]:
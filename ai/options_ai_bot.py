@@ -1,10 +1,11 @@
 # ai/options_ai_bot.py
 from __future__ import annotations
 import os, math
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from ai import AIEngine                      # our built-in engine
 from integrations.schwab_adapter import SchwabClient, fetch_features
+from engine.options.chain import OptionChain
 
 Number = float
 
@@ -66,7 +67,20 @@ class OptionsAIBot:
             side, conf = self._engine_side(symbol, period, interval)
             if side is None:
                 return self._hold_order(symbol)
+        return self._order(symbol, side)
 
+    def propose_many(self, symbols: List[str], *, period: str = "5D", interval: str = "1m"
+                     ) -> Dict[str, Dict[str, Any]]:
+        """`propose` without a signal for several symbols; AIEngine scores all features in one batch."""
+        feats = [fetch_features(self.user_id, s, period=period, interval=interval) for s in symbols]
+        out: Dict[str, Dict[str, Any]] = {}
+        for sym, act in zip(symbols, self.engine.propose_batch(feats)):
+            out[sym] = self._order(sym, act["side"]) if act.get("type") == "SINGLE" else self._hold_order(sym)
+        return out
+
+    # ---------- internals ----------
+
+    def _order(self, symbol: str, side: str) -> Dict[str, Any]:
         # choose expiration/strike around target Δ (or ATM)
         exp, strike, mid = self._choose_contract(symbol, side, dte=self.cfg["dte"], delta_target=self.cfg["delta_target"])
 
@@ -111,8 +125,6 @@ class OptionsAIBot:
             payload["price"] = float(limit_px)
         return payload
 
-    # ---------- internals ----------
-
     def _engine_side(self, symbol: str, period: str, interval: str) -> Tuple[Optional[str], float]:
         """Compute features and ask AIEngine for side (CALL/PUT) or HOLD."""
         feats = fetch_features(self.user_id, symbol, period=period, interval=interval)
@@ -136,63 +148,28 @@ class OptionsAIBot:
         Pick expiration closest to `dte` and strike near target Δ (fallback to ATM).
         Returns (YYYY-MM-DD, strike, mid) where mid is the option's mid price.
         """
-        chains = self.client.chains(symbol)
-        exp_key, exp_date = self._best_expiration(chains, dte)
-        strike, mid = self._best_strike(chains, exp_key, side, delta_target, spot=self._spot(symbol))
+        chain = OptionChain(self.client.chains(symbol))
+        exp_date = self._best_expiration(chain, dte)
+        strike, mid = self._best_strike(chain, exp_date, side, delta_target, spot=self._spot(symbol))
         return exp_date, strike, mid
 
-    def _best_expiration(self, chains: Dict[str, Any], dte: int) -> Tuple[str, str]:
-        # expiration keys look like "YYYY-MM-DD:0" or "YYYY-MM-DD"
-        import datetime as dt
-        def _parse(key: str) -> dt.date:
-            d = key.split(":")[0]
-            y,m,day = d.split("-")
-            return dt.date(int(y), int(m), int(day))
-        today = dt.date.today()
-        # try calls map; if empty, use puts map
-        maps = chains.get("callExpDateMap") or chains.get("putExpDateMap") or {}
-        if not maps:
+    def _best_expiration(self, chain: OptionChain, dte: int) -> str:
+        # min |(exp - today).days - dte| via bisect over the chain's sorted DTEs
+        exp = chain.expiry_for_dte(dte)
+        if exp is None:
             raise RuntimeError("No expirations in chain map.")
-        # choose the date with min |(exp - today).days - dte|
-        best = min(maps.keys(), key=lambda k: abs((_parse(k) - today).days - dte))
-        return best, best.split(":")[0]
+        return exp
 
-    def _best_strike(self, chains: Dict[str, Any], exp_key: str, side: str, delta_target: float,
+    def _best_strike(self, chain: OptionChain, exp: str, side: str, delta_target: float,
                      *, spot: Optional[Number]) -> Tuple[float, Optional[Number]]:
-        # Get list for the expiration & side; structure is {strike: [contract_dict, ...]}
-        m = chains["callExpDateMap" if side == "CALL" else "putExpDateMap"]
-        legs = m.get(exp_key) or m.get(exp_key.split(":")[0]) or {}
         # choose by |delta - target|; fallback to ATM (min |strike-spot|)
-        best_k, best_mid, best_score = None, None, float("inf")
-        for k, arr in legs.items():
-            try:
-                c = arr[0]
-                delta = abs(float(c.get("delta", 0.0)))
-                bid = float(c.get("bid", 0) or 0)
-                ask = float(c.get("ask", 0) or 0)
-                mid = (bid + ask)/2 if (bid>0 and ask>0) else None
-                score = abs(delta - delta_target) if delta else 999
-                if score < best_score:
-                    best_k, best_mid, best_score = float(k), mid, score
-            except Exception:
-                continue
-        if best_k is not None:
-            return best_k, best_mid
-        # fallback: ATM
-        if spot is None:
-            spot = 0.0
-        ks = sorted([float(x) for x in legs.keys()]) if legs else [round(float(spot or 0.0))]
-        atm = min(ks, key=lambda K: abs(K - (spot or ks[0])))
-        # try to recover mid for ATM
-        mid = None
-        try:
-            arr = legs.get(str(int(atm))) or next(iter(legs.values()))
-            c = arr[0]
-            bid = float(c.get("bid", 0) or 0); ask = float(c.get("ask", 0) or 0)
-            mid = (bid + ask)/2 if (bid>0 and ask>0) else None
-        except Exception:
-            pass
-        return float(atm), mid
+        row = chain.nearest_delta(exp, side, delta_target)
+        if row is None:
+            ks = chain.strikes(exp, side)
+            if not ks.size:
+                return float(round(float(spot or 0.0))), None
+            row = chain.nearest_strike(exp, side, spot if spot else ks[0])
+        return float(chain.ca.strike[row]), chain.mid(row)
 
     def _hold_order(self, symbol: str) -> Dict[str, Any]:
         return {
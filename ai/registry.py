@@ -0,0 +1,198 @@
+# ai/registry.py
+from __future__ import annotations
+
+import os, threading, time
+from typing import Any, Dict, Optional, Tuple
+
+# joblib is optional; without it nothing can be loaded and engines use the heuristic
+try:
+    import joblib  # type: ignore
+except Exception:  # pragma: no cover
+    joblib = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except Exception:       # pragma: no cover
+    np = None  # type: ignore
+
+from .backends import compile_model
+
+
+def file_version(path: str) -> str:
+    """Default version tag: the file's mtime (ns), so a rewritten file is a new version."""
+    return str(os.stat(path).st_mtime_ns)
+
+
+def footprint(obj: Any, *, max_depth: int = 12) -> Dict[str, int]:
+    """ndarray bytes reachable from `obj`, split into heap and memory-mapped (shared) pages."""
+    out = {"heapBytes": 0, "mmapBytes": 0}
+    if np is None:  # pragma: no cover
+        return out
+    seen = set()
+
+    def walk(o: Any, depth: int) -> None:
+        if depth > max_depth or id(o) in seen:
+            return
+        seen.add(id(o))
+        if isinstance(o, np.ndarray):
+            base = o
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            shared = isinstance(o, np.memmap) or isinstance(base, np.memmap) or type(base.base).__name__ == "mmap"
+            out["mmapBytes" if shared else "heapBytes"] += int(o.nbytes)
+            if o.dtype == object:
+                for x in o.ravel().tolist():
+                    walk(x, depth + 1)
+            return
+        if isinstance(o, dict):
+            for v in o.values():
+                walk(v, depth + 1)
+        elif isinstance(o, (list, tuple, set)):
+            for v in o:
+                walk(v, depth + 1)
+        elif not isinstance(o, (str, bytes, int, float, bool, type(None))):
+            try:
+                state = o.__getstate__()          # sklearn Cython trees expose arrays here
+            except Exception:
+                state = getattr(o, "__dict__", None)
+            if isinstance(state, (dict, tuple, list)):
+                walk(state, depth + 1)
+
+    walk(obj, 0)
+    return out
+
+
+class ModelSlot:
+    """What an engine holds: `model` is re-read on every call, so a swap is one attribute store."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entry: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.swapping = False
+
+    @property
+    def model(self) -> Any:
+        """Compiled runtime when one verified at load, else the estimator itself."""
+        e = self.entry
+        return (e["runtime"] or e["model"]) if e else None
+
+    @property
+    def version(self) -> Optional[str]:
+        e = self.entry
+        return e["version"] if e else None
+
+
+class ModelRegistry:
+    """
+    Process-wide models keyed by (path, version). Each version is loaded once with
+    `mmap_mode` so numpy arrays of uncompressed joblib files stay in the page cache and are
+    shared by forked workers. `slot(path)` gives engines a stable handle; `swap` loads a new
+    version off-thread and repoints the slot only after the load succeeded. With `backend`
+    other than "sklearn" each load also tries a compiled runtime (ai/backends.py), used only
+    if it reproduces the estimator's probabilities.
+    """
+
+    def __init__(self, *, mmap_mode: Optional[str] = "r", keep: int = 2, backend: str = "auto"):
+        self.mmap_mode = mmap_mode
+        self.backend = backend
+        self.keep = keep
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._slots: Dict[str, ModelSlot] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    # ---- loading ----
+    def load(self, path: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Entry for (path, version), loading it once; raises if the file can't be loaded."""
+        if joblib is None:  # pragma: no cover
+            raise RuntimeError("joblib is not installed")
+        path = os.path.abspath(path)
+        key = (path, version or file_version(path))
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            lk = self._load_locks.setdefault(key, threading.Lock())
+        with lk:                                   # concurrent loads of one version wait for the first
+            if key in self._entries:
+                return self._entries[key]
+            t0 = time.perf_counter()
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+            load_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+            runtime, backend = compile_model(model, backend=self.backend)
+            entry = {"path": path, "version": key[1], "model": model, "runtime": runtime, "backend": backend,
+                     "loadedAt": time.time(), "loadMs": load_ms,
+                     "fileBytes": os.path.getsize(path), **footprint(model)}
+            with self._lock:
+                self._entries[key] = entry
+                self._load_locks.pop(key, None)
+            return entry
+
+    def slot(self, path: str) -> ModelSlot:
+        """Shared handle for `path`, loaded on first request; a failed load leaves `model` None."""
+        path = os.path.abspath(path)
+        with self._lock:
+            s = self._slots.get(path)
+        if s is not None:
+            return s
+        entry, error = None, None
+        try:
+            entry = self.load(path)                # single flight per version, so racing callers share it
+        except Exception as e:
+            error = repr(e)
+        with self._lock:
+            s = self._slots.setdefault(path, ModelSlot(path))
+            if s.entry is None:
+                s.entry, s.error = entry, error
+        return s
+
+    # ---- hot swap ----
+    def swap(self, path: str, *, source: Optional[str] = None, version: Optional[str] = None,
+             background: bool = True) -> Any:
+        """
+        Point the slot for `path` at a new version (from `source`, default the same file as it
+        is now). Engines keep serving the old model until the load finishes; on failure the
+        slot is unchanged and `error` is set. Returns the thread, or the slot when blocking.
+        """
+        s = self.slot(path)
+
+        def run() -> None:
+            s.swapping = True
+            try:
+                entry = self.load(source or s.path, version)
+                s.entry, s.error = entry, None
+                self._evict(s)
+            except Exception as e:
+                s.error = repr(e)
+            finally:
+                s.swapping = False
+
+        if not background:
+            run()
+            return s
+        t = threading.Thread(target=run, name=f"model-swap-{os.path.basename(path)}", daemon=True)
+        t.start()
+        return t
+
+    def _evict(self, slot: ModelSlot) -> None:
+        """Keep the active entry plus the newest `keep - 1` others for this path (engines mid-call hold their own reference)."""
+        with self._lock:
+            mine = sorted((k for k, e in self._entries.items() if e["path"] == slot.path and e is not slot.entry),
+                          key=lambda k: self._entries[k]["loadedAt"], reverse=True)
+            for k in mine[max(0, self.keep - 1):]:
+                del self._entries[k]
+
+    # ---- reporting ----
+    def stats(self) -> Dict[str, Any]:
+        """Per loaded version: load time and array memory (heap vs mmap); per slot: active version."""
+        with self._lock:
+            active = {(s.entry["path"], s.entry["version"]) for s in self._slots.values() if s.entry}
+            models = [{**{k: v for k, v in e.items() if k not in ("model", "runtime")}, "active": k in active}
+                      for k, e in self._entries.items()]
+            slots = {p: {"version": s.version, "error": s.error, "swapping": s.swapping}
+                     for p, s in self._slots.items()}
+        return {"models": models, "slots": slots}
+
+
+REGISTRY = ModelRegistry(mmap_mode=os.getenv("AI_MODEL_MMAP", "r") or None,
+                         backend=os.getenv("AI_MODEL_BACKEND", "auto"))
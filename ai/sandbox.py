@@ -5,15 +5,20 @@ from datetime import datetime
 from typing import List, Dict, Any
 from collections import deque
 
+import numpy as np
 from flask import Blueprint, request, jsonify, send_file
 from flask_login import login_required, current_user
 
-from ai.engine import AIEngine
+from ai.engine import AIEngine, SCHEMA
+from ai.train import TRAIN_FILE, write_training_rows
 from engine.datasources.integrations.schwab_adapter import SchwabClient
+from engine.datasources.resample import filter_session, minute_history_covers, resample_candles
 
 sandbox_bp = Blueprint("sandbox_api", __name__, url_prefix="/api/sandbox")
 
 # ---- lightweight math/helpers (no scipy) ----
+# Scalar erf pricing on purpose: datasets must reproduce bit-for-bit across runs, and
+# engine.options.pricing's vectorized Hart CDF differs from math.erf in the last bits.
 def _ndist_cdf(x: float) -> float:
     return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
 
@@ -55,6 +60,56 @@ def _features_from_window(window: List[Dict[str, Any]]) -> Dict[str, float]:
     ret1 = (closes[-1]/closes[-2]-1.0) if len(closes) > 1 else 0.0
     return {"ema9": ema9, "ema20": ema20, "rsi14": rsi14, "ret1": ret1}
 
+# ---- whole-series features (one pass per run instead of one window per bar) ----
+# Each helper replays the scalar helpers above column by column across every window at
+# once, in the same operation order, so rows match `_features_from_window` bit-for-bit.
+_WINDOW = 30
+FEATURE_COLS = ("ema9", "ema20", "rsi14", "ret1")
+
+def _seq_sum(M: np.ndarray) -> np.ndarray:
+    # left-to-right like builtin sum(); np.sum's pairwise order would change the last bits
+    acc = np.zeros(M.shape[0])
+    for k in range(M.shape[1]): acc = acc + M[:, k]
+    return acc
+
+def _ema_last(W: np.ndarray, span: int) -> np.ndarray:
+    a = 2/(span+1); out = W[:, 0]
+    for k in range(1, W.shape[1]): out = a*W[:, k] + (1-a)*out
+    return out
+
+def _rsi_last(W: np.ndarray, period: int = 14) -> np.ndarray:
+    if W.shape[1] < period+1: return np.full(W.shape[0], 50.0)
+    D = (W[:, 1:] - W[:, :-1])[:, -period:]
+    ag = _seq_sum(np.maximum(D, 0.0))/period; al = _seq_sum(np.maximum(-D, 0.0))/period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100/(1 + ag/al)
+    return np.where(al == 0, 100.0, rsi)
+
+def _feature_matrix(closes: List[float], window: int = _WINDOW) -> np.ndarray:
+    """Row i = _features_from_window(candles[i-window:i]) in FEATURE_COLS order; rows < window are NaN."""
+    c = np.asarray(closes, dtype=float)
+    X = np.full((len(c)+1, len(FEATURE_COLS)), np.nan)
+    if len(c) < window: return X
+    W = np.lib.stride_tricks.sliding_window_view(c, window)   # row j -> bar j+window
+    ema20 = _ema_last(W, 20) if window >= 20 else W[:, -1]
+    ret1 = W[:, -1]/W[:, -2] - 1.0 if window > 1 else np.zeros(W.shape[0])
+    X[window:] = np.column_stack([_ema_last(W, 9), ema20, _rsi_last(W, 14), ret1])
+    return X
+
+def _rolling_hv(closes: List[float], window: int = _WINDOW) -> np.ndarray:
+    """sigma[i] = _annualized_hv(closes[i-window:i]); log returns are taken once for the whole series."""
+    sig = np.full(len(closes)+1, np.nan)
+    if len(closes) < window: return sig
+    if window < 22:
+        sig[window:] = 0.0; return sig
+    lr = np.array([math.log(closes[i]/closes[i-1]) for i in range(1, len(closes))])
+    R = np.lib.stride_tricks.sliding_window_view(lr, window-1)
+    dev = R - (_seq_sum(R)/R.shape[1])[:, None]
+    # squares go through libm pow like `**` in _annualized_hv; x*x differs in the last ulp
+    sq = np.fromiter((d**2 for d in dev.ravel().tolist()), float, dev.size).reshape(dev.shape)
+    sig[window:] = np.sqrt(_seq_sum(sq)/max(1, R.shape[1]-1))*math.sqrt(252)
+    return sig
+
 # Simple fallback policy if model not provided
 def _policy_rule(feats: Dict[str, float]) -> Dict[str, Any]:
     if feats["ema9"] > feats["ema20"] and feats["rsi14"] > 52: return {"type":"SINGLE","side":"CALL"}
@@ -63,6 +118,10 @@ def _policy_rule(feats: Dict[str, float]) -> Dict[str, Any]:
 
 # AI instance (loads model if AI_MODEL_PATH set)
 AI = AIEngine(os.getenv("AI_MODEL_PATH"))
+# FEATURE_COLS -> model columns, resolved once; unmapped columns show in SCHEMA.report().
+# The model now sees ema9/ema20/rsi14 as ma_fast/ma_slow/rsi (they used to be dropped, leaving
+# most model-mode bars HOLD), so model-mode datasets differ from pre-schema runs.
+SANDBOX_FEATURES = SCHEMA.compile("sandbox", FEATURE_COLS)
 
 # Storage
 _SANDBOX_DIR = "/mnt/data/sandbox_runs"
@@ -90,28 +149,40 @@ def _run_sandbox(session_id: str, *, symbol: str, period: str, interval: str,
         uid = getattr(current_user, "id", None) or request.headers.get("X-User-Id") or "demo-user"
         c = SchwabClient(uid)
 
-        # 1) fetch candles
-        ph = c.price_history(symbol, period=period, interval=interval)
+        # 1) fetch candles (coarser intraday frames are built from the 1m feed while it
+        #    reaches back over `period`; longer runs take native bars, same session filter)
+        intraday = interval.lower() in ("5m", "15m", "1h")
+        resampled = intraday and minute_history_covers(period)
+        ph = c.price_history(symbol, period=period, interval="1m" if resampled else interval)
         candles = [c for c in (ph.get("candles") or []) if c.get("close") is not None]
+        if resampled:
+            candles = resample_candles(candles, interval)
+        elif intraday:
+            candles = filter_session(candles)
         if len(candles) < 60:
             sess.update({"status":"error","summary":{"error":"Not enough candles"}}); return
 
         ts = [int(c.get("datetime") or c.get("time") or 0) for c in candles]
-        rows = []; i = 30
+        rows = []; i = _WINDOW
         total_steps = len(candles) - (step + 1)
         sess["total"] = total_steps
 
+        closes = [c["close"] for c in candles]
+        horizon = []   # S1 per row, for the training export only
+        Fm = _feature_matrix(closes)
+        F = Fm.tolist()
+        sigmas = _rolling_hv(closes[:len(candles) - step]).tolist()
+        bars = [dict(zip(FEATURE_COLS, F[k])) for k in range(_WINDOW, len(candles) - step)]
+        # ---- THIS is where your real AI is called (one batch for every bar) ----
+        actions = (None if policy == "rule"
+                   else AI.propose_batch(SANDBOX_FEATURES.matrix(Fm[_WINDOW:len(candles) - step])))
+
         while i < len(candles) - step:
-            window = candles[i-30:i]
-            feats = _features_from_window(window)
-            sigma = _annualized_hv([w["close"] for w in window]) or 0.2
+            feats = bars[i - _WINDOW]
+            sigma = sigmas[i] or 0.2
             S0 = candles[i]["close"]
 
-            # ---- THIS is where your real AI is called ----
-            if policy == "rule":
-                action = _policy_rule(feats)
-            else:
-                action = AI.propose(symbol=symbol, features=feats, spot=S0)
+            action = _policy_rule(feats) if actions is None else actions[i - _WINDOW]
 
             ep = {
                 "session": session_id, "t": ts[i], "symbol": symbol,
@@ -134,9 +205,9 @@ def _run_sandbox(session_id: str, *, symbol: str, period: str, interval: str,
                 reward = pnl
                 ep.update({"K":K, "entry":entry, "exit":exitp, "S1":S1})
 
-            next_feats = _features_from_window(candles[exit_idx-30:exit_idx])
+            next_feats = dict(zip(FEATURE_COLS, F[exit_idx]))
             ep.update({"reward": reward, "next_features": next_feats, "done": False})
-            rows.append(ep)
+            rows.append(ep); horizon.append(S1)
 
             i += 1
             if i % 25 == 0:
@@ -147,6 +218,7 @@ def _run_sandbox(session_id: str, *, symbol: str, period: str, interval: str,
         jpath = os.path.join(out_dir, "dataset.jsonl")
         cpath = os.path.join(out_dir, "dataset.csv")
         _write_jsonl(rows, jpath); _write_csv(rows, cpath)
+        write_training_rows(os.path.join(out_dir, TRAIN_FILE), rows, horizon)
 
         rewards = [r["reward"] for r in rows]
         wins = sum(1 for r in rewards if r > 0); losses = len(rewards) - wins
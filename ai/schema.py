@@ -0,0 +1,118 @@
+# ai/schema.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Producer key names accepted for a model column (the column's own name always wins).
+# fetch_features / the sandbox emit ema9/ema20/rsi14; compute_features' scores have no column.
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "ma_fast": ("ema9",),
+    "ma_slow": ("ema20",),
+    "rsi": ("rsi14",),
+}
+
+
+def _to_float(x: Any) -> Optional[float]:
+    try:
+        return None if x is None else float(x)
+    except Exception:
+        return None
+
+
+class Mapping:
+    """
+    One producer's key order resolved to model columns. Built once per (producer, keys);
+    `matrix` is a pure index copy for array producers, `fill` touches only mapped keys.
+    """
+
+    def __init__(self, producer: str, keys: Sequence[str], columns: Sequence[str],
+                 aliases: Dict[str, Tuple[str, ...]]):
+        self.producer = producer
+        self.keys = tuple(keys)
+        self.columns = tuple(columns)
+        pos = {k: i for i, k in enumerate(self.keys)}
+        src, dst, used = [], [], set()
+        for j, col in enumerate(self.columns):
+            for k in (col,) + tuple(aliases.get(col, ())):
+                if k in pos:
+                    src.append(pos[k]); dst.append(j); used.add(k)
+                    break
+        self.src = np.array(src, dtype=np.intp)
+        self.dst = np.array(dst, dtype=np.intp)
+        self.pairs = [(self.keys[i], j) for i, j in zip(src, dst)]
+        self.missing = [c for j, c in enumerate(self.columns) if j not in dst]
+        self.unmapped = [k for k in self.keys if k not in used]
+        self.rows = 0
+
+    def matrix(self, V: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(n, len(keys)) producer array -> (n, len(columns)) model array; unmapped columns NaN."""
+        V = np.asarray(V, dtype=float).reshape(-1, len(self.keys))
+        if out is None:
+            out = np.full((V.shape[0], len(self.columns)), np.nan)
+        out[:, self.dst] = V[:, self.src]
+        self.rows += V.shape[0]
+        return out
+
+    def fill(self, d: Dict[str, Any], out: np.ndarray, present: np.ndarray) -> None:
+        """Write one dict (with exactly these keys) into a preallocated row."""
+        for k, j in self.pairs:
+            v = _to_float(d[k])
+            if v is not None:
+                out[j], present[j] = v, True
+        self.rows += 1
+
+    def report(self) -> Dict[str, Any]:
+        return {"producer": self.producer, "mapped": {self.columns[j]: k for k, j in self.pairs},
+                "missing": self.missing, "unmapped": self.unmapped, "rows": self.rows}
+
+
+class FeatureSchema:
+    """
+    The model's column order plus cached producer mappings (see `Mapping`). Dict producers
+    can emit arbitrary key layouts, so the cache is an LRU of at most `max_maps` layouts.
+    """
+
+    def __init__(self, columns: Sequence[str], aliases: Optional[Dict[str, Tuple[str, ...]]] = None,
+                 *, max_maps: int = 256):
+        self.columns = tuple(columns)
+        self.aliases = dict(ALIASES if aliases is None else aliases)
+        self.max_maps = max_maps
+        self._maps: "OrderedDict[Tuple[str, Tuple[str, ...]], Mapping]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, producer: str, keys: Sequence[str]) -> Mapping:
+        key = (producer, tuple(keys))
+        with self._lock:
+            m = self._maps.get(key)
+            if m is None:
+                m = self._maps[key] = Mapping(producer, key[1], self.columns, self.aliases)
+                while len(self._maps) > self.max_maps:
+                    self._maps.popitem(last=False)
+            else:
+                self._maps.move_to_end(key)
+        return m
+
+    def from_dicts(self, rows: Sequence[Optional[Dict[str, Any]]], producer: str = "dict"
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, present) for feature dicts; dicts with the same key order share one mapping."""
+        X = np.zeros((len(rows), len(self.columns)))
+        present = np.zeros(X.shape, dtype=bool)
+        last: Tuple[Any, Optional[Mapping]] = ((), None)
+        for i, d in enumerate(rows):
+            if not d:
+                continue
+            ks = tuple(d)
+            m = last[1] if ks == last[0] else self.compile(producer, ks)
+            last = (ks, m)
+            m.fill(d, X[i], present[i])
+        return X, present
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Every cached mapping with its missing model columns and ignored producer keys."""
+        with self._lock:
+            maps = list(self._maps.values())
+        return [m.report() for m in maps]
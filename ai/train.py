@@ -0,0 +1,230 @@
+# ai/train.py
+from __future__ import annotations
+
+import glob, json, os, time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .engine import FEATURE_KEYS, SCHEMA
+from .registry import REGISTRY, ModelRegistry
+
+CLASSES = np.array(["CALL", "PUT"])
+CHUNK_ROWS = 20_000
+TRAIN_FILE = "train.jsonl"
+
+
+def write_training_rows(path: str, rows: Sequence[Dict[str, Any]], horizon: Sequence[float]) -> None:
+    """
+    Training export beside a sandbox dataset: t, S0, features and the horizon close S1 for
+    every bar. dataset.jsonl carries S1 only on SINGLE rows, so HOLD bars are labelled from here.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for r, s1 in zip(rows, horizon):
+            f.write(json.dumps({"t": r["t"], "S0": r["S0"], "S1": s1, "features": r["features"]},
+                               separators=(",", ":")) + "\n")
+
+
+def dataset_files(sources: Iterable[str]) -> List[str]:
+    """
+    Sandbox run dirs, jsonl files or globs -> sorted jsonl paths. In run dirs a dataset's
+    train.jsonl export is used when present (every bar labelled), else dataset.jsonl itself.
+    """
+    out: List[str] = []
+    for src in sources:
+        for p in sorted(glob.glob(src)) or [src]:
+            if os.path.isdir(p):
+                for d in sorted(glob.glob(os.path.join(p, "**", "dataset.jsonl"), recursive=True)):
+                    t = os.path.join(os.path.dirname(d), TRAIN_FILE)
+                    out.append(t if os.path.isfile(t) else d)
+            elif os.path.isfile(p):
+                out.append(p)
+    return list(dict.fromkeys(out))
+
+
+def label(row: Dict[str, Any]) -> Optional[str]:
+    """Underlying direction over the sandbox horizon (S0 -> S1); flat or unlabelled bars (no S1) are skipped."""
+    s0, s1 = row.get("S0"), row.get("S1")
+    if s0 is None or s1 is None or s1 == s0:
+        return None
+    return "CALL" if s1 > s0 else "PUT"
+
+
+def iter_chunks(paths: Sequence[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (X, y) blocks of at most `chunk_rows` labelled rows, read line by line. X is in
+    FEATURE_KEYS order with missing columns 0, the same matrix AIEngine feeds the model.
+    """
+    feats: List[Dict[str, Any]] = []
+    ys: List[str] = []
+
+    def flush():
+        X, present = SCHEMA.from_dicts(feats, producer="sandbox-dataset")
+        return np.where(present, X, 0.0), np.array(ys)
+
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                y = label(row)
+                if y is None:
+                    continue
+                feats.append(row.get("features") or {})
+                ys.append(y)
+                if len(ys) >= chunk_rows:
+                    yield flush()
+                    feats, ys = [], []
+    if ys:
+        yield flush()
+
+
+class RunningStats:
+    """Per-column count/mean/variance/min/max merged chunk by chunk (Chan et al.), O(columns) memory."""
+
+    def __init__(self, n_cols: int):
+        self.n = 0
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+
+    def update(self, X: np.ndarray) -> None:
+        k = X.shape[0]
+        if not k:
+            return
+        mu = X.mean(axis=0)
+        m2 = ((X - mu) ** 2).sum(axis=0)
+        d = mu - self.mean
+        n = self.n + k
+        self.mean = self.mean + d * (k / n)
+        self.m2 = self.m2 + m2 + d * d * (self.n * k / n)
+        self.n = n
+        self.min = np.minimum(self.min, X.min(axis=0))
+        self.max = np.maximum(self.max, X.max(axis=0))
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / max(self.n - 1, 1))
+
+    def scale(self) -> np.ndarray:
+        """std with constant columns pinned to 1 (they train to ~0 weight either way)."""
+        s = self.std
+        return np.where(s > 1e-12, s, 1.0)
+
+    def as_dict(self, columns: Sequence[str]) -> Dict[str, Any]:
+        return {c: {"mean": float(self.mean[j]), "std": float(self.std[j]),
+                    "min": float(self.min[j]), "max": float(self.max[j])} for j, c in enumerate(columns)} | {"rows": self.n}
+
+
+class Standardized:
+    """Non-linear partial_fit estimators: apply the training scaler at predict time."""
+
+    def __init__(self, estimator: Any, mean: np.ndarray, scale: np.ndarray):
+        self.estimator, self.mean, self.scale_ = estimator, mean, scale
+        self.classes_ = estimator.classes_
+        self.n_features_in_ = mean.size
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self.estimator.predict_proba((np.asarray(X, float) - self.mean) / self.scale_)
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.estimator.predict((np.asarray(X, float) - self.mean) / self.scale_)
+
+
+def _sgd() -> Any:
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+
+
+def export_estimator(est: Any, stats: RunningStats) -> Any:
+    """
+    Serving model on raw FEATURE_KEYS rows. Binary linear models get the scaler folded into
+    the weights (w/σ, b - Σ wμ/σ) as a plain LogisticRegression, which ai/backends.py
+    compiles; anything else is wrapped in `Standardized`.
+    """
+    mean, scale = stats.mean, stats.scale()
+    coef = getattr(est, "coef_", None)
+    if coef is not None and coef.shape[0] == 1 and hasattr(est, "predict_proba"):
+        from sklearn.linear_model import LogisticRegression
+        w = coef / scale
+        lr = LogisticRegression()
+        lr.coef_ = w
+        lr.intercept_ = est.intercept_ - (w * mean).sum(axis=1)
+        lr.classes_ = est.classes_
+        lr.n_features_in_ = w.shape[1]
+        lr.n_iter_ = np.array([getattr(est, "n_iter_", 0)])
+        return lr
+    return Standardized(est, mean, scale)
+
+
+def train(sources: Iterable[str], *, out_dir: str = "models", estimator: Optional[Callable[[], Any]] = None,
+          epochs: int = 1, chunk_rows: int = CHUNK_ROWS, holdout_every: int = 10,
+          activate: bool = True, registry: Optional[ModelRegistry] = None,
+          slot_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fit a `partial_fit` estimator over sandbox datasets without holding them in memory.
+    Pass 1 streams column stats; each epoch then streams standardized chunks, holding out
+    every `holdout_every`-th chunk (0 = none) for accuracy. The model is written as an
+    uncompressed joblib (mmap-able) plus a .json card and, with `activate`, swapped into
+    the registry slot for `slot_path` (default AI_MODEL_PATH, else the new file).
+    """
+    import joblib
+    t0 = time.time()
+    paths = dataset_files(sources)
+    if not paths:
+        raise FileNotFoundError("no sandbox datasets found")
+    stats = RunningStats(len(FEATURE_KEYS))
+    labels = {c: 0 for c in CLASSES.tolist()}
+    for X, y in iter_chunks(paths, chunk_rows):
+        stats.update(X)
+        for c in CLASSES.tolist():
+            labels[c] += int((y == c).sum())
+    if stats.n == 0:
+        raise ValueError("datasets contain no labelled rows")
+    mean, scale = stats.mean, stats.scale()
+
+    est = (estimator or _sgd)()
+    hits = seen = 0
+    for epoch in range(max(1, epochs)):
+        last = epoch == max(1, epochs) - 1
+        for i, (X, y) in enumerate(iter_chunks(paths, chunk_rows)):
+            Z = (X - mean) / scale
+            if holdout_every and i % holdout_every == holdout_every - 1:
+                if last and hasattr(est, "classes_"):
+                    hits += int((est.predict(Z) == y).sum()); seen += y.size
+                continue
+            est.partial_fit(Z, y, classes=CLASSES)
+    if not hasattr(est, "classes_"):
+        raise ValueError("not enough rows to train (all chunks held out)")
+
+    model = export_estimator(est, stats)
+    version = time.strftime("%Y%m%d%H%M%S")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.abspath(os.path.join(out_dir, f"model-{version}.joblib"))
+    joblib.dump(model, path)
+    card = {"version": version, "path": path, "estimator": type(est).__name__, "columns": FEATURE_KEYS,
+            "sources": paths, "rows": stats.n, "labels": labels, "epochs": epochs,
+            "holdoutAccuracy": round(hits / seen, 4) if seen else None, "holdoutRows": seen,
+            "featureStats": stats.as_dict(FEATURE_KEYS), "elapsedSec": round(time.time() - t0, 2)}
+    with open(path[:-len(".joblib")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(card, f, indent=2)
+    if activate:
+        slot = slot_path or os.getenv("AI_MODEL_PATH") or path
+        s = (registry or REGISTRY).swap(slot, source=path, version=version, background=False)
+        card["activated"] = {"slot": os.path.abspath(slot), "error": s.error}
+    return card
+
+
+if __name__ == "__main__":  # python -m ai.train /mnt/data/sandbox_runs --out models
+    import argparse
+    ap = argparse.ArgumentParser(description="Train an AIEngine model from sandbox datasets.")
+    ap.add_argument("sources", nargs="+", help="run dirs, dataset.jsonl files or globs")
+    ap.add_argument("--out", default="models")
+    ap.add_argument("--epochs", type=int, default=1)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--no-activate", action="store_true")
+    a = ap.parse_args()
+    card = train(a.sources, out_dir=a.out, epochs=a.epochs, chunk_rows=a.chunk_rows, activate=not a.no_activate)
+    print(json.dumps({k: v for k, v in card.items() if k != "featureStats"}, indent=2))
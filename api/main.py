@@ -69,7 +69,9 @@ from legacy_flask.app import create_app as create_flask_app
 app.mount("/flask", WSGIMiddleware(create_flask_app()))
 
 # 7) Suggestions endpoint
-from engine.suggest import suggest_for_symbol
+import json
+from fastapi.responses import StreamingResponse
+from engine.suggest import suggest_for_symbol, suggest_batch, shared_router
 
 class Greek(BaseModel):
     delta: float | None = None
@@ -107,4 +109,17 @@ def suggestions(
     strike: Optional[float] = Query(None),
     bias: Optional[Literal["call", "put"]] = Query(None),
 ):
-    return suggest_for_symbol(symbol, overrides={"expiry": expiry, "strike": strike, "bias": bias})
+    return suggest_for_symbol(symbol, overrides={"expiry": expiry, "strike": strike, "bias": bias}, ds=_router_or_none())
+
+def _router_or_none():
+    try:
+        return shared_router()
+    except Exception:
+        return None
+
+@app.get("/suggestions/batch")
+def suggestions_batch(symbols: str = Query(..., min_length=1, description="CSV of symbols")):
+    """NDJSON stream: one SuggestionResponse-shaped line per symbol, in completion order."""
+    syms = [s for s in symbols.replace(" ", "").split(",") if s][:50]
+    lines = (json.dumps(r, default=str) + "\n" for r in suggest_batch(syms))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
@@ -1,27 +1,52 @@
 # candle_routes.py
 from __future__ import annotations
+import re
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from engine.datasources.integrations.schwab_adapter import SchwabClient
+from engine.datasources.resample import MINUTE_BARS, filter_session, minute_history_covers, normalize_tf
 
 candle_routes = Blueprint("candle_routes", __name__)
 
+# Intraday frames served from the shared 1m store instead of separate vendor pulls
+_RESAMPLED = ("1m", "5m", "15m", "1h")
+_INTRADAY = re.compile(r"^\d*\s*(m|min|minute|h|hr|hour)s?$", re.I)
+
+def _extended_arg(data: dict) -> bool:
+    """`extended` (pre/post-market bars) from body or query; regular session only by default."""
+    v = data.get("extended", request.args.get("extended", ""))
+    return v is True or str(v).lower() in ("1", "true", "yes")
+
 @candle_routes.post("/history")
 @login_required
 def candles_history():
     """
-    Body: { "symbol": "AAPL", "period": "5D", "interval": "1m" }
-    Pass through to Schwab price history.
+    Body: { "symbol": "AAPL", "period": "5D", "interval": "1m", "limit": 300, "extended": false }
+    Intraday intervals (1m/5m/15m/1h) are resampled from one Schwab 1m feed per symbol
+    while the 1m history covers `period`; anything else passes through to Schwab price
+    history. Pre/post-market bars are included only with `extended`, on both paths.
     """
     data = request.get_json(force=True) if request.data else {}
     symbol   = (data.get("symbol") or request.args.get("symbol") or "AAPL").upper()
     period   = data.get("period") or request.args.get("period") or "5D"
     interval = data.get("interval") or request.args.get("interval") or "1m"
+    limit    = data.get("limit") or request.args.get("limit", type=int)
+    extended = _extended_arg(data)
 
     uid = getattr(current_user, "id", "demo-user")
     c = SchwabClient(uid)
+    try:
+        tf = normalize_tf(interval)
+    except ValueError:
+        tf = None
+    if tf in _RESAMPLED and minute_history_covers(period):
+        loader = lambda s, p: c.price_history(s, period=p, interval="1m").get("candles") or []
+        candles = MINUTE_BARS.candles(symbol, tf, loader=loader, period=period, extended=extended,
+                                      limit=int(limit) if limit else None)
+        return jsonify({"symbol": symbol, "interval": tf, "candles": candles, "empty": not candles})
     resp = c.price_history(symbol, period=period, interval=interval)
-    # normalize shape: keep just the candles if present
+    if isinstance(resp, dict) and resp.get("candles") and _INTRADAY.match(str(interval).strip()):
+        resp = {**resp, "candles": filter_session(resp["candles"], extended=extended)}
     return jsonify(resp)
 
 @candle_routes.get("/latest")
@@ -29,12 +54,12 @@ def candles_history():
 def candles_latest():
     """
     Quick “last candle” helper using 1D/1m and returning the tail.
-    Query: ?symbol=AAPL
+    Query: ?symbol=AAPL&extended=1
     """
     symbol = (request.args.get("symbol") or "AAPL").upper()
     uid = getattr(current_user, "id", "demo-user")
     c = SchwabClient(uid)
-    resp = c.price_history(symbol, period="1D", interval="1m")
-    candles = resp.get("candles") or []
+    loader = lambda s, p: c.price_history(s, period=p, interval="1m").get("candles") or []
+    candles = MINUTE_BARS.candles(symbol, "1m", loader=loader, period="1D", extended=_extended_arg({}))
     last = candles[-1] if candles else None
     return jsonify({"symbol": symbol, "last": last, "count": len(candles)})
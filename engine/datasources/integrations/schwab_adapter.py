@@ -10,6 +10,10 @@ import numpy as np
 from flask import Blueprint, current_app, request, jsonify, redirect
 from itsdangerous import URLSafeSerializer
 
+from engine.options.chain import normalize_chain, side_means
+from engine.options.surface import SURFACES
+from engine.options.iv import fill_greeks
+
 # ========= Config helpers =========
 def cfg(key: str, default: Optional[str] = None):
     return os.getenv(key, default)
@@ -180,8 +184,8 @@ class SchwabClient:
         return self._req("GET", "/marketdata/v1/options/chains", params=params)
 
     # --- Accounts & Trading ---
-    def accounts(self) -> Any:
-        return self._req("GET", "/accounts/v1/accounts")
+    def accounts(self, fields: Optional[str] = None) -> Any:
+        return self._req("GET", "/accounts/v1/accounts", params={"fields": fields} if fields else None)
 
     def positions(self, account_id: str) -> Any:
         return self._req("GET", f"/accounts/v1/accounts/{account_id}/positions")
@@ -228,41 +232,15 @@ def build_price_features(candles: List[Dict[str, Any]]) -> Dict[str, float]:
 def adapt_chain_features(chain_json: Dict[str, Any]) -> Dict[str, float]:
     if not chain_json:
         return {}
-
-    def flatten(m):
-        out = []
-        for _exp, strikes in (m or {}).items():
-            for _strike, arr in strikes.items():
-                out.extend(arr)
-        return out
-
-    def collect(legs):
-        ivs, deltas, gammas = [], [], []
-        for leg in legs:
-            g = (leg or {}).get("greeks", {})
-            ivs.append(g.get("iv")); deltas.append(g.get("delta")); gammas.append(g.get("gamma"))
-        filt = lambda xs: np.array([x for x in xs if x is not None], float)
-        return filt(ivs), filt(deltas), filt(gammas)
-
-    call_legs = flatten(chain_json.get("callExpDateMap"))
-    put_legs  = flatten(chain_json.get("putExpDateMap"))
-
-    civ, cdel, cgam = collect(call_legs)
-    piv, pdel, pgam = collect(put_legs)
-
-    feats = {}
-    if civ.size: feats["call_iv_mean"] = float(np.nanmean(civ))
-    if cdel.size:
-        feats["call_delta_mean"] = float(np.nanmean(cdel))
-        feats["call_delta_abs_mean"] = float(np.nanmean(np.abs(cdel)))
-    if cgam.size: feats["call_gamma_mean"] = float(np.nanmean(cgam))
-
-    if piv.size: feats["put_iv_mean"] = float(np.nanmean(piv))
-    if pdel.size:
-        feats["put_delta_mean"] = float(np.nanmean(pdel))
-        feats["put_delta_abs_mean"] = float(np.nanmean(np.abs(pdel)))
-    if pgam.size: feats["put_gamma_mean"] = float(np.nanmean(pgam))
-
+    # one flatten into typed columns; per-side means are masked reductions
+    # legs with missing/stale greeks are re-solved from their mids rather than dropped
+    ca = fill_greeks(normalize_chain(chain_json))
+    feats = side_means(ca)
+    if ca.symbol and len(ca):
+        # refresh the symbol's cached surface from this pull (only moved expiries refit)
+        iv30 = SURFACES.update(ca.symbol, ca).atm_iv(30 / 365.0)
+        if iv30 == iv30:
+            feats["iv_atm_30d"] = iv30
     return feats
 
 # ========= Public hook for your AI engine =========
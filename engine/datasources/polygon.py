@@ -6,6 +6,7 @@ import datetime as dt
 import requests
 
 from .base import MarketDataSource
+from .resample import TIMEFRAMES, filter_session, minute_history_covers, normalize_tf, resample_candles
 
 
 class PolygonSource(MarketDataSource):
@@ -27,7 +28,7 @@ class PolygonSource(MarketDataSource):
         # Not wired yet. Return empty to satisfy the interface.
         return {}
 
-    # ---------- candles (supports 1D) ----------
+    # ---------- candles (1d native; intraday resampled from 1m within the 1m horizon) ----------
     def candles(
         self,
         symbol: str,
@@ -41,28 +42,48 @@ class PolygonSource(MarketDataSource):
         Supports both signatures:
           - candles(symbol, tf="1d", lookback=200)
           - candles(symbol, timeframe="1d", limit=200)
-        Currently only 1d is implemented.
+        1d comes from Polygon day aggregates; 1m/5m/15m/1h are built from one
+        1-minute pull via engine.datasources.resample. Lookbacks past the 1m horizon
+        (resample.MINUTE_HISTORY_SESSIONS) use native 5m/15m/1h aggregates, regular session only.
         """
-        tf_eff = (timeframe or tf or "1d").lower()
+        tf_eff = normalize_tf(timeframe or tf or "1d")
         lb = int(limit if limit is not None else lookback)
-        if tf_eff not in ("1d", "1day", "day", "d"):
-            raise NotImplementedError("PolygonSource.candles currently supports 1d only")
+        if tf_eff != "1d":
+            size = TIMEFRAMES[tf_eff]
+            # ~390 regular-session minutes per day, plus weekend/holiday cushion
+            days = max(3, int(lb * size / 390 * 1.6) + 3)
+            if minute_history_covers(sessions=-(-lb * size // 390)):
+                minutes = self._aggs(symbol, "minute", days, 50000)
+                return resample_candles(minutes, tf_eff, limit=lb, time_key="t")
+            mult, span = (1, "hour") if size == 60 else (size, "minute")
+            return filter_session(self._aggs(symbol, span, days, 50000, multiplier=mult))[-lb:]
 
+        return self._aggs(symbol, "day", max(5, int(lb * 2.2)), max(5000, lb))[-lb:]
+
+    def _aggs(self, symbol: str, timespan: str, days: int, limit: int, *,
+              multiplier: int = 1, max_pages: int = 50) -> List[Dict[str, Any]]:
         end = dt.datetime.utcnow().date()
         # add cushion for weekends/holidays so we still get `lb` points after slicing
-        start = end - dt.timedelta(days=max(5, int(lb * 2.2)))
+        start = end - dt.timedelta(days=days)
 
-        url = f"{self.base}/v2/aggs/ticker/{symbol.upper()}/range/1/day/{start}/{end}"
-        params = {"adjusted": "true", "sort": "asc", "limit": max(5000, lb)}
+        url = f"{self.base}/v2/aggs/ticker/{symbol.upper()}/range/{multiplier}/{timespan}/{start}/{end}"
+        params = {"adjusted": "true", "sort": "asc", "limit": limit}
         params.update(self._auth_params())
 
-        resp = self.session.get(url, params=params, timeout=20)
-        resp.raise_for_status()
-        data = resp.json() or {}
-        results = data.get("results", []) or []
+        # one page holds at most `limit` rows; follow next_url so long minute spans aren't truncated
+        results: List[Dict[str, Any]] = []
+        for _ in range(max_pages):
+            resp = self.session.get(url, params=params, timeout=20)
+            resp.raise_for_status()
+            data = resp.json() or {}
+            results += data.get("results", []) or []
+            url = data.get("next_url")
+            if not url:
+                break
+            params = self._auth_params()       # next_url carries the cursor and query
 
         out: List[Dict[str, Any]] = []
-        for row in results[-lb:]:
+        for row in results:
             out.append({
                 "t": row.get("t"),
                 "open": float(row.get("o", 0)),
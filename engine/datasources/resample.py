@@ -0,0 +1,309 @@
+# engine/datasources/resample.py
+from __future__ import annotations
+import os, threading, time
+import datetime as dt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from pytz import timezone
+
+EASTERN = timezone("US/Eastern")
+
+# Regular US equity session, minutes after local midnight (09:30 → 16:00 ET)
+SESSION_OPEN_MIN = 9 * 60 + 30
+SESSION_CLOSE_MIN = 16 * 60
+
+# Bucket size in minutes; None = one bar per session
+TIMEFRAMES: Dict[str, Optional[int]] = {"1m": 1, "5m": 5, "15m": 15, "1h": 60, "1d": None}
+_ALIASES = {"1min": "1m", "5min": "5m", "15min": "15m", "60m": "1h", "1hour": "1h",
+            "1day": "1d", "day": "1d", "d": "1d", "daily": "1d"}
+
+_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def normalize_tf(tf: str) -> str:
+    t = (tf or "1m").strip().lower()
+    t = _ALIASES.get(t, t)
+    if t not in TIMEFRAMES:
+        raise ValueError(f"unsupported timeframe: {tf}")
+    return t
+
+
+def _ts_ms(c: Dict[str, Any]) -> int:
+    return int(c.get("datetime") or c.get("t") or c.get("time") or 0)
+
+
+def to_arrays(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Candle dicts (Schwab `datetime` or Polygon `t`, epoch ms) -> sorted column arrays."""
+    n = len(candles)
+    t = np.fromiter((_ts_ms(c) for c in candles), dtype=np.int64, count=n)
+    cols = {"t": t}
+    for k in _FIELDS:
+        cols[k] = np.fromiter((float(c.get(k) or 0.0) for c in candles), dtype=float, count=n)
+    if n > 1 and np.any(np.diff(t) < 0):
+        order = np.argsort(t, kind="stable")
+        cols = {k: v[order] for k, v in cols.items()}
+    return cols
+
+
+def _offsets_min(t_ms: np.ndarray) -> np.ndarray:
+    """ET UTC-offset (minutes) per row. Looked up once per UTC day; DST flips at 2am, before the open."""
+    days = t_ms // 86_400_000
+    uniq, inv = np.unique(days, return_inverse=True)
+    offs = np.empty(len(uniq), dtype=np.int64)
+    for i, d in enumerate(uniq):
+        noon = dt.datetime(1970, 1, 1) + dt.timedelta(days=int(d), hours=12)
+        offs[i] = int(EASTERN.utcoffset(noon).total_seconds() // 60)
+    return offs[inv]
+
+
+def _in_session(ts_ms: int) -> bool:
+    mod = int((ts_ms // 60_000 + _offsets_min(np.array([ts_ms], dtype=np.int64))[0]) % 1440)
+    return SESSION_OPEN_MIN <= mod < SESSION_CLOSE_MIN
+
+
+def session_mask(t_ms: np.ndarray) -> np.ndarray:
+    """True for regular-session minutes (09:30-16:00 ET)."""
+    mod = (t_ms // 60_000 + _offsets_min(t_ms)) % 1440
+    return (mod >= SESSION_OPEN_MIN) & (mod < SESSION_CLOSE_MIN)
+
+
+def filter_session(candles: List[Dict[str, Any]], *, extended: bool = False) -> List[Dict[str, Any]]:
+    """Drop pre/post-market intraday candles unless `extended` (same rule `resample` applies)."""
+    if extended or not candles:
+        return candles
+    keep = session_mask(np.fromiter((_ts_ms(c) for c in candles), dtype=np.int64, count=len(candles)))
+    return [c for c, k in zip(candles, keep.tolist()) if k]
+
+
+_PERIOD_UNIT = {"d": 1, "w": 5, "m": 21, "y": 252}
+
+# Sessions of 1-minute history the vendors serve; longer spans use native-interval bars
+MINUTE_HISTORY_SESSIONS = int(os.getenv("MINUTE_HISTORY_SESSIONS", "30"))
+
+
+def period_sessions(period: Optional[str]) -> int:
+    """Vendor period ("1D", "5D", "1M", "1Y", "YTD") -> trading sessions it covers."""
+    p = (period or "1D").strip().lower()
+    if p == "ytd":
+        return 252
+    num, unit = p[:-1], p[-1:]
+    try:
+        return max(1, int(num or 1)) * _PERIOD_UNIT[unit]
+    except (ValueError, KeyError):
+        return 1
+
+
+def minute_history_covers(period: Optional[str] = None, *, sessions: Optional[int] = None) -> bool:
+    """Whether a 1m pull can span `period` (or `sessions`); if not, resampling would return a short series."""
+    return (period_sessions(period) if sessions is None else sessions) <= MINUTE_HISTORY_SESSIONS
+
+
+def last_sessions(cols: Dict[str, np.ndarray], n: Optional[int]) -> Dict[str, np.ndarray]:
+    """Rows whose ET calendar date is among the last `n` dates present (`n` None = all)."""
+    t = cols["t"]
+    if not n or not t.size:
+        return cols
+    day = (t // 60_000 + _offsets_min(t)) // 1440
+    days = np.unique(day)
+    if days.size <= n:
+        return cols
+    i = int(np.searchsorted(day, days[-n]))
+    return {k: v[i:] for k, v in cols.items()}
+
+
+def resample(cols: Dict[str, np.ndarray], tf: str, *, extended: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Vectorized OHLCV resample of 1-minute columns into `tf`.
+    Buckets are anchored at the session open (so 1h bars are 09:30, 10:30, ...) and never
+    straddle two sessions; pre/post-market minutes are dropped unless `extended`.
+    Bar time is the bucket start, UTC epoch ms.
+    """
+    tf = normalize_tf(tf)
+    t = cols["t"]
+    if t.size == 0:
+        return {k: v[:0] for k, v in cols.items()}
+    off = _offsets_min(t)
+    local = t // 60_000 + off
+    day, mod = local // 1440, local % 1440
+    keep = np.ones(t.size, bool) if extended else (mod >= SESSION_OPEN_MIN) & (mod < SESSION_CLOSE_MIN)
+    if not keep.all():
+        cols = {k: v[keep] for k, v in cols.items()}
+        off, day, mod = off[keep], day[keep], mod[keep]
+        if not cols["t"].size:
+            return cols
+
+    size = TIMEFRAMES[tf]
+    anchor = 0 if extended else SESSION_OPEN_MIN
+    if size is None:
+        start_mod = np.full(day.size, anchor, dtype=np.int64)
+    else:
+        start_mod = anchor + ((mod - anchor) // size) * size
+    key = day * 1440 + start_mod
+
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], key.size] - 1
+    return {
+        "t": (key[starts] - off[starts]) * 60_000,
+        "open": cols["open"][starts],
+        "high": np.maximum.reduceat(cols["high"], starts),
+        "low": np.minimum.reduceat(cols["low"], starts),
+        "close": cols["close"][ends],
+        "volume": np.add.reduceat(cols["volume"], starts),
+    }
+
+
+def to_candles(cols: Dict[str, np.ndarray], *, time_key: str = "datetime",
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    sl = slice(-int(limit), None) if limit else slice(None)
+    t = cols["t"][sl].tolist()
+    vals = {k: cols[k][sl].tolist() for k in _FIELDS}
+    return [{time_key: t[i], **{k: vals[k][i] for k in _FIELDS}} for i in range(len(t))]
+
+
+def resample_candles(candles: List[Dict[str, Any]], tf: str, *, extended: bool = False,
+                     limit: Optional[int] = None, time_key: str = "datetime") -> List[Dict[str, Any]]:
+    """One-shot helper: 1m candle dicts -> `tf` candle dicts."""
+    if normalize_tf(tf) == "1m" and extended and not limit:
+        return candles
+    return to_candles(resample(to_arrays(candles), tf, extended=extended), time_key=time_key, limit=limit)
+
+
+class BarResampler:
+    """
+    Holds one symbol's 1-minute bars (regular and extended hours) and serves every timeframe
+    from them, with or without pre/post-market minutes.
+    - `ingest()` merges a batch (vendor history pull) and drops derived caches.
+    - `update()` applies one streaming 1m bar and patches the forming bar of each cached
+      timeframe in place, so live ticks never trigger a full re-resample.
+    """
+
+    def __init__(self, *, max_minutes: int = 60 * 24 * 30, extended: bool = False):
+        self.max_minutes = max_minutes
+        self.extended = extended          # default session filter when callers don't pass one
+        self._cols: Dict[str, np.ndarray] = to_arrays([])
+        self._frames: Dict[Tuple[str, bool], Dict[str, np.ndarray]] = {}
+        self._lock = threading.RLock()
+        self.updated_at = 0.0
+
+    def __len__(self) -> int:
+        return int(self._cols["t"].size)
+
+    def ingest(self, candles: List[Dict[str, Any]]) -> None:
+        new = to_arrays(candles)
+        with self._lock:
+            merged = {k: np.concatenate([self._cols[k], new[k]]) for k in self._cols}
+            # stable sort + keep-last per timestamp so fresher vendor values win
+            order = np.argsort(merged["t"], kind="stable")
+            merged = {k: v[order] for k, v in merged.items()}
+            t = merged["t"]
+            last = np.r_[t[1:] != t[:-1], True] if t.size else np.zeros(0, bool)
+            self._cols = {k: v[last][-self.max_minutes:] for k, v in merged.items()}
+            self._frames.clear()
+            self.updated_at = time.time()
+
+    def update(self, candle: Dict[str, Any]) -> None:
+        ts = _ts_ms(candle)
+        with self._lock:
+            t = self._cols["t"]
+            if t.size and ts < t[-1]:
+                # out-of-order bar: take the slow path
+                self.ingest([candle])
+                return
+            row = {"t": ts, **{k: float(candle.get(k) or 0.0) for k in _FIELDS}}
+            if t.size and ts == t[-1]:
+                for k, v in row.items():
+                    self._cols[k][-1] = v
+            else:
+                self._cols = {k: np.append(self._cols[k], row[k])[-self.max_minutes:] for k in self._cols}
+            in_session = _in_session(ts)
+            for (tf, ext), frame in self._frames.items():
+                if ext or in_session:
+                    self._frames[(tf, ext)] = self._patch(frame, tf, ext)
+            self.updated_at = time.time()
+
+    def _patch(self, frame: Dict[str, np.ndarray], tf: str, extended: bool) -> Dict[str, np.ndarray]:
+        """Recompute only the last bucket of `frame` from the minute tail."""
+        tail = resample({k: v[-(TIMEFRAMES[tf] or 1440):] for k, v in self._cols.items()},
+                        tf, extended=extended)
+        if not tail["t"].size:
+            return frame
+        last_t = tail["t"][-1]
+        if frame["t"].size and frame["t"][-1] == last_t:
+            frame = {k: v.copy() for k, v in frame.items()}
+            for k in frame:
+                frame[k][-1] = tail[k][-1]
+            return frame
+        if frame["t"].size and last_t < frame["t"][-1]:
+            return frame
+        return {k: np.append(frame[k], tail[k][-1]) for k in frame}
+
+    def frame(self, tf: str, *, extended: Optional[bool] = None) -> Dict[str, np.ndarray]:
+        tf = normalize_tf(tf)
+        ext = self.extended if extended is None else bool(extended)
+        with self._lock:
+            if tf == "1m" and ext:
+                return dict(self._cols)
+            fr = self._frames.get((tf, ext))
+            if fr is None:
+                fr = self._frames[(tf, ext)] = resample(self._cols, tf, extended=ext)
+            return fr
+
+    def candles(self, tf: str, limit: Optional[int] = None, *, extended: Optional[bool] = None,
+                sessions: Optional[int] = None, time_key: str = "datetime") -> List[Dict[str, Any]]:
+        """`tf` bars, optionally only the last `sessions` trading dates."""
+        return to_candles(last_sessions(self.frame(tf, extended=extended), sessions),
+                          time_key=time_key, limit=limit)
+
+
+class BarStore:
+    """
+    Process-wide {symbol: BarResampler}; one 1m feed (extended hours included) per symbol
+    serves all timeframes. Tracks how many sessions each symbol's feed covers so a request
+    for a longer `period` reloads instead of getting the shorter cached window.
+    """
+
+    def __init__(self, *, ttl_sec: float = 30.0):
+        self.ttl_sec = ttl_sec
+        self._bars: Dict[str, BarResampler] = {}
+        self._spans: Dict[str, int] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> BarResampler:
+        sym = symbol.upper()
+        with self._lock:
+            br = self._bars.get(sym)
+            if br is None:
+                br = self._bars[sym] = BarResampler()
+                self._load_locks[sym] = threading.Lock()
+            return br
+
+    def span(self, symbol: str) -> int:
+        """Sessions covered by the loaded minute history (0 = never loaded)."""
+        return self._spans.get(symbol.upper(), 0)
+
+    def candles(self, symbol: str, tf: str, *,
+                loader: Optional[Callable[[str, str], List[Dict[str, Any]]]] = None,
+                period: str = "1D", extended: bool = False,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Serve `tf` bars for the last `period` of `symbol`. `loader(symbol, period)` is called
+        for fresh 1m candles when the store is empty, older than `ttl_sec`, or covers fewer
+        sessions than `period`; the check and the load hold a per-symbol lock, so concurrent
+        requests share one vendor pull.
+        """
+        sym = symbol.upper()
+        br = self.get(sym)
+        want = period_sessions(period)
+        if loader:
+            with self._load_locks[sym]:
+                have = self._spans.get(sym, 0)
+                if not len(br) or time.time() - br.updated_at > self.ttl_sec or want > have:
+                    br.ingest(loader(symbol, period))
+                    # ingest merges, so a shorter refresh keeps the older sessions already held
+                    self._spans[sym] = max(have, want) if len(br) else 0
+        return br.candles(tf, limit, extended=extended, sessions=want)
+
+
+MINUTE_BARS = BarStore()
@@ -19,3 +19,19 @@ def make_feats(df: pd.DataFrame) -> pd.DataFrame:
     out["stoch14"] = stoch_k(out, 14)
     out["trend_up"] = (out["ema9"] > out["ema20"]).astype(int)
     return out
+
+def make_feats_panel(df: pd.DataFrame, by: str = "symbol") -> pd.DataFrame:
+    """make_feats over many symbols' stacked bars in one grouped pass; rows keep their input order."""
+    out = df.copy()
+    g = out.groupby(by, sort=False)
+    back = lambda s: s.reset_index(level=0, drop=True)
+    out["ema9"]  = back(g["close"].ewm(span=9, adjust=False).mean())
+    out["ema20"] = back(g["close"].ewm(span=20, adjust=False).mean())
+    d = g["close"].diff()
+    up = back(d.clip(lower=0).groupby(out[by], sort=False).rolling(14).mean())
+    dn = back((-d.clip(upper=0)).groupby(out[by], sort=False).rolling(14).mean())
+    out["rsi14"] = 100 - (100/(1+up/dn.replace(0, np.nan)))
+    ll = back(g["low"].rolling(14).min()); hh = back(g["high"].rolling(14).max())
+    out["stoch14"] = 100 * (out["close"]-ll)/(hh-ll)
+    out["trend_up"] = (out["ema9"] > out["ema20"]).astype(int)
+    return out
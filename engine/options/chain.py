@@ -0,0 +1,326 @@
+# engine/options/chain.py
+from __future__ import annotations
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Schwab marks missing greeks with -999 (and sometimes the string "NaN")
+_MISSING = -999.0
+
+COLUMNS = ("strike", "expiry", "is_call", "bid", "ask", "mid", "delta", "gamma", "theta", "vega", "iv", "oi")
+
+
+def _f(x: Any) -> float:
+    try:
+        v = float(x)
+    except (TypeError, ValueError):
+        return float("nan")
+    return float("nan") if v == _MISSING else v
+
+
+@dataclass
+class ChainArrays:
+    """
+    One option chain as typed columns (struct-of-arrays), one row per contract.
+    `iv` is always a decimal (0.25 == 25%); missing greeks are NaN.
+    """
+    strike: np.ndarray
+    expiry: np.ndarray            # datetime64[D]
+    is_call: np.ndarray           # bool
+    bid: np.ndarray
+    ask: np.ndarray
+    mid: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    iv: np.ndarray
+    oi: np.ndarray
+    contract: np.ndarray          # vendor contract symbol (object)
+    underlying: Optional[float] = None
+    symbol: str = ""
+    raw: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+
+    def __len__(self) -> int:
+        return int(self.strike.size)
+
+    def dte(self, today: Optional[dt.date] = None) -> np.ndarray:
+        t = np.datetime64(today or dt.date.today(), "D")
+        return (self.expiry - t).astype(int)
+
+    def take(self, idx) -> "ChainArrays":
+        """Row subset (boolean mask or index array) as a new ChainArrays."""
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        cols = {k: getattr(self, k)[idx] for k in COLUMNS + ("contract",)}
+        return ChainArrays(**cols, underlying=self.underlying, symbol=self.symbol,
+                           raw=[self.raw[i] for i in idx.tolist()] if self.raw else [])
+
+    @property
+    def spread(self) -> np.ndarray:
+        """Bid/ask width; +inf where either side is missing so it sorts last."""
+        ok = (self.bid > 0) & (self.ask > 0) & (self.ask > self.bid)
+        return np.where(ok, self.ask - self.bid, np.inf)
+
+
+def _build(rows: List[Dict[str, Any]], legs: List[Dict[str, Any]], *, underlying: Optional[float],
+           symbol: str) -> ChainArrays:
+    n = len(rows)
+    col = lambda k: np.fromiter((r[k] for r in rows), dtype=float, count=n)
+    bid, ask = col("bid"), col("ask")
+    mark = col("mark")
+    mid = np.where((bid > 0) & (ask > 0), (bid + ask) / 2.0, mark)
+    return ChainArrays(
+        strike=col("strike"),
+        expiry=np.array([r["expiry"] for r in rows], dtype="datetime64[D]"),
+        is_call=np.fromiter((r["is_call"] for r in rows), dtype=bool, count=n),
+        bid=bid, ask=ask, mid=mid,
+        delta=col("delta"), gamma=col("gamma"), theta=col("theta"), vega=col("vega"),
+        iv=col("iv"), oi=np.nan_to_num(col("oi")),
+        contract=np.array([r["contract"] for r in rows], dtype=object),
+        underlying=underlying, symbol=symbol, raw=legs,
+    )
+
+
+def _pick(o: Dict[str, Any], g: Dict[str, Any], *keys: str) -> Any:
+    for k in keys:
+        v = o.get(k)
+        if v is None: v = g.get(k)
+        if v is not None: return v
+    return None
+
+
+def _leg_row(o: Dict[str, Any], *, expiry: str, is_call: bool, strike: Any, iv_pct: bool) -> Dict[str, Any]:
+    g = o.get("greeks") or {}
+    # first positive of the decimal IV fields (Tradier reports mid_iv 0 on one-sided quotes)
+    iv = next((v for v in (_f(_pick(o, g, k)) for k in ("mid_iv", "iv", "smv_vol")) if v > 0), float("nan"))
+    if not iv > 0 and o.get("volatility") is not None:
+        iv = _f(o.get("volatility"))
+        iv = iv / 100.0 if iv_pct else iv
+    return {
+        "strike": _f(strike if strike is not None else o.get("strikePrice", o.get("strike"))),
+        "expiry": str(expiry).split(":")[0][:10] or "NaT",
+        "is_call": is_call,
+        "bid": _f(o.get("bid", o.get("bidPrice"))),
+        "ask": _f(o.get("ask", o.get("askPrice"))),
+        "mark": _f(_pick(o, {}, "mark", "mid", "last")),
+        "delta": _f(_pick(o, g, "delta", "totalDelta")),
+        "gamma": _f(_pick(o, g, "gamma")),
+        "theta": _f(_pick(o, g, "theta")),
+        "vega": _f(_pick(o, g, "vega")),
+        "iv": iv if iv > 0 else float("nan"),
+        "oi": _f(o.get("openInterest", o.get("open_interest", o.get("oi")))),
+        "contract": o.get("symbol"),
+    }
+
+
+def from_schwab(chain: Dict[str, Any]) -> ChainArrays:
+    """Schwab `callExpDateMap`/`putExpDateMap` -> ChainArrays (volatility is in percent)."""
+    rows, legs = [], []
+    for key, is_call in (("callExpDateMap", True), ("putExpDateMap", False)):
+        for exp, strikes in (chain.get(key) or {}).items():
+            for k, arr in (strikes or {}).items():
+                for o in arr or []:
+                    rows.append(_leg_row(o, expiry=exp, is_call=is_call, strike=k, iv_pct=True))
+                    legs.append(o)
+    u = chain.get("underlyingPrice") or (chain.get("underlying") or {}).get("last")
+    return _build(rows, legs, underlying=_f(u) if u is not None else None, symbol=chain.get("symbol") or "")
+
+
+def from_tradier(chain: Dict[str, Any]) -> ChainArrays:
+    """Tradier `options.option` list -> ChainArrays (greeks.mid_iv is already a decimal)."""
+    opts = (chain.get("options") or {}).get("option") or []
+    if isinstance(opts, dict):
+        opts = [opts]
+    rows = [_leg_row(o, expiry=o.get("expiration_date", ""), is_call=str(o.get("option_type", "")).lower() == "call",
+                     strike=o.get("strike"), iv_pct=False) for o in opts]
+    sym = opts[0].get("underlying", "") if opts else ""
+    return _build(rows, list(opts), underlying=None, symbol=sym)
+
+
+def from_rows(rows: Iterable[Dict[str, Any]]) -> ChainArrays:
+    """Flat rows ({type, expiry, strike, bid, ask, mid, delta, ...}) as used by DataRouter/FMP."""
+    legs = list(rows or [])
+    out = [_leg_row(o, expiry=o.get("expiry") or o.get("expiration") or "", strike=o.get("strike"),
+                    is_call=str(o.get("type") or o.get("right") or o.get("option_type") or "").upper().startswith("C"),
+                    iv_pct=False) for o in legs]
+    return _build(out, legs, underlying=None, symbol="")
+
+
+def normalize_chain(chain: Any) -> ChainArrays:
+    """Detect the vendor shape once and flatten it; an empty/unknown payload gives an empty chain."""
+    if isinstance(chain, ChainArrays):
+        return chain
+    if isinstance(chain, list):
+        return from_rows(chain)
+    chain = chain or {}
+    if "callExpDateMap" in chain or "putExpDateMap" in chain:
+        return from_schwab(chain)
+    if "options" in chain:
+        return from_tradier(chain)
+    return from_rows([])
+
+
+# ---------- vectorized aggregations ----------
+
+def atm_ivs(ca: ChainArrays, band: float = 0.15) -> np.ndarray:
+    """IVs of legs within `band` of 50Δ (either side) with both iv and delta present."""
+    m = np.isfinite(ca.iv) & np.isfinite(ca.delta) & (np.abs(np.abs(ca.delta) - 0.5) < band)
+    return ca.iv[m]
+
+
+def side_means(ca: ChainArrays) -> Dict[str, float]:
+    """call_/put_ iv, delta, |delta| and gamma means, skipping missing values."""
+    out: Dict[str, float] = {}
+    for side, m in (("call", ca.is_call), ("put", ~ca.is_call)):
+        iv, de, ga = ca.iv[m], ca.delta[m], ca.gamma[m]
+        iv, de, ga = iv[np.isfinite(iv)], de[np.isfinite(de)], ga[np.isfinite(ga)]
+        if iv.size: out[f"{side}_iv_mean"] = float(iv.mean())
+        if de.size:
+            out[f"{side}_delta_mean"] = float(de.mean())
+            out[f"{side}_delta_abs_mean"] = float(np.abs(de).mean())
+        if ga.size: out[f"{side}_gamma_mean"] = float(ga.mean())
+    return out
+
+
+# ---------- indexed chain ----------
+
+def _is_call(right: Any) -> bool:
+    if isinstance(right, (bool, np.bool_)):
+        return bool(right)
+    return str(right or "").upper().startswith("C")
+
+
+class OptionChain:
+    """
+    Indexed view over ChainArrays for contract selection.
+    Per-(expiry, right) row indices are kept sorted by strike and by delta, so nearest-strike,
+    nearest-delta and width-offset lookups are bisects rather than scans/sorts of the chain.
+    Row ids returned by lookups index into `self.ca`.
+    """
+
+    def __init__(self, chain: Any, *, today: Optional[dt.date] = None):
+        self.ca = normalize_chain(chain)
+        self.today = today or dt.date.today()
+        ca = self.ca
+        ok = ~np.isnat(ca.expiry) & np.isfinite(ca.strike)
+        self._by_strike = self._group(np.flatnonzero(ok), ca.strike)
+        self._by_delta = self._group(np.flatnonzero(ok & np.isfinite(ca.delta)), ca.delta)
+        exps = np.unique(ca.expiry[ok])
+        self._exp = exps
+        self._dte = (exps - np.datetime64(self.today, "D")).astype(int)
+
+    def _group(self, rows: np.ndarray, key: np.ndarray) -> Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]]:
+        """{(expiry, is_call): (row ids sorted by key, sorted keys)} from one lexsort."""
+        ca = self.ca
+        order = rows[np.lexsort((key[rows], ca.is_call[rows], ca.expiry[rows]))]
+        out: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = {}
+        if not order.size:
+            return out
+        e, c = ca.expiry[order], ca.is_call[order]
+        cuts = np.flatnonzero((e[1:] != e[:-1]) | (c[1:] != c[:-1])) + 1
+        for g in np.split(order, cuts):
+            out[(str(ca.expiry[g[0]]), bool(ca.is_call[g[0]]))] = (g, key[g])
+        return out
+
+    def __len__(self) -> int:
+        return len(self.ca)
+
+    # ---- expiries ----
+    def expiries(self) -> List[str]:
+        return [str(e) for e in self._exp]
+
+    def dte(self, expiry: str) -> int:
+        return int((np.datetime64(str(expiry)[:10], "D") - np.datetime64(self.today, "D")).astype(int))
+
+    def expiry_for_dte(self, dte: int, *, lo: Optional[int] = None, hi: Optional[int] = None) -> Optional[str]:
+        """Expiry whose DTE is closest to `dte` (earlier wins ties), optionally within [lo, hi]."""
+        d = self._dte
+        a = int(np.searchsorted(d, lo, "left")) if lo is not None else 0
+        b = int(np.searchsorted(d, hi, "right")) if hi is not None else d.size
+        if a >= b:
+            return None
+        j = a + int(np.searchsorted(d[a:b], dte))
+        cands = [k for k in (j - 1, j) if a <= k < b]
+        best = min(cands, key=lambda k: (abs(int(d[k]) - dte), k))
+        return str(self._exp[best])
+
+    def expiries_between(self, lo: int, hi: int) -> List[str]:
+        a, b = np.searchsorted(self._dte, lo, "left"), np.searchsorted(self._dte, hi, "right")
+        return [str(e) for e in self._exp[a:b]]
+
+    # ---- strike / delta lookups ----
+    def _nearest(self, idx: Dict, expiry: str, right: Any, x: float) -> Optional[int]:
+        g = idx.get((str(expiry)[:10], _is_call(right)))
+        if g is None:
+            return None
+        rows, keys = g
+        j = int(np.searchsorted(keys, x))
+        cands = [k for k in (j - 1, j) if 0 <= k < keys.size]
+        best = min(cands, key=lambda k: (abs(keys[k] - x), k))
+        return int(rows[best])
+
+    def strikes(self, expiry: str, right: Any) -> np.ndarray:
+        g = self._by_strike.get((str(expiry)[:10], _is_call(right)))
+        return g[1] if g else np.empty(0)
+
+    def nearest_strike(self, expiry: str, right: Any, strike: float) -> Optional[int]:
+        return self._nearest(self._by_strike, expiry, right, float(strike))
+
+    def nearest_delta(self, expiry: str, right: Any, delta: float) -> Optional[int]:
+        """`delta` may be given unsigned; puts are matched against -|delta|."""
+        d = abs(float(delta))
+        return self._nearest(self._by_delta, expiry, right, d if _is_call(right) else -d)
+
+    def find(self, expiry: str, right: Any, strike: float, *, tol: float = 1e-6) -> Optional[int]:
+        """Exact strike match (within `tol`) or None."""
+        r = self.nearest_strike(expiry, right, strike)
+        return r if r is not None and abs(self.ca.strike[r] - float(strike)) <= tol else None
+
+    def strike_offset(self, row: int, width: float, *, exact: bool = True) -> Optional[int]:
+        """Same expiry/right as `row`, strike moved by `width` (exact match, or nearest if not `exact`)."""
+        ca = self.ca
+        e, c, k = str(ca.expiry[row]), bool(ca.is_call[row]), float(ca.strike[row]) + width
+        return self.find(e, c, k) if exact else self.nearest_strike(e, c, k)
+
+    def strike_range(self, expiry: str, right: Any, lo: float, hi: float) -> np.ndarray:
+        """Row ids with lo <= strike <= hi, in strike order."""
+        g = self._by_strike.get((str(expiry)[:10], _is_call(right)))
+        if g is None:
+            return np.empty(0, dtype=int)
+        rows, keys = g
+        return rows[np.searchsorted(keys, lo, "left"):np.searchsorted(keys, hi, "right")]
+
+    def delta_range(self, expiry: str, right: Any, lo: float, hi: float) -> np.ndarray:
+        """Row ids with lo <= delta <= hi (signed deltas), in delta order."""
+        g = self._by_delta.get((str(expiry)[:10], _is_call(right)))
+        if g is None:
+            return np.empty(0, dtype=int)
+        rows, keys = g
+        return rows[np.searchsorted(keys, lo, "left"):np.searchsorted(keys, hi, "right")]
+
+    # ---- row access ----
+    def mid(self, row: int) -> Optional[float]:
+        ca = self.ca
+        return float((ca.bid[row] + ca.ask[row]) / 2) if ca.bid[row] > 0 and ca.ask[row] > 0 else None
+
+    def leg(self, row: int) -> Dict[str, Any]:
+        ca = self.ca
+        num = lambda a: None if not np.isfinite(a[row]) else float(a[row])
+        return {
+            "symbol": ca.contract[row], "type": "CALL" if ca.is_call[row] else "PUT",
+            "expiry": str(ca.expiry[row]), "dte": self.dte(str(ca.expiry[row])),
+            "strike": float(ca.strike[row]), "bid": num(ca.bid), "ask": num(ca.ask), "mid": num(ca.mid),
+            "delta": num(ca.delta), "gamma": num(ca.gamma), "theta": num(ca.theta), "vega": num(ca.vega),
+            "iv": num(ca.iv), "oi": float(ca.oi[row]),
+        }
+
+    def best_liquidity(self, rows: np.ndarray) -> Optional[int]:
+        """Tightest bid/ask, then deepest open interest."""
+        rows = np.asarray(rows, dtype=int)
+        if not rows.size:
+            return None
+        return int(rows[np.lexsort((-self.ca.oi[rows], self.ca.spread[rows]))[0]])
@@ -0,0 +1,134 @@
+# engine/options/expected_move.py
+from __future__ import annotations
+import asyncio, datetime as dt
+import threading, time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .chain import OptionChain
+
+SIGMAS = (1, 2)
+
+
+def expected_moves(chain: Any, *, spot: Optional[float] = None, today: Optional[dt.date] = None,
+                   max_expiries: int = 6) -> List[Dict[str, Any]]:
+    """
+    Per expiry: ATM straddle mid (the market's expected move), ATM IV and a lognormal
+    σ-cone spot*exp(±kσ√T). Straddle strike is the listed strike nearest spot.
+    """
+    oc = chain if isinstance(chain, OptionChain) else OptionChain(chain, today=today)
+    S = spot or oc.ca.underlying
+    if not S or not np.isfinite(S):
+        return []
+    out: List[Dict[str, Any]] = []
+    for exp in oc.expiries():
+        dte = oc.dte(exp)
+        if dte < 0:
+            continue
+        c, p = oc.nearest_strike(exp, "CALL", S), oc.nearest_strike(exp, "PUT", S)
+        if c is None or p is None:
+            continue
+        cm, pm = oc.mid(c), oc.mid(p)
+        if cm is None or pm is None:
+            continue
+        ivs = [v for v in (oc.ca.iv[c], oc.ca.iv[p]) if np.isfinite(v) and v > 0]
+        T = max(dte, 1) / 365.0
+        # without vendor IVs, back out σ from the straddle (≈ 0.8·σ·S·√T for ATM)
+        iv = float(np.mean(ivs)) if ivs else (cm + pm) / (0.7979 * S * np.sqrt(T))
+        sd = iv * np.sqrt(T)
+        out.append({
+            "expiry": exp, "dte": dte, "strike": float(oc.ca.strike[c]),
+            "move": round(cm + pm, 4), "movePct": round((cm + pm) / S, 6),
+            "iv": round(iv, 6),
+            "cone": {str(k): [round(S * float(np.exp(-k * sd)), 4), round(S * float(np.exp(k * sd)), 4)] for k in SIGMAS},
+        })
+        if len(out) >= max_expiries:
+            break
+    return out
+
+
+class MoveCache:
+    """{symbol: expected moves} with freshness metadata; readers never trigger a fetch."""
+
+    def __init__(self, *, max_age_sec: float = 900.0):
+        self.max_age_sec = max_age_sec
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.last_run: Dict[str, Any] = {}
+
+    def put(self, symbol: str, spot: Optional[float], moves: List[Dict[str, Any]], *, source: str = "") -> None:
+        with self._lock:
+            self._data[symbol.upper()] = {"symbol": symbol.upper(), "spot": spot, "expiries": moves,
+                                          "asOf": time.time(), "source": source}
+
+    def get(self, symbol: str, expiry: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached entry (optionally one expiry, or the nearest to it) plus ageSec/stale; None if never computed."""
+        e = self._data.get((symbol or "").upper())
+        if e is None:
+            return None
+        age = time.time() - e["asOf"]
+        out = {**e, "ageSec": round(age, 1), "stale": age > self.max_age_sec}
+        if expiry and e["expiries"]:
+            want = np.datetime64(str(expiry)[:10], "D")
+            out["expiries"] = [min(e["expiries"], key=lambda m: abs(np.datetime64(m["expiry"], "D") - want))]
+        return out
+
+    def symbols(self) -> List[str]:
+        return sorted(self._data)
+
+
+async def _tradier_moves(symbol: str, spot: Optional[float], max_expiries: int) -> List[Dict[str, Any]]:
+    from adapters import tradier_async as trad
+    exps = (await trad.expirations(symbol))[:max_expiries]
+    chains = await asyncio.gather(*(trad.chain(symbol, e, greeks=True) for e in exps))
+    moves: List[Dict[str, Any]] = []
+    for ch in chains:
+        if ch:
+            moves += expected_moves(ch, spot=spot, max_expiries=1)
+    return moves
+
+
+def _tradier_spots(js: Any) -> Dict[str, float]:
+    q = ((js or {}).get("quotes") or {}).get("quote") or []
+    out = {}
+    for x in (q if isinstance(q, list) else [q]):
+        b, a, last = x.get("bid"), x.get("ask"), x.get("last")
+        px = (float(b) + float(a)) / 2.0 if b and a else last
+        if px: out[str(x.get("symbol")).upper()] = float(px)
+    return out
+
+
+async def refresh_async(symbols: Iterable[str], cache: "MoveCache", *, max_expiries: int = 4,
+                        concurrency: int = 8) -> Dict[str, Any]:
+    """Recompute moves for `symbols` from Tradier chains (bounded concurrency); failures keep the old entry."""
+    from adapters import tradier_async as trad
+    syms = sorted({s.upper() for s in symbols if s})
+    t0 = time.time()
+    spots = _tradier_spots(await trad.quotes(syms)) if syms else {}
+    sem = asyncio.Semaphore(concurrency)
+    errors: Dict[str, str] = {}
+
+    async def one(sym: str):
+        async with sem:
+            try:
+                moves = await _tradier_moves(sym, spots.get(sym), max_expiries)
+                if moves:
+                    cache.put(sym, spots.get(sym), moves, source="tradier")
+                else:
+                    errors[sym] = "no chain"
+            except Exception as e:
+                errors[sym] = str(e)
+
+    await asyncio.gather(*(one(s) for s in syms))
+    cache.last_run = {"at": time.time(), "symbols": len(syms), "errors": errors,
+                      "elapsedSec": round(time.time() - t0, 2)}
+    return cache.last_run
+
+
+def refresh(symbols: Iterable[str], cache: Optional["MoveCache"] = None, **kw) -> Dict[str, Any]:
+    """Blocking wrapper for scheduler jobs."""
+    return asyncio.run(refresh_async(symbols, cache or EXPECTED_MOVES, **kw))
+
+
+EXPECTED_MOVES = MoveCache()
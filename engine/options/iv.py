@@ -0,0 +1,83 @@
+# engine/options/iv.py
+from __future__ import annotations
+import dataclasses
+import datetime as dt
+from typing import Any, Optional
+
+import numpy as np
+
+from .chain import ChainArrays
+from .pricing import bs_greeks, is_call
+
+IV_LO, IV_HI = 1e-4, 5.0
+
+
+def implied_vol(price: Any, S: Any, K: Any, T: Any, right: Any, r: Any = 0.0, q: Any = 0.0,
+                *, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    Vectorized IV: Newton on vega inside a per-leg [lo, hi] bracket, bisecting whenever a
+    Newton step leaves the bracket or vega vanishes. Prices outside no-arbitrage bounds -> NaN.
+    Only unconverged legs are re-priced on each pass.
+    """
+    price, S, K, T, call, r, q = np.broadcast_arrays(*(np.asarray(v, float) for v in (price, S, K, T)),
+                                                     is_call(right), *(np.asarray(v, float) for v in (r, q)))
+    fs, fk = S * np.exp(-q * T), K * np.exp(-r * T)
+    lower = np.maximum(np.where(call, fs - fk, fk - fs), 0.0)
+    upper = np.where(call, fs, fk)
+    ok = np.isfinite(price) & (price > lower) & (price < upper) & (S > 0) & (K > 0) & (T > 0)
+    out = np.full(price.shape, np.nan)
+
+    idx = np.flatnonzero(ok)
+    p, s_, k_, t_, c_, r_, q_ = (a.ravel()[idx] for a in (price, S, K, T, call, r, q))
+    # Brenner–Subrahmanyam start, clipped into the bracket
+    sig = np.clip(np.sqrt(2 * np.pi / t_) * p / s_, 0.05, 2.0)
+    lo, hi = np.full(idx.size, IV_LO), np.full(idx.size, IV_HI)
+    act = np.arange(idx.size)
+    for _ in range(max_iter):
+        if not act.size:
+            break
+        g = bs_greeks(s_[act], k_[act], t_[act], sig[act], c_[act], r_[act], q_[act])
+        diff = g["price"] - p[act]
+        done = np.abs(diff) < tol * p[act]
+        hi[act] = np.where(diff > 0, sig[act], hi[act])
+        lo[act] = np.where(diff <= 0, sig[act], lo[act])
+        vega = g["vega"] * 100.0
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = sig[act] - diff / vega
+        bad = ~np.isfinite(step) | (step <= lo[act]) | (step >= hi[act])
+        nxt = np.where(bad, 0.5 * (lo[act] + hi[act]), step)
+        sig[act] = np.where(done, sig[act], nxt)
+        act = act[~done & (hi[act] - lo[act] > tol)]
+    out.ravel()[idx] = sig
+    return out
+
+
+def fill_greeks(ca: ChainArrays, *, spot: Optional[float] = None, r: float = 0.0, q: float = 0.0,
+                today: Optional[dt.date] = None, overwrite: bool = False) -> ChainArrays:
+    """
+    Solve IV from mids for the whole chain at once and fill missing iv/delta/gamma/theta/vega
+    (every leg when `overwrite`). Needs a spot: `spot` or the chain's underlying; else returns `ca`.
+    """
+    S = spot if spot else ca.underlying
+    if not S or not np.isfinite(S) or not len(ca):
+        return ca
+    cols = {k: getattr(ca, k).copy() for k in ("iv", "delta", "gamma", "theta", "vega")}
+    need = np.ones(len(ca), bool) if overwrite else ~np.all([np.isfinite(v) for v in cols.values()], axis=0)
+    need &= ca.mid > 0
+    if not need.any():
+        return ca
+    T = np.maximum(ca.dte(today)[need], 1) / 365.0
+    K, right = ca.strike[need], ca.is_call[need]
+    iv = implied_vol(ca.mid[need], S, K, T, right, r, q)
+    # keep a vendor IV when the mid is not solvable (e.g. below intrinsic)
+    if not overwrite:
+        iv = np.where(np.isfinite(iv), iv, cols["iv"][need])
+    g = bs_greeks(S, K, T, np.where(np.isfinite(iv), iv, 0.0), right, r, q)
+    solved = np.isfinite(iv)
+    for k in cols:
+        new = iv if k == "iv" else g[k]
+        cur = cols[k][need]
+        fill = solved & (overwrite | ~np.isfinite(cur))
+        cur[fill] = new[fill]
+        cols[k][need] = cur
+    return dataclasses.replace(ca, **cols)
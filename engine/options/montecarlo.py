@@ -0,0 +1,157 @@
+# engine/options/montecarlo.py
+from __future__ import annotations
+import datetime as dt
+import os, threading, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .risk import Legs, leg_values, prepare
+
+CHUNK = 50_000            # paths per chunk (even: antithetic pairs); bounds memory per worker
+BINS = 200
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    return max(1, int(os.getenv("MC_WORKERS", "0") or 0) or (os.cpu_count() or 1))
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Process-wide pool, created on first use; None when MC_WORKERS=1 or processes are unavailable."""
+    global _pool
+    if _workers() <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=_workers())
+            except (OSError, NotImplementedError):
+                return None
+        return _pool
+
+
+def terminal_prices(z: np.ndarray, spot: float, T: float, sigma: Any, r: float = 0.0, q: float = 0.0) -> np.ndarray:
+    """
+    GBM terminal prices for normal draws `z`. With a callable `sigma(K)` the draw uses the smile
+    vol at its own quantile's strike (ATM pass, then one refinement), which keeps the simulated
+    tails consistent with the fitted surface.
+    """
+    if callable(sigma):
+        s0 = float(sigma(np.array([spot]))[0])
+        k = spot * np.exp((r - q - 0.5 * s0 * s0) * T + s0 * np.sqrt(T) * z)
+        s = np.asarray(sigma(k), float)
+    else:
+        s = np.asarray(sigma, float)
+    return spot * np.exp((r - q - 0.5 * s * s) * T + s * np.sqrt(T) * z)
+
+
+def _chunk(args: Tuple) -> Tuple[int, int, float, float, np.ndarray, np.ndarray, float]:
+    """One chunk: (n, wins, sum, sum of squares, histogram counts, per-bin P/L sums, worst)."""
+    legs, sig, entry, spot, horizon, smile, r, q, n, seed, edges = args
+    rng = np.random.default_rng(seed)
+    half = rng.standard_normal(n // 2)
+    z = np.concatenate([half, -half])           # antithetic pairs
+    vol = (lambda K: np.interp(np.log(K / spot), smile[0], smile[1])) if smile is not None else sig_atm(sig, legs)
+    S = terminal_prices(z, spot, horizon / 365.0, vol, r, q)
+    val = leg_values(legs, S[:, None], legs.days - horizon, sig, r)
+    pl = ((val - entry) * legs.w).sum(axis=1)
+    nb = edges.size - 1
+    b = np.clip(np.searchsorted(edges, pl, "right") - 1, 0, nb - 1)
+    counts, sums = np.bincount(b, minlength=nb), np.bincount(b, weights=pl, minlength=nb)
+    return pl.size, int((pl > 0).sum()), float(pl.sum()), float((pl * pl).sum()), counts, sums, float(pl.min())
+
+
+def sig_atm(sig: np.ndarray, legs: Legs) -> float:
+    """Path vol without a surface: OI-free average of the option legs' vols."""
+    opt = ~legs.is_stock
+    return float(np.mean(sig[opt])) if opt.any() else float(np.mean(sig))
+
+
+def _edges(legs: Legs, sig: np.ndarray, entry: np.ndarray, spot: float, horizon: float, r: float,
+           bins: int) -> np.ndarray:
+    """Histogram range from the P/L over a ±6σ price sweep (fixed across chunks so counts add)."""
+    s = sig_atm(sig, legs) * np.sqrt(max(horizon, 1.0) / 365.0)
+    S = spot * np.exp(np.linspace(-6 * s, 6 * s, 241))
+    pl = ((leg_values(legs, S[:, None], legs.days - horizon, sig, r) - entry) * legs.w).sum(axis=1)
+    lo, hi = float(pl.min()), float(pl.max())
+    if hi - lo < 1e-9:
+        lo, hi = lo - 1.0, hi + 1.0
+    return np.linspace(lo, hi, bins + 1)
+
+
+def monte_carlo(o: Dict[str, Any], *, spot: float, iv: Any = None, smile: Any = None, r: float = 0.0,
+                q: float = 0.0, paths: int = 200_000, chunk: int = CHUNK, budget_ms: float = 250.0,
+                min_paths: int = 20_000, seed: Optional[int] = None, bins: int = BINS,
+                today: Optional[dt.date] = None, pool: Any = "auto") -> Dict[str, Any]:
+    """
+    Probability of profit, expected value and tail loss at the first expiry for any leg set.
+    Paths are simulated in fixed-size antithetic chunks spread over the process pool; chunks
+    still running when `budget_ms` is spent are dropped (at least `min_paths` are kept).
+    `smile` is an optional callable(K, T) -> vol (e.g. VolSurface.iv), read at the horizon.
+    """
+    t0 = time.perf_counter()
+    legs, sig, entry = prepare(o, spot=spot, iv=iv, r=r, today=today)
+    opt = ~legs.is_stock
+    horizon = float(legs.days[opt].min()) if opt.any() else 30.0
+    edges = _edges(legs, sig, entry, spot, horizon, r, bins)
+    grid = None
+    if callable(smile):
+        # tabulate the smile so workers get plain arrays
+        k = np.linspace(-1.0, 1.0, 81)
+        grid = (k, np.asarray(smile(spot * np.exp(k), max(horizon, 1.0) / 365.0), float))
+
+    chunk = max(2, chunk - chunk % 2)
+    n_chunks = max(1, -(-int(paths) // chunk))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    jobs = [(legs, sig, entry, spot, horizon, grid, r, q, chunk, s, edges) for s in seeds]
+    pool = get_pool() if pool == "auto" else pool
+
+    results = []
+    deadline = t0 + budget_ms / 1000.0
+    if pool is None:
+        for j in jobs:
+            results.append(_chunk(j))
+            if time.perf_counter() > deadline and len(results) * chunk >= min_paths:
+                break
+    else:
+        pending = {pool.submit(_chunk, j) for j in jobs}
+        while pending:
+            left = deadline - time.perf_counter()
+            if left <= 0 and len(results) * chunk >= min_paths:
+                break
+            # past the deadline but short of min_paths: block for the next chunk instead of polling
+            done, pending = wait(pending, timeout=left if left > 0 else None, return_when=FIRST_COMPLETED)
+            results.extend(f.result() for f in done)
+        for f in pending:
+            f.cancel()
+
+    n = sum(r_[0] for r_ in results)
+    wins = sum(r_[1] for r_ in results)
+    s1 = sum(r_[2] for r_ in results)
+    s2 = sum(r_[3] for r_ in results)
+    counts = np.sum([r_[4] for r_ in results], axis=0)
+    sums = np.sum([r_[5] for r_ in results], axis=0)
+    ev = s1 / n
+    # 5% expected shortfall from per-bin means (exact except inside the boundary bin)
+    means = np.where(counts > 0, sums / np.maximum(counts, 1), (edges[:-1] + edges[1:]) / 2)
+    cum = np.cumsum(counts)
+    k = int(np.searchsorted(cum, 0.05 * n)) + 1
+    tail = counts[:k].astype(float)
+    tail[-1] -= cum[k - 1] - 0.05 * n
+    cvar = float((tail * means[:k]).sum() / max(tail.sum(), 1.0))
+    return {
+        "pop": round(wins / n, 4),
+        "ev": round(ev, 2),
+        "stdev": round(float(np.sqrt(max(s2 / n - ev * ev, 0.0))), 2),
+        "var95": round(-float(means[k - 1]), 2),
+        "tailLoss": round(-cvar, 2),                     # mean loss in the worst 5% (positive = loss)
+        "worst": round(min(r_[6] for r_ in results), 2),
+        "horizonDays": horizon,
+        "paths": n, "truncated": n < n_chunks * chunk,
+        "elapsedMs": round((time.perf_counter() - t0) * 1000.0, 1),
+        "distribution": {"edges": np.round(edges, 2).tolist(), "counts": counts.astype(int).tolist()},
+    }
@@ -0,0 +1,183 @@
+# engine/options/portfolio.py
+from __future__ import annotations
+import datetime as dt
+import hashlib, json, threading, time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .pricing import bs_greeks
+
+MULT = 100.0
+DEFAULT_IV = 0.30
+SPOT_SHOCKS = (-0.10, -0.05, -0.02, 0.0, 0.02, 0.05, 0.10)
+VOL_SHOCKS = (-0.05, 0.0, 0.05)          # absolute vol points (0.05 == +5 vol)
+GREEKS = ("delta", "gamma", "theta", "vega")
+
+
+def parse_occ(sym: str) -> Optional[Dict[str, Any]]:
+    """'AAPL  250117C00190000' (OCC, root padded to 6) -> {underlying, expiry, is_call, strike}."""
+    s = (sym or "").strip()
+    if len(s) < 15:
+        return None
+    tail, root = s[-15:], s[:-15].strip()
+    try:
+        exp = dt.date(2000 + int(tail[:2]), int(tail[2:4]), int(tail[4:6]))
+        return {"underlying": root, "expiry": exp, "is_call": tail[6] == "C", "strike": int(tail[7:]) / 1000.0}
+    except ValueError:
+        return None
+
+
+def positions_from_schwab(payload: Any) -> List[Dict[str, Any]]:
+    """Schwab account(s) payload -> flat positions [{underlying, qty, is_option, is_call, strike, expiry, iv?}]."""
+    accts = payload if isinstance(payload, list) else [payload]
+    out: List[Dict[str, Any]] = []
+    for a in accts:
+        for p in ((a or {}).get("securitiesAccount") or a or {}).get("positions") or []:
+            ins = p.get("instrument") or {}
+            qty = float(p.get("longQuantity") or 0) - float(p.get("shortQuantity") or 0)
+            if not qty:
+                continue
+            if (ins.get("assetType") or "").upper() == "OPTION":
+                occ = parse_occ(ins.get("symbol") or "")
+                if not occ:
+                    continue
+                occ["underlying"] = ins.get("underlyingSymbol") or occ["underlying"]
+                out.append({**occ, "qty": qty, "is_option": True})
+            elif ins.get("symbol"):
+                out.append({"underlying": ins["symbol"], "qty": qty, "is_option": False,
+                            "is_call": False, "strike": 0.0, "expiry": None})
+    return out
+
+
+def snapshot_key(positions: Sequence[Dict[str, Any]]) -> str:
+    return hashlib.sha1(json.dumps(positions, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PortfolioRisk:
+    """
+    One account snapshot as arrays. Greeks and the spot x vol scenario cube are held per leg,
+    so a quote update re-marks only the legs on underlyings whose price moved.
+    Aggregates are $-greeks: delta in shares, gamma in shares per $1, vega/theta in $ per vol point/day.
+    """
+
+    def __init__(self, positions: Sequence[Dict[str, Any]], *, today: Optional[dt.date] = None,
+                 spot_shocks: Sequence[float] = SPOT_SHOCKS, vol_shocks: Sequence[float] = VOL_SHOCKS):
+        self.key = snapshot_key(positions)
+        today = np.datetime64(today or dt.date.today(), "D")
+        n = len(positions)
+        col = lambda k, t=float: np.array([p.get(k) or 0 for p in positions], dtype=t).reshape(n)
+        self.symbols, self.sym_idx = np.unique(np.array([str(p["underlying"]).upper() for p in positions] or [""])[:n],
+                                               return_inverse=True)
+        self.qty, self.strike = col("qty"), col("strike")
+        self.is_option, self.is_call = col("is_option", bool), col("is_call", bool)
+        exp = np.array([p.get("expiry") or "NaT" for p in positions], dtype="datetime64[D]").reshape(n)
+        days = np.where(np.isnat(exp), 0, (exp - today).astype("timedelta64[D]").astype(float))
+        self.T = np.maximum(days, 0.5) / 365.0
+        self.iv = np.array([p.get("iv") or np.nan for p in positions], dtype=float).reshape(n)
+        self.w = self.qty * np.where(self.is_option, MULT, 1.0)
+        self.spot_shocks = np.asarray(spot_shocks, float)
+        self.vol_shocks = np.asarray(vol_shocks, float)
+        self.spot = np.full(self.symbols.size, np.nan)
+        self.leg_greeks = {k: np.zeros(n) for k in GREEKS}
+        self.leg_value = np.zeros(n)
+        self.cube = np.zeros((self.spot_shocks.size, self.vol_shocks.size, n))   # scenario P/L per leg
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self.qty.size)
+
+    def update_quotes(self, quotes: Dict[str, float], *, iv: Optional[Callable[[str, np.ndarray, np.ndarray], np.ndarray]] = None) -> int:
+        """Apply underlying prices; re-mark legs whose underlying moved. Returns legs re-marked."""
+        with self._lock:
+            new = np.array([float(quotes.get(s, np.nan) or np.nan) for s in self.symbols])
+            moved = np.isfinite(new) & ~(new == self.spot)
+            self.spot = np.where(np.isfinite(new), new, self.spot)
+            rows = np.flatnonzero(moved[self.sym_idx] & np.isfinite(self.spot[self.sym_idx]))
+            if rows.size:
+                self._mark(rows, iv)
+            self.updated_at = time.time()
+            return int(rows.size)
+
+    def _mark(self, rows: np.ndarray, iv) -> None:
+        S = self.spot[self.sym_idx[rows]]
+        sig = self.iv[rows]
+        if iv is not None and np.isnan(sig).any():
+            for j in np.unique(self.sym_idx[rows]):
+                m = self.sym_idx[rows] == j
+                got = iv(self.symbols[j], self.strike[rows][m], self.T[rows][m])
+                if got is not None:
+                    sig[m] = np.where(np.isnan(sig[m]), got, sig[m])
+        sig = np.where(np.isfinite(sig) & (sig > 0), sig, DEFAULT_IV)
+        opt, K, T, call = self.is_option[rows], self.strike[rows], self.T[rows], self.is_call[rows]
+        g = bs_greeks(S, K, T, sig, call)
+        w = self.w[rows]
+        self.leg_value[rows] = np.where(opt, g["price"], S)
+        self.leg_greeks["delta"][rows] = w * np.where(opt, g["delta"], 1.0)
+        self.leg_greeks["gamma"][rows] = w * np.where(opt, g["gamma"], 0.0)
+        self.leg_greeks["theta"][rows] = w * np.where(opt, g["theta"], 0.0)
+        self.leg_greeks["vega"][rows] = w * np.where(opt, g["vega"], 0.0)
+        # full revaluation on the (spot shock x vol shock x leg) cube in one broadcast
+        Ss = S[None, None, :] * (1.0 + self.spot_shocks[:, None, None])
+        vs = np.maximum(sig[None, None, :] + self.vol_shocks[None, :, None], 0.01)
+        px = bs_greeks(Ss, K, T, vs, call, greeks=False)["price"]
+        val = np.where(opt, px, Ss)
+        self.cube[:, :, rows] = (val - self.leg_value[rows]) * w
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            nsym = self.symbols.size
+            agg = {k: np.bincount(self.sym_idx, weights=v, minlength=nsym) for k, v in self.leg_greeks.items()}
+            by_sym_cube = np.zeros(self.cube.shape[:2] + (nsym,))
+            np.add.at(by_sym_cube, (slice(None), slice(None), self.sym_idx), self.cube)
+            total_cube = by_sym_cube.sum(axis=2)
+            spot = self.spot
+            by_symbol = {
+                s: {"spot": None if not np.isfinite(spot[j]) else float(spot[j]),
+                    **{k: round(float(agg[k][j]), 4) for k in GREEKS},
+                    "deltaDollars": round(float(agg["delta"][j] * np.nan_to_num(spot[j])), 2),
+                    "worst": round(float(by_sym_cube[:, :, j].min()), 2)}
+                for j, s in enumerate(self.symbols.tolist()) if s
+            }
+            return {
+                "total": {k: round(float(agg[k].sum()), 4) for k in GREEKS},
+                "bySymbol": by_symbol,
+                "scenarios": {"spot": self.spot_shocks.tolist(), "vol": self.vol_shocks.tolist(),
+                              "pnl": np.round(total_cube, 2).tolist()},
+                "maxRisk": round(float(max(0.0, -total_cube.min())) if total_cube.size else 0.0, 2),
+                "exposure": round(float(sum(abs(v["deltaDollars"]) for v in by_symbol.values())), 2),
+                "legs": len(self), "asOf": self.updated_at,
+            }
+
+
+class PortfolioCache:
+    """
+    {account: PortfolioRisk} keyed by position snapshot; a changed snapshot rebuilds, quotes update in place.
+    Position pulls are reused for `positions_ttl` seconds so a 1s risk poll costs one quote call.
+    """
+
+    def __init__(self, *, positions_ttl: float = 15.0):
+        self.positions_ttl = positions_ttl
+        self._books: Dict[str, PortfolioRisk] = {}
+        self._pulled: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, account: str, loader: Callable[[], Sequence[Dict[str, Any]]]) -> PortfolioRisk:
+        pr = self._books.get(account)
+        if pr is not None and time.time() - self._pulled.get(account, 0.0) < self.positions_ttl:
+            return pr
+        pr = self.get(account, loader())
+        self._pulled[account] = time.time()
+        return pr
+
+    def get(self, account: str, positions: Sequence[Dict[str, Any]]) -> PortfolioRisk:
+        key = snapshot_key(positions)
+        with self._lock:
+            pr = self._books.get(account)
+            if pr is None or pr.key != key:
+                pr = self._books[account] = PortfolioRisk(positions)
+            return pr
+
+
+PORTFOLIOS = PortfolioCache()
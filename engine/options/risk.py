@@ -0,0 +1,185 @@
+# engine/options/risk.py
+from __future__ import annotations
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .pricing import bs_price
+
+MULT = 100.0              # shares per option contract
+DEFAULT_IV = 0.30
+
+
+@dataclass
+class Legs:
+    """Normalized order legs as arrays; `w` is the signed $ per 1.00 of leg value (BUY +, SELL -)."""
+    w: np.ndarray
+    is_call: np.ndarray
+    is_stock: np.ndarray
+    strike: np.ndarray
+    days: np.ndarray          # calendar days to expiry (0 for stock)
+    entry: np.ndarray         # per-share entry price, NaN if not given
+    iv: np.ndarray            # NaN if not given
+
+    def __len__(self) -> int:
+        return int(self.w.size)
+
+    @property
+    def units(self) -> float:
+        """Contracts per spread unit (smallest option leg size), for pricing a net limit."""
+        opt = np.abs(self.w[~self.is_stock]) / MULT
+        return float(opt.min()) if opt.size else 1.0
+
+
+def _num(x: Any) -> float:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def legs_from_order(o: Dict[str, Any], *, today: Optional[dt.date] = None) -> Legs:
+    """
+    Normalized preview/submit payload -> Legs.
+    Legs: {action, asset?, side|right|type, strike, expiration|expiry, quantity?, price?, iv?};
+    a top-level single (no `legs`) is read the same way. Option quantity is contracts, STOCK is
+    shares (defaulting to 100 per order contract, i.e. a covered call's lot).
+    """
+    legs: List[Dict[str, Any]] = o.get("legs") or [o]
+    today = today or dt.date.today()
+    base = _num(o.get("quantity") or o.get("qty") or 1)
+    rows = []
+    for l in legs:
+        stock = str(l.get("asset") or "OPTION").upper() in ("STOCK", "EQUITY")
+        right = str(l.get("side") or l.get("right") or l.get("type") or "").upper()
+        exp = l.get("expiration") or l.get("expiry")
+        days = 0 if stock or not exp else max(0, (dt.date.fromisoformat(str(exp)[:10]) - today).days)
+        q = _num(l.get("quantity") or l.get("qty")) if (l is not o) else base
+        if not q == q:
+            q = base * (MULT if stock else 1.0)
+        sign = 1.0 if str(l.get("action") or "BUY").upper().startswith("BUY") else -1.0
+        rows.append((sign * q * (1.0 if stock else MULT), right.startswith("C"), stock,
+                     0.0 if stock else _num(l.get("strike")), float(days),
+                     _num(l.get("price")), _num(l.get("iv"))))
+    cols = list(zip(*rows)) if rows else [()] * 7
+    a = lambda i, t=float: np.array(cols[i], dtype=t)
+    return Legs(a(0), a(1, bool), a(2, bool), a(3), a(4), a(5), a(6))
+
+
+def leg_values(legs: Legs, S: np.ndarray, days_left: np.ndarray, iv: np.ndarray,
+               r: float = 0.0, dtype=np.float64) -> np.ndarray:
+    """Per-share value of every leg; S and days_left broadcast against a trailing legs axis."""
+    T = np.maximum(days_left, 0.0) / 365.0
+    opt = bs_price(S, legs.strike, T, iv, legs.is_call, r, dtype=dtype)
+    return np.where(legs.is_stock, np.asarray(S, dtype) + 0 * opt, opt)
+
+
+def pl_surface(legs: Legs, prices: np.ndarray, days: np.ndarray, iv: np.ndarray, entry: np.ndarray,
+               *, r: float = 0.0, dtype=np.float64) -> np.ndarray:
+    """P/L ($) over a (days-from-now x underlying price) grid in one broadcast: shape (len(days), len(prices))."""
+    S = np.asarray(prices, dtype)[None, :, None]
+    left = legs.days[None, None, :] - np.asarray(days, dtype)[:, None, None]
+    val = leg_values(legs, S, left, iv, r, dtype)
+    return ((val - entry) * legs.w).sum(axis=-1)
+
+
+def _expiry_stats(legs: Legs, entry: np.ndarray) -> Dict[str, Any]:
+    """Exact max P/L and breakevens of the piecewise-linear expiration payoff (single expiry)."""
+    w = legs.w
+    kinks = np.unique(np.r_[0.0, legs.strike[~legs.is_stock]])
+    pay = lambda S: ((np.where(legs.is_stock, S[:, None],
+                               np.maximum(np.where(legs.is_call, S[:, None] - legs.strike, legs.strike - S[:, None]), 0))
+                      - entry) * w).sum(axis=1)
+    y = pay(kinks)
+    # slope beyond the last strike: long calls/stock add, short subtract
+    slope = float((w * (legs.is_call | legs.is_stock)).sum())
+    hi = float(y.max()) if slope <= 0 else None
+    lo = float(y.min()) if slope >= 0 else None
+    be: List[float] = []
+    for a, b, ya, yb in zip(kinks[:-1], kinks[1:], y[:-1], y[1:]):
+        if ya == 0:
+            be.append(float(a))
+        elif ya * yb < 0:
+            be.append(float(a - ya * (b - a) / (yb - ya)))
+    if y[-1] == 0:
+        be.append(float(kinks[-1]))
+    elif slope and y[-1] * slope < 0:
+        be.append(float(kinks[-1] - y[-1] / slope))
+    return {"maxProfit": hi, "maxLoss": lo, "breakevens": sorted(set(round(b, 4) for b in be))}
+
+
+def prepare(o: Dict[str, Any], *, spot: float, iv: Any = None, r: float = 0.0,
+            today: Optional[dt.date] = None) -> Tuple[Legs, np.ndarray, np.ndarray]:
+    """
+    (legs, per-leg vol, per-share entry). `iv` may be a scalar, a per-leg array or a
+    callable(K, T) (e.g. VolSurface.iv); per-leg `iv` fields win. Missing option entry prices
+    come from the order's net `price`, else the model at spot; unpriced stock enters at spot.
+    """
+    legs = legs_from_order(o, today=today)
+    T = legs.days / 365.0
+    if callable(iv):
+        sig = np.asarray(iv(legs.strike, np.maximum(T, 1 / 365.0)), float)
+    else:
+        sig = np.broadcast_to(np.asarray(DEFAULT_IV if iv is None else iv, float), legs.w.shape)
+    sig = np.where(np.isfinite(legs.iv), legs.iv, np.where(np.isfinite(sig), sig, DEFAULT_IV))
+
+    entry = legs.entry.copy()
+    theo = leg_values(legs, np.float64(spot), legs.days, sig, r)
+    opt = ~legs.is_stock
+    entry[legs.is_stock & ~np.isfinite(entry)] = spot
+    miss = opt & ~np.isfinite(entry)
+    net = abs(_num(o.get("price")))
+    if miss.any() and np.isfinite(net):
+        # limit is one net price per spread unit (debit or credit by the package's model sign);
+        # split what the priced legs don't explain over the missing ones pro rata to model value
+        sign = 1.0 if float((legs.w * theo)[opt].sum()) >= 0 else -1.0
+        known = float((legs.w * entry)[opt & ~miss].sum())
+        tv = float((legs.w * theo)[miss].sum())
+        entry[miss] = theo[miss] * ((sign * net * legs.units * MULT - known) / tv if tv else 1.0)
+    return legs, sig, np.where(np.isfinite(entry), entry, theo)
+
+
+def risk_profile(o: Dict[str, Any], *, spot: float, iv: Any = None, r: float = 0.0,
+                 n_prices: int = 121, width: float = 0.3, n_days: int = 8,
+                 today: Optional[dt.date] = None, float32: bool = False) -> Dict[str, Any]:
+    """
+    Risk for any leg set: max profit/loss and breakevens at the first expiry, plus the full
+    P/L surface over price x days for charts. Vols and entries are resolved by `prepare`.
+    """
+    legs, sig, entry = prepare(o, spot=spot, iv=iv, r=r, today=today)
+    if not len(legs):
+        return {"ok": False, "error": "no legs"}
+    dtype = np.float32 if float32 else np.float64
+
+    first = float(legs.days[~legs.is_stock].min()) if (~legs.is_stock).any() else 0.0
+    prices = np.linspace(spot * (1 - width), spot * (1 + width), n_prices)
+    days = np.unique(np.round(np.linspace(0.0, first, min(int(first), n_days) + 1)))
+    surf = pl_surface(legs, prices, days, sig, entry, r=r, dtype=dtype)
+
+    one_expiry = np.unique(legs.days[~legs.is_stock]).size <= 1
+    if one_expiry:
+        stats = _expiry_stats(legs, entry)
+    else:
+        # calendars/diagonals: later legs keep time value at the first expiry; read off the grid
+        last = surf[-1].astype(float)
+        sgn = np.sign(last)
+        cross = np.flatnonzero(sgn[:-1] * sgn[1:] < 0)
+        be = prices[cross] - last[cross] * (prices[cross + 1] - prices[cross]) / (last[cross + 1] - last[cross])
+        stats = {"maxProfit": float(last.max()), "maxLoss": float(last.min()),
+                 "breakevens": [round(float(b), 4) for b in be]}
+
+    debit = float((legs.w * entry).sum())
+    return {
+        "ok": True, "strategy": (o.get("strategy") or "").upper() or None, "spot": float(spot),
+        "netDebit": round(debit, 2),
+        "maxProfit": None if stats["maxProfit"] is None else round(stats["maxProfit"], 2),
+        "maxLoss": None if stats["maxLoss"] is None else round(-stats["maxLoss"], 2),   # as a positive $ loss
+        "maxProfitUnbounded": stats["maxProfit"] is None, "maxLossUnbounded": stats["maxLoss"] is None,
+        "breakevens": stats["breakevens"],
+        "legs": [{"entry": round(float(e), 4), "iv": round(float(s), 4)} for e, s in zip(entry, sig)],
+        "surface": {"prices": np.round(prices, 4).tolist(), "days": days.tolist(),
+                    "pl": np.round(surf.astype(float), 2).tolist()},
+        "expiration": {"prices": np.round(prices, 4).tolist(), "pl": np.round(surf[-1].astype(float), 2).tolist()},
+    }
@@ -0,0 +1,289 @@
+# engine/options/search.py
+from __future__ import annotations
+import datetime as dt
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .chain import OptionChain
+from .pricing import bs_price, norm_cdf, norm_pdf
+
+MULT = 100.0
+DEFAULT_IV = 0.30
+KINDS = ("vertical", "iron_condor", "calendar", "straddle")
+PARETO_POOL = 1000            # best composite scores that enter the dominance check
+_Z = np.linspace(-4.0, 4.0, 81)
+_WZ = norm_pdf(_Z) / norm_pdf(_Z).sum()
+
+
+@dataclass
+class _Block:
+    """Candidates of one strategy/expiry: chain rows per leg plus per-share economics."""
+    kind: str
+    legs: np.ndarray          # (n, L) chain row ids
+    sides: np.ndarray         # (L,) +1 buy / -1 sell
+    debit: np.ndarray         # net per share; negative = credit
+    max_profit: np.ndarray
+    max_loss: np.ndarray
+    pop: np.ndarray
+    be: np.ndarray            # (n, 2) breakevens, NaN when one-sided
+    unbounded: bool = False   # max_profit is a 2σ-move proxy
+
+
+class _Ctx:
+    """Per-symbol inputs shared by the generators: quoted strikes per (expiry, right), ATM vols."""
+
+    def __init__(self, oc: OptionChain, spot: float, r: float, iv: Any, window: float, min_oi: float,
+                 min_mid: float):
+        self.oc, self.S, self.r, self.iv = oc, spot, r, iv
+        ca = oc.ca
+        self.quoted = (ca.mid >= max(min_mid, 1e-9)) & (ca.ask > 0) & (ca.oi >= min_oi)
+        self.lo, self.hi = spot * (1 - window), spot * (1 + window)
+        self._atm: Dict[str, float] = {}
+        self._theo = np.full(len(ca), np.nan)
+
+    def side(self, exp: str, call: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows = self.oc.strike_range(exp, call, self.lo, self.hi)
+        rows = rows[self.quoted[rows]]
+        return rows, self.oc.ca.strike[rows], self.oc.ca.mid[rows]
+
+    def T(self, exp: str) -> float:
+        return max(self.oc.dte(exp), 1) / 365.0
+
+    def atm(self, exp: str) -> float:
+        if exp not in self._atm:
+            ca = self.oc.ca
+            rows = self.oc.strike_range(exp, True, self.S * 0.95, self.S * 1.05)
+            rows = np.r_[rows, self.oc.strike_range(exp, False, self.S * 0.95, self.S * 1.05)]
+            v = ca.iv[rows]
+            v = v[np.isfinite(v) & (v > 0)]
+            self._atm[exp] = float(np.median(v)) if v.size else DEFAULT_IV
+        return self._atm[exp]
+
+    def sig(self, exp: str, K: np.ndarray) -> np.ndarray:
+        """Vol for probability at strike(s) K: the surface when given, else the expiry's ATM vol."""
+        if callable(self.iv):
+            v = np.asarray(self.iv(np.maximum(K, 1e-6), self.T(exp)), float)
+            return np.where(np.isfinite(v) & (v > 0), v, self.atm(exp))
+        return np.full(np.shape(K), self.atm(exp))
+
+    def theo(self, exp: str) -> None:
+        """Model value of the expiry's windowed rows (vendor IV, else surface/ATM) for EV scoring."""
+        ca = self.oc.ca
+        rows = np.r_[self.oc.strike_range(exp, True, self.lo, self.hi), self.oc.strike_range(exp, False, self.lo, self.hi)]
+        v = ca.iv[rows]
+        v = np.where(np.isfinite(v) & (v > 0), v, self.sig(exp, ca.strike[rows]))
+        self._theo[rows] = bs_price(self.S, ca.strike[rows], self.T(exp), v, ca.is_call[rows], self.r)
+
+    def p_above(self, exp: str, B: np.ndarray) -> np.ndarray:
+        """Risk-neutral P(S_T > B) under a lognormal at the breakeven's vol."""
+        T, s = self.T(exp), self.sig(exp, B)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d2 = (np.log(self.S / B) + (self.r - 0.5 * s * s) * T) / (s * np.sqrt(T))
+        return np.where(B > 0, norm_cdf(np.nan_to_num(d2, nan=-np.inf)), 1.0)
+
+
+def _verticals(c: _Ctx, exp: str, max_width: float) -> List[_Block]:
+    out = []
+    for call in (True, False):
+        rows, K, m = c.side(exp, call)
+        i, j = np.triu_indices(rows.size, 1)
+        W = K[j] - K[i]
+        keep = (W > 0) & (W <= max_width)
+        i, j, W = i[keep], j[keep], W[keep]
+        # calls: low strike worth more; puts: high strike worth more
+        net = m[i] - m[j] if call else m[j] - m[i]
+        ok = (net > 0) & (net < W)
+        i, j, W, net = i[ok], j[ok], W[ok], net[ok]
+        be = K[i] + net if call else K[j] - net
+        up = c.p_above(exp, be)
+        legs = np.c_[rows[i], rows[j]] if call else np.c_[rows[j], rows[i]]
+        nanc = np.full(be.size, np.nan)
+        debit_kind, credit_kind = ("bull_call_spread", "bear_call_spread") if call else ("bear_put_spread", "bull_put_spread")
+        out.append(_Block(debit_kind, legs, np.array([1, -1]), net, W - net, net,
+                          up if call else 1 - up, np.c_[be, nanc]))
+        out.append(_Block(credit_kind, legs, np.array([-1, 1]), -net, net, W - net,
+                          1 - up if call else up, np.c_[be, nanc]))
+    return out
+
+
+def _iron_condors(c: _Ctx, exp: str, widths: np.ndarray) -> List[_Block]:
+    pr, Kp, mp = c.side(exp, False)
+    cr, Kc, mc = c.side(exp, True)
+    sp, sc = np.flatnonzero(Kp < c.S), np.flatnonzero(Kc > c.S)
+    out = []
+    for w in widths:
+        lp = np.clip(np.searchsorted(Kp, Kp[sp] - w), 0, max(Kp.size - 1, 0))
+        lc = np.clip(np.searchsorted(Kc, Kc[sc] + w), 0, max(Kc.size - 1, 0))
+        okp = np.isclose(Kp[lp], Kp[sp] - w) if Kp.size else np.zeros(0, bool)
+        okc = np.isclose(Kc[lc], Kc[sc] + w) if Kc.size else np.zeros(0, bool)
+        a, la = sp[okp], lp[okp]
+        b, lb = sc[okc], lc[okc]
+        if not a.size or not b.size:
+            continue
+        cred = ((mp[a] - mp[la])[:, None] + (mc[b] - mc[lb])[None, :]).ravel()
+        A, B = (x.ravel() for x in np.meshgrid(np.arange(a.size), np.arange(b.size), indexing="ij"))
+        ok = (cred > 0) & (cred < w)
+        A, B, cred = A[ok], B[ok], cred[ok]
+        lo, hi = Kp[a[A]] - cred, Kc[b[B]] + cred
+        pop = c.p_above(exp, lo) - c.p_above(exp, hi)
+        legs = np.c_[pr[la[A]], pr[a[A]], cr[b[B]], cr[lb[B]]]
+        out.append(_Block("iron_condor", legs, np.array([1, -1, -1, 1]), -cred, cred, w - cred, pop, np.c_[lo, hi]))
+    return out
+
+
+def _straddles(c: _Ctx, exp: str) -> List[_Block]:
+    cr, Kc, mc = c.side(exp, True)
+    pr, Kp, mp = c.side(exp, False)
+    K, ic, ip = np.intersect1d(Kc, Kp, return_indices=True)
+    near = np.abs(K / c.S - 1) <= 0.1
+    K, ic, ip = K[near], ic[near], ip[near]
+    if not K.size:
+        return []
+    D = mc[ic] + mp[ip]
+    lo, hi = K - D, K + D
+    pop = 1 - c.p_above(exp, lo) + c.p_above(exp, hi)
+    sd = c.atm(exp) * np.sqrt(c.T(exp))
+    # open-ended upside: reward is the average payoff of a 2σ move either way
+    reward = np.maximum(0.5 * c.S * (np.exp(2 * sd) - np.exp(-2 * sd)) - D, 0.0)
+    return [_Block("long_straddle", np.c_[cr[ic], pr[ip]], np.array([1, 1]), D, reward, D, pop,
+                   np.c_[lo, hi], unbounded=True)]
+
+
+def _calendars(c: _Ctx, near: str, far: str) -> List[_Block]:
+    T1, T2 = c.T(near), c.T(far)
+    s1 = c.atm(near) * np.sqrt(T1)
+    Sg = c.S * np.exp((c.r - 0.5 * c.atm(near) ** 2) * T1 + s1 * _Z)       # price grid at the near expiry
+    out = []
+    for call in (True, False):
+        rn, Kn, mn = c.side(near, call)
+        rf, Kf, mf = c.side(far, call)
+        K, i_n, i_f = np.intersect1d(Kn, Kf, return_indices=True)
+        keep = np.abs(K / c.S - 1) <= 0.1
+        K, i_n, i_f = K[keep], i_n[keep], i_f[keep]
+        D = mf[i_f] - mn[i_n]
+        ok = D > 0
+        K, i_n, i_f, D = K[ok], i_n[ok], i_f[ok], D[ok]
+        if not K.size:
+            continue
+        vf = c.oc.ca.iv[rf[i_f]]
+        vf = np.where(np.isfinite(vf) & (vf > 0), vf, c.atm(far))
+        far_val = bs_price(Sg[None, :], K[:, None], T2 - T1, vf[:, None], call, c.r)
+        near_val = np.maximum((Sg[None, :] - K[:, None]) if call else (K[:, None] - Sg[None, :]), 0.0)
+        pl = far_val - near_val - D[:, None]
+        win = pl > 0
+        pop = (win * _WZ).sum(axis=1)
+        first, last = win.argmax(axis=1), _Z.size - 1 - win[:, ::-1].argmax(axis=1)
+        any_ = win.any(axis=1)
+        be = np.c_[np.where(any_, Sg[first], np.nan), np.where(any_, Sg[last], np.nan)]
+        out.append(_Block("call_calendar" if call else "put_calendar", np.c_[rn[i_n], rf[i_f]],
+                          np.array([-1, 1]), D, np.maximum(pl.max(axis=1), 0.0), D, pop, be))
+    return out
+
+
+def _pct_rank(x: np.ndarray) -> np.ndarray:
+    r = np.empty(x.size)
+    r[np.argsort(x, kind="stable")] = np.arange(x.size)
+    return r / max(x.size - 1, 1)
+
+
+def pareto_front(F: np.ndarray) -> np.ndarray:
+    """Mask of non-dominated rows of F (every column larger-is-better); (n, n) compares per column."""
+    n = F.shape[0]
+    ge, gt = np.ones((n, n), bool), np.zeros((n, n), bool)   # [i, j]: j at least as good as / better than i
+    for k in range(F.shape[1]):
+        col = F[:, k]
+        ge &= col[None, :] >= col[:, None]
+        gt |= col[None, :] > col[:, None]
+    return ~(ge & gt).any(axis=1)
+
+
+def search_strategies(chain: Any, *, spot: Optional[float] = None, kinds: Sequence[str] = KINDS,
+                      only: Optional[Sequence[str]] = None,
+                      dte: Tuple[int, int] = (7, 60), window: float = 0.2, max_width: Optional[float] = None,
+                      widths: Optional[Sequence[float]] = None, iv: Any = None, r: float = 0.0,
+                      min_oi: float = 0.0, min_mid: float = 0.05, min_net: float = 0.10, min_rr: float = 0.10,
+                      min_pop: float = 0.05, limit: int = 20, today: Optional[dt.date] = None) -> Dict[str, Any]:
+    """
+    Enumerate verticals (debit and credit, both rights), iron condors, calendars and long
+    straddles across every quoted strike/expiry in the window, price them off mids in array
+    ops, and return the Pareto set over (risk/reward, POP, capital at risk, spread cost),
+    best composite rank first (see `score`); `edge` is model EV net of half-spread cost per $ at risk. Legs below `min_mid`, packages
+    under `min_net` (debit or credit) and those below `min_rr`/`min_pop` are screened out. `iv` may be a callable(K, T) (e.g. VolSurface.iv) for POP.
+    """
+    t0 = time.perf_counter()
+    oc = chain if isinstance(chain, OptionChain) else OptionChain(chain, today=today)
+    S = float(spot or oc.ca.underlying or np.nan)
+    if not np.isfinite(S) or S <= 0 or not len(oc):
+        return {"ok": False, "error": "no spot or empty chain", "evaluated": 0, "candidates": []}
+    c = _Ctx(oc, S, r, iv, window, min_oi, min_mid)
+    exps = oc.expiries_between(*dte)
+    max_width = max_width or 0.1 * S
+    if widths is None:
+        ks = np.unique(oc.ca.strike[c.quoted & (oc.ca.strike >= c.lo) & (oc.ca.strike <= c.hi)])
+        step = float(np.median(np.diff(ks))) if ks.size > 1 else max_width
+        widths = step * np.arange(1, 6)
+    widths = np.asarray([w for w in widths if w <= max_width], float)
+
+    blocks: List[_Block] = []
+    for e in exps:
+        c.theo(e)
+        if "vertical" in kinds: blocks += _verticals(c, e, max_width)
+        if "iron_condor" in kinds: blocks += _iron_condors(c, e, widths)
+        if "straddle" in kinds: blocks += _straddles(c, e)
+    if "calendar" in kinds:
+        for a, e1 in enumerate(exps):
+            for e2 in exps[a + 1:]:
+                blocks += _calendars(c, e1, e2)
+    for b in blocks:
+        ok = (np.abs(b.debit) >= min_net) & (b.max_profit >= min_rr * b.max_loss) & (b.pop >= min_pop)
+        if not ok.all():
+            b.legs, b.debit, b.max_profit, b.max_loss, b.pop, b.be = (
+                b.legs[ok], b.debit[ok], b.max_profit[ok], b.max_loss[ok], b.pop[ok], b.be[ok])
+    blocks = [b for b in blocks if b.debit.size and (only is None or b.kind in only)]
+    if not blocks:
+        return {"ok": True, "evaluated": 0, "candidates": [], "elapsedMs": round((time.perf_counter() - t0) * 1e3, 1)}
+
+    cat = lambda f: np.concatenate([f(b) for b in blocks])
+    ca = oc.ca
+    half = np.where(np.isfinite(ca.spread), ca.spread, ca.mid) / 2.0
+    blk = np.concatenate([np.full(b.debit.size, n) for n, b in enumerate(blocks)])
+    local = cat(lambda b: np.arange(b.debit.size))
+    mp, ml, pop = cat(lambda b: b.max_profit), cat(lambda b: b.max_loss), cat(lambda b: b.pop)
+    cost = cat(lambda b: half[b.legs].sum(axis=1))
+    min_oi_ = cat(lambda b: ca.oi[b.legs].min(axis=1))
+    ev = cat(lambda b: (c._theo[b.legs] * b.sides).sum(axis=1) - b.debit)
+    rr = mp / np.maximum(ml, 1e-9)
+    slip = cost / np.maximum(ml, 1e-9)
+    # model EV at mid, less the cost of crossing half the spread, per $ at risk
+    edge = np.nan_to_num((ev - cost) / np.maximum(ml, 1e-9), nan=-np.inf)
+    # composite order: mean percentile rank over R/R, POP, capital at risk, spread cost and EV edge
+    score = np.mean([_pct_rank(x) for x in (rr, pop, -ml, -slip, edge)], axis=0)
+
+    pool = np.argsort(-score, kind="stable")[:PARETO_POOL]
+    F = np.c_[rr[pool], pop[pool], -ml[pool], -slip[pool]]
+    front = pool[pareto_front(F)]
+    n_front = int(front.size)
+    front = front[np.argsort(-score[front], kind="stable")][:limit]
+
+    out = []
+    for g in front:
+        b, k = blocks[int(blk[g])], int(local[g])
+        out.append({
+            "strategy": b.kind,
+            "expiry": str(ca.expiry[b.legs[k, 0]]),
+            "legs": [{**oc.leg(int(row)), "action": "BUY" if s > 0 else "SELL"} for row, s in zip(b.legs[k], b.sides)],
+            "rows": [int(row) for row in b.legs[k]],
+            "debit": round(float(b.debit[k]), 4),
+            "maxProfit": round(float(mp[g]) * MULT, 2), "maxLoss": round(float(ml[g]) * MULT, 2),
+            "maxProfitUnbounded": b.unbounded,
+            "riskReward": round(float(rr[g]), 3), "pop": round(float(pop[g]), 4),
+            "breakevens": [round(float(x), 4) for x in b.be[k] if np.isfinite(x)],
+            "ev": round(float(ev[g]) * MULT, 2),
+            "spreadCost": round(float(cost[g]) * MULT, 2), "minOI": float(min_oi_[g]),
+            "edge": round(float(edge[g]), 4), "score": round(float(score[g]), 4),
+        })
+    return {"ok": True, "spot": S, "evaluated": int(edge.size), "paretoSize": n_front,
+            "candidates": out, "elapsedMs": round((time.perf_counter() - t0) * 1e3, 1)}
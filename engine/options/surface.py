@@ -0,0 +1,165 @@
+# engine/options/surface.py
+from __future__ import annotations
+import datetime as dt
+import threading, time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .chain import ChainArrays, normalize_chain
+
+# log-moneyness grid ln(K/S) the surface is tabulated on
+K_GRID = np.linspace(-0.5, 0.5, 41)
+_IV_MIN, _IV_MAX = 0.01, 5.0
+
+
+@dataclass
+class Smile:
+    """Quadratic IV smile in log-moneyness for one expiry; `spot` is the reference it was fit against."""
+    T: float
+    coef: np.ndarray
+    lo: float
+    hi: float
+    spot: float
+    key: int
+
+    def iv(self, K: np.ndarray) -> np.ndarray:
+        k = np.clip(np.log(np.asarray(K, float) / self.spot), self.lo, self.hi)
+        return np.clip(np.polyval(self.coef, k), _IV_MIN, _IV_MAX)
+
+
+def _quote_key(strike: np.ndarray, iv: np.ndarray, spot: float) -> int:
+    return hash((round(spot, 2), np.round(strike, 4).tobytes(), np.round(np.nan_to_num(iv), 4).tobytes()))
+
+
+def fit_smile(strike: np.ndarray, iv: np.ndarray, oi: np.ndarray, spot: float, T: float,
+              key: int = 0) -> Optional[Smile]:
+    """Weighted (sqrt OI) least-squares quadratic; degree drops with fewer quotes. Flat beyond the quoted range."""
+    k = np.log(strike / spot)
+    m = np.isfinite(k) & np.isfinite(iv) & (iv > _IV_MIN) & (iv < _IV_MAX) & (np.abs(k) <= K_GRID[-1])
+    if not m.any():
+        return None
+    k, v, w = k[m], iv[m], np.sqrt(np.nan_to_num(oi[m]) + 1.0)
+    deg = min(2, np.unique(k).size - 1)
+    coef = np.polyfit(k, v, deg, w=w) if deg > 0 else np.array([np.average(v, weights=w)])
+    return Smile(T, coef, float(k.min()), float(k.max()), float(spot), key)
+
+
+class VolSurface:
+    """
+    Per-expiry smiles plus a (tenor x log-moneyness) total-variance grid.
+    `iv(K, T)` is a bilinear lookup: linear in k, linear in total variance across tenor,
+    flat vol outside the listed tenors. Expiries with the same tenor (0DTE and 1DTE both
+    floor to one day) share one averaged grid row. `grid` is (spot, T, W), replaced in a
+    single assignment so lock-free readers never pair one fit's tenors with another's rows.
+    """
+
+    def __init__(self, symbol: str, *, today: Optional[dt.date] = None):
+        self.symbol = symbol.upper()
+        self.today = today
+        self.spot: Optional[float] = None
+        self.smiles: Dict[str, Smile] = {}
+        self.grid: Tuple[Optional[float], np.ndarray, np.ndarray] = (None, np.empty(0), np.empty((0, K_GRID.size)))
+        self.fitted_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.smiles)
+
+    def fit(self, chain: Any) -> int:
+        """Refit expiries whose quotes changed; returns how many smiles were refit."""
+        ca = chain if isinstance(chain, ChainArrays) else normalize_chain(chain)
+        spot = ca.underlying if ca.underlying and np.isfinite(ca.underlying) else self.spot
+        if not spot or not len(ca):
+            return 0
+        today = np.datetime64(self.today or dt.date.today(), "D")
+        refit, live = 0, set()
+        for e in np.unique(ca.expiry[~np.isnat(ca.expiry)]):
+            days = int((e - today).astype(int))
+            if days < 0:
+                continue
+            m = ca.expiry == e
+            # calls above spot, puts below: the liquid OTM wing on each side
+            m &= np.where(ca.is_call, ca.strike >= spot, ca.strike <= spot)
+            name, T = str(e), max(days, 1) / 365.0
+            key = _quote_key(ca.strike[m], ca.iv[m], float(spot))
+            old = self.smiles.get(name)
+            if old is not None and old.key == key:
+                old.T = T
+                live.add(name)
+                continue
+            s = fit_smile(ca.strike[m], ca.iv[m], ca.oi[m], float(spot), T, key)
+            if s is None:
+                continue
+            live.add(name)
+            self.smiles[name] = s
+            refit += 1
+        for name in set(self.smiles) - live:
+            del self.smiles[name]
+        self.spot = float(spot)
+        self.grid = self._grid(self.spot)
+        self.fitted_at = time.time()
+        return refit
+
+    def _grid(self, spot: float) -> Tuple[float, np.ndarray, np.ndarray]:
+        items = list(self.smiles.values())
+        K = spot * np.exp(K_GRID)
+        W = np.array([s.iv(K) ** 2 * s.T for s in items]).reshape(len(items), K_GRID.size)
+        T, row, n = np.unique([s.T for s in items], return_inverse=True, return_counts=True)
+        Wt = np.zeros((T.size, K_GRID.size))
+        np.add.at(Wt, row.ravel(), W)
+        return spot, T, Wt / np.maximum(n, 1)[:, None]
+
+    def iv(self, K: Any, T: Any) -> np.ndarray:
+        """Implied vol at strike(s) K and tenor(s) T (years); broadcasts."""
+        K, T = np.broadcast_arrays(np.asarray(K, float), np.asarray(T, float))
+        spot, Ts, W = self.grid
+        if not Ts.size:
+            return np.full(K.shape, np.nan)
+        k = np.clip(np.log(K / spot), K_GRID[0], K_GRID[-1])
+        x = (k - K_GRID[0]) / (K_GRID[1] - K_GRID[0])
+        j = np.clip(x.astype(int), 0, K_GRID.size - 2)
+        fx = x - j
+        vol = lambda i: np.sqrt(((1 - fx) * W[i, j] + fx * W[i, j + 1]) / Ts[i])
+        if Ts.size == 1:
+            return vol(np.zeros(K.shape, int))
+        Tc = np.clip(T, Ts[0], Ts[-1])
+        i = np.clip(np.searchsorted(Ts, Tc) - 1, 0, Ts.size - 2)
+        ft = (Tc - Ts[i]) / (Ts[i + 1] - Ts[i])
+        w = (1 - ft) * vol(i) ** 2 * Ts[i] + ft * vol(i + 1) ** 2 * Ts[i + 1]
+        return np.sqrt(w / Tc)
+
+    def atm_iv(self, T: float = 30 / 365.0) -> float:
+        spot = self.grid[0]
+        return float(self.iv(spot, T)) if spot else float("nan")
+
+
+class SurfaceCache:
+    """Process-wide {symbol: VolSurface} with TTL; stale entries refit only the expiries that moved."""
+
+    def __init__(self, *, ttl_sec: float = 120.0):
+        self.ttl_sec = ttl_sec
+        self._surfaces: Dict[str, VolSurface] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, symbol: str) -> Optional[VolSurface]:
+        return self._surfaces.get(symbol.upper())
+
+    def update(self, symbol: str, chain: Any) -> VolSurface:
+        sym = symbol.upper()
+        with self._lock:
+            vs = self._surfaces.get(sym)
+            if vs is None:
+                vs = self._surfaces[sym] = VolSurface(sym)
+            vs.fit(chain)
+            return vs
+
+    def get(self, symbol: str, loader: Optional[Callable[[str], Any]] = None) -> Optional[VolSurface]:
+        """Fresh surface for `symbol`; when missing or older than `ttl_sec`, refit from `loader(symbol)`."""
+        vs = self.peek(symbol)
+        if loader and (vs is None or not len(vs) or time.time() - vs.fitted_at > self.ttl_sec):
+            vs = self.update(symbol, loader(symbol))
+        return vs
+
+
+SURFACES = SurfaceCache()
@@ -1,6 +1,6 @@
 from typing import List, Dict, Any
-from adapters import polygon_adapter as poly
 from features.compute_features import build_features
+from engine.signals.universe import UNIVERSE
 
 def _z(x): return 0.0 if x is None else x
 
@@ -22,7 +22,7 @@ def rank(feats: Dict[str,Dict[str,Any]]):
     return sorted(out, key=lambda x:x['score'], reverse=True)
 
 def generate_picks(n:int=10)->List[Dict[str,Any]]:
-    universe=[u['symbol'] for u in poly.get_most_active(limit=100)]
+    universe=UNIVERSE.symbols()
     feats=build_features(universe)
     ranked=rank(feats)
     return ranked[:n]
@@ -0,0 +1,21 @@
+# engine/signals/ranking.py
+from __future__ import annotations
+import heapq
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def feature_matrix(feats: Dict[str, Dict[str, Any]], keys: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """{symbol: feature dict} -> (symbols, float matrix [n, len(keys)]); missing/None -> NaN."""
+    syms = list(feats)
+    X = np.array([[feats[s].get(k) if feats[s].get(k) is not None else np.nan for k in keys] for s in syms],
+                 dtype=float).reshape(len(syms), len(keys))
+    return syms, X
+
+
+def top_k(scores: np.ndarray, k: int, mask: np.ndarray | None = None) -> List[int]:
+    """Indices of the k best finite scores (descending, earlier index wins ties) via a bounded heap."""
+    ok = np.isfinite(scores) if mask is None else (mask & np.isfinite(scores))
+    idx = np.flatnonzero(ok)
+    return [int(i) for i in heapq.nlargest(int(k), idx.tolist(), key=lambda i: (scores[i], -i))]
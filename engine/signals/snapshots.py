@@ -0,0 +1,126 @@
+# engine/signals/snapshots.py
+from __future__ import annotations
+import datetime as dt
+import threading, time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pytz import timezone
+
+EASTERN = timezone("US/Eastern")
+
+
+def market_open(now: Optional[dt.datetime] = None) -> bool:
+    """Regular session, Mon-Fri 09:30-16:00 ET (exchange holidays not modelled)."""
+    t = (now or dt.datetime.now(EASTERN)).astimezone(EASTERN)
+    return t.weekday() < 5 and dt.time(9, 30) <= t.time() < dt.time(16, 0)
+
+
+class SnapshotStore:
+    """
+    Versioned results of a background job. `run` is overlap-protected (a second caller
+    returns immediately), readers get the latest snapshot in O(1) with age/staleness.
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Any], *, max_age_sec: float = 600.0, keep: int = 5):
+        self.name = name
+        self.compute = compute
+        self.max_age_sec = max_age_sec
+        self.history: deque = deque(maxlen=keep)
+        self.version = 0
+        self.last_error: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def run(self) -> bool:
+        """Compute and publish a new version; False if a run is already in flight or it failed."""
+        if not self._run_lock.acquire(blocking=False):
+            return False
+        try:
+            t0 = time.time()
+            try:
+                data = self.compute()
+            except Exception as e:
+                self.last_error = {"at": time.time(), "error": repr(e)}
+                return False
+            self.version += 1
+            self.history.append({"version": self.version, "asOf": time.time(),
+                                 "elapsedMs": round((time.time() - t0) * 1000.0, 1), "data": data})
+            self.last_error = None
+            return True
+        finally:
+            self._run_lock.release()
+
+    def refresh_async(self) -> bool:
+        """Kick `run` on a daemon thread unless one is already running."""
+        if self.running:
+            return False
+        threading.Thread(target=self.run, name=f"snapshot-{self.name}", daemon=True).start()
+        return True
+
+    def age(self) -> Optional[float]:
+        return (time.time() - self.history[-1]["asOf"]) if self.history else None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        if not self.history:
+            return None
+        s = self.history[-1]
+        age = time.time() - s["asOf"]
+        return {**s, "ageSec": round(age, 1), "stale": age > self.max_age_sec, "refreshing": self.running}
+
+    def meta(self) -> Dict[str, Any]:
+        """Snapshot fields without the payload (for embedding next to data)."""
+        s = self.latest()
+        base = {k: v for k, v in (s or {}).items() if k != "data"}
+        return {**base, "refreshing": self.running, "error": self.last_error}
+
+
+class SharedResults:
+    """
+    Results keyed by request parameters, shared across callers for `ttl_sec`. Concurrent
+    callers of a key that is being computed wait on the same computation (single flight).
+    """
+
+    def __init__(self, *, ttl_sec: float = 30.0, max_keys: int = 256):
+        self.ttl_sec = ttl_sec
+        self.max_keys = max_keys
+        self._done: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"computed": 0, "cached": 0, "joined": 0}
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+        """(value, {"source": computed|cached|joined, "ageSec"}); errors reach every joined caller."""
+        now = time.time()
+        with self._lock:
+            hit = self._done.get(key)
+            if hit is not None and now - hit[0] < self.ttl_sec:
+                self.stats["cached"] += 1
+                return hit[1], {"source": "cached", "ageSec": round(now - hit[0], 1)}
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+            else:
+                self.stats["joined"] += 1
+        if owner:
+            try:
+                value = compute()
+            except BaseException as e:
+                fut.set_exception(e)
+            else:
+                fut.set_result(value)
+                with self._lock:
+                    self._done[key] = (time.time(), value)
+                    self._done.move_to_end(key)
+                    while len(self._done) > self.max_keys:
+                        self._done.popitem(last=False)
+                    self.stats["computed"] += 1
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return fut.result(), {"source": "computed" if owner else "joined", "ageSec": 0.0}
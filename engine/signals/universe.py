@@ -0,0 +1,122 @@
+# engine/signals/universe.py
+from __future__ import annotations
+import os, threading, time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "universe.yaml"
+DEFAULTS = {"allowlist": [], "sector_leaders": {}, "fallback_most_actives": True, "universe_size": 100}
+
+
+def _most_actives(limit: int) -> List[Dict[str, Any]]:
+    from adapters import polygon_adapter as poly
+    return poly.get_most_active(limit=limit)
+
+
+class UniverseManager:
+    """
+    Scan universe from config/universe.yaml: allowlist, then sector leaders, then most-actives
+    (when `fallback_most_actives`) up to `universe_size`. The resolved list and per-symbol
+    metadata live in memory; `refresh` (scheduled) is the only path that hits the vendor, and
+    `check_config` rebuilds from the last most-actives pull when the file changes.
+    """
+
+    def __init__(self, path: Path | str = CONFIG_PATH, *,
+                 fetch_most_actives: Callable[[int], List[Dict[str, Any]]] = _most_actives):
+        self.path = Path(path)
+        self.fetch_most_actives = fetch_most_actives
+        self.config: Dict[str, Any] = dict(DEFAULTS)
+        self._mtime: Optional[float] = None
+        self._actives: List[Dict[str, Any]] = []
+        self._symbols: List[str] = []
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self.updated_at = 0.0
+        self.actives_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---- config ----
+    def _load_config(self) -> bool:
+        """Re-read the YAML if its mtime moved; True when the config changed."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+        self.config = {**DEFAULTS, **cfg}
+        self._mtime = mtime
+        return True
+
+    def _build(self) -> None:
+        cfg = self.config
+        size = int(cfg.get("universe_size") or DEFAULTS["universe_size"])
+        meta: Dict[str, Dict[str, Any]] = {}
+
+        def add(sym: Any, source: str, **kw) -> None:
+            s = str(sym or "").strip().upper()
+            if not s:
+                return
+            m = meta.setdefault(s, {"symbol": s, "sources": [], "sector": None, "volume": None})
+            m["sources"].append(source)
+            for k, v in kw.items():
+                if v is not None and m.get(k) is None:
+                    m[k] = v
+
+        for s in cfg.get("allowlist") or []:
+            add(s, "allowlist")
+        for sector, names in (cfg.get("sector_leaders") or {}).items():
+            for s in names or []:
+                add(s, "sector_leader", sector=sector)
+        if cfg.get("fallback_most_actives", True):
+            for a in self._actives:
+                if len(meta) >= size and str(a.get("symbol") or "").upper() not in meta:
+                    break
+                add(a.get("symbol"), "most_active", volume=a.get("volume"))
+        syms = list(meta)[:size]
+        for i, s in enumerate(syms):
+            meta[s]["rank"] = i
+        with self._lock:
+            self._symbols, self._meta = syms, {s: meta[s] for s in syms}
+            self.updated_at = time.time()
+
+    # ---- refresh paths ----
+    def refresh(self) -> int:
+        """Scheduled: reload config, pull most-actives, rebuild. Returns universe size."""
+        self._load_config()
+        if self.config.get("fallback_most_actives", True):
+            try:
+                got = self.fetch_most_actives(int(self.config.get("universe_size") or 100))
+                if got:
+                    self._actives, self.actives_at = list(got), time.time()
+            except Exception:
+                pass                       # keep the previous pull
+        self._build()
+        return len(self._symbols)
+
+    def check_config(self) -> bool:
+        """Cheap watch: rebuild from cached most-actives if the YAML changed."""
+        if self._load_config():
+            self._build()
+            return True
+        return False
+
+    # ---- readers (no I/O beyond a first config read) ----
+    def symbols(self, limit: Optional[int] = None) -> List[str]:
+        if not self.updated_at:
+            self.check_config() or self._build()
+        syms = self._symbols
+        return list(syms if limit is None else syms[:limit])
+
+    def meta(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self._meta.get((symbol or "").upper())
+
+    def status(self) -> Dict[str, Any]:
+        return {"size": len(self._symbols), "updatedAt": self.updated_at, "mostActivesAt": self.actives_at,
+                "config": str(self.path)}
+
+
+UNIVERSE = UniverseManager()
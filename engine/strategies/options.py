@@ -1,20 +1,23 @@
 from typing import Dict, Any, List
 import math
+from ..options.chain import OptionChain
+from ..options.search import search_strategies
 
 def pick_bull_call_spread(chain: List[Dict[str, Any]], spot: float, target_days=35, width=10) -> Dict[str, Any]:
-    # naive selector: buy ~0.35Δ call, sell strike +width
-    c = [o for o in chain if o["type"]=="CALL" and 15 <= o["dte"] <= 60]
-    if not c: return {}
-    c = sorted(c, key=lambda x: abs(x.get("delta",0.35)-0.35))
-    buy = c[0]
-    sell_strike = buy["strike"] + width
-    opp = sorted([o for o in c if o["strike"]==sell_strike and o["expiry"]==buy["expiry"]], key=lambda x: -x.get("delta",0))
-    if not opp: return {}
-    sell = opp[0]
-    debit = round(buy["mid"] - sell["mid"], 2)
-    max_profit = round(width - debit, 2)
+    # best bull call vertical (15-60 DTE, width <= `width`) from the vectorized strategy search
+    oc = chain if isinstance(chain, OptionChain) else OptionChain(chain)
+    ca = oc.ca
+    res = search_strategies(oc, spot=spot, kinds=("vertical",), only=("bull_call_spread",),
+                            dte=(15, 60), max_width=width, limit=1)
+    if not res["candidates"]: return {}
+    c = res["candidates"][0]
+    b, s = c["rows"]
+    buy, sell = (ca.raw[b], ca.raw[s]) if ca.raw else (oc.leg(b), oc.leg(s))
+    debit = round(c["debit"], 2)
+    max_profit = round(float(ca.strike[s] - ca.strike[b]) - debit, 2)
     rr = max_profit/debit if debit>0 else 0
     return {"strategy":"bull_call_spread","legs":[
         {"type":"CALL","action":"BUY", **buy},
         {"type":"CALL","action":"SELL",**sell},
-    ], "debit":debit,"max_profit":max_profit,"risk_reward":round(rr,2)}
+    ], "debit":debit,"max_profit":max_profit,"risk_reward":round(rr,2),
+        "pop":c["pop"],"breakevens":c["breakevens"]}
@@ -1,54 +1,121 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import os, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from .datasources.router import DataRouter
-from .features.technical import make_feats
+from .features.technical import make_feats, make_feats_panel
 from .strategies.options import pick_bull_call_spread
+from .options.chain import OptionChain
+from .options.search import search_strategies
+from .options.surface import SURFACES
 
-from typing import Dict, Any
-import pandas as pd
-from .datasources.router import DataRouter
-from .features.technical import make_feats
+BATCH_WORKERS = int(os.getenv("SUGGEST_BATCH_WORKERS", "8"))
+
+_router: Optional[DataRouter] = None
+_router_lock = threading.Lock()
+
+def shared_router() -> DataRouter:
+    """One DataRouter (sessions / connection pools, key checks) per process."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = DataRouter()
+        return _router
 
-def suggest_for_symbol(symbol: str, overrides: dict | None = None) -> Dict[str, Any]:
-    ds = DataRouter()
+def _err(symbol: str, kind: str, detail: str) -> Dict[str, Any]:
+    return {"error": kind, "detail": detail[:200], "ticker": symbol.upper()}
+
+def suggest_for_symbol(symbol: str, overrides: dict | None = None, *, ds: DataRouter | None = None) -> Dict[str, Any]:
+    ds = ds or DataRouter()
 
     # candles
     try:
         bars = ds.candles(symbol, "1d", 200)
     except Exception as e:
-        return {"error":"market_data_error","detail":f"candles: {str(e)[:200]}", "ticker": symbol.upper()}
+        return _err(symbol, "market_data_error", f"candles: {e}")
     df = pd.DataFrame(bars)
     if df.empty:
-        return {"error":"no_data","detail":"no candles returned", "ticker": symbol.upper()}
+        return _err(symbol, "no_data", "no candles returned")
 
-    feats = make_feats(df)
+    feats = make_feats(df).iloc[-1]
     spot = float(df.iloc[-1]["close"])
 
     # options chain
     try:
         chain = ds.options_chain(symbol)
     except Exception as e:
-        return {"error":"market_data_error","detail":f"options_chain: {str(e)[:200]}", "ticker": symbol.upper()}
+        return _err(symbol, "market_data_error", f"options_chain: {e}")
     if not chain:
-        return {"error":"no_data","detail":"empty options chain", "ticker": symbol.upper()}
+        return _err(symbol, "no_data", "empty options chain")
+    return _suggest_from(symbol, spot, feats, chain, overrides)
 
-    # (… keep your override/default strategy logic …)
-    return {"note":"stub strategy; plug in your logic", "ticker": symbol.upper(), "context":{"spot":spot,"iv_rank":float(feats.get("iv_rank",0))}}
+def suggest_batch(symbols: Iterable[str], overrides: dict | None = None, *,
+                  ds: DataRouter | None = None, max_workers: int = BATCH_WORKERS) -> Iterator[Dict[str, Any]]:
+    """
+    Suggestions for many symbols, yielded as each finishes. Candles and chains for every symbol
+    are fetched concurrently over one shared router; features are computed in one grouped pass
+    over all symbols' bars once the candles are in.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not syms:
+        return
+    try:
+        ds = ds or shared_router()
+    except Exception as e:
+        for s in syms:
+            yield _err(s, "market_data_error", f"router: {e}")
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, 2 * len(syms)))) as pool:
+        candles = {pool.submit(ds.candles, s, "1d", 200): s for s in syms}
+        chains = {pool.submit(ds.options_chain, s): s for s in syms}
+        frames: List[pd.DataFrame] = []
+        failed: Dict[str, Dict[str, Any]] = {}
+        for f in as_completed(candles):
+            s = candles[f]
+            try:
+                df = pd.DataFrame(f.result())
+            except Exception as e:
+                failed[s] = _err(s, "market_data_error", f"candles: {e}")
+                continue
+            if df.empty:
+                failed[s] = _err(s, "no_data", "no candles returned")
+            else:
+                frames.append(df.assign(symbol=s))
+        last = make_feats_panel(pd.concat(frames, ignore_index=True)).groupby("symbol").tail(1).set_index("symbol") \
+            if frames else pd.DataFrame()
+        for f in as_completed(chains):
+            s = chains[f]
+            if s in failed:
+                yield failed[s]
+                continue
+            try:
+                chain = f.result()
+            except Exception as e:
+                yield _err(s, "market_data_error", f"options_chain: {e}")
+                continue
+            if not chain:
+                yield _err(s, "no_data", "empty options chain")
+                continue
+            feats = last.loc[s]
+            try:
+                yield _suggest_from(s, float(feats["close"]), feats, chain, overrides)
+            except Exception as e:
+                yield _err(s, "strategy_error", str(e))
 
+def _suggest_from(symbol: str, spot: float, feats: pd.Series, chain: Any, overrides: dict | None) -> Dict[str, Any]:
     # --- override-aware path ---
     expiry = (overrides or {}).get("expiry")
     strike = (overrides or {}).get("strike")
     bias   = (overrides or {}).get("bias")  # "call" | "put" | None
 
     if expiry and strike and bias:
-        # pick nearest contract from chain
+        # exact (expiry, right, strike) lookup on the indexed chain
+        oc = OptionChain(chain)
         def pick(side):
             # chain rows should include: type ("call"/"put"), expiry, strike, bid, ask, mid
-            rows = [r for r in chain if str(r.get("expiry")) == str(expiry)
-                    and float(r.get("strike", 0)) == float(strike)
-                    and r.get("type") == side]
-            if not rows: return None
-            r = sorted(rows, key=lambda x: abs((x.get("bid",0)+x.get("ask",0))/2 - x.get("mid",0) or 0))[0]
+            i = oc.find(str(expiry), side, float(strike))
+            if i is None: return None
+            r = oc.ca.raw[i]
             mid = r.get("mid") or ( (r.get("bid") or 0) + (r.get("ask") or 0) )/2
             return {"type": side, "action": "buy", "strike": strike, "expiry": expiry, "qty": 1, "mid": float(mid)}
 
@@ -68,6 +135,30 @@ def suggest_for_symbol(symbol: str, overrides: dict | None = None) -> Dict[str,
                 "context": {"spot": spot, "iv_rank": float(feats.get('iv_rank', 0))},
             }
 
-    # --- default path (your existing strategy selection) ---
-    # ... keep your current heuristic here ...
-    return {"note":"no override matched; plug in your default strategy logic", "ticker": symbol.upper()}
+    # --- default path: vectorized search over verticals / condors / calendars / straddles ---
+    vs = SURFACES.peek(symbol)
+    res = search_strategies(chain, spot=spot, iv=vs.iv if vs else None, limit=10)
+    if not res["candidates"]:
+        return {"error":"no_candidates","detail":"no strategy passed the screens", "ticker": symbol.upper(),
+                "context": {"spot": spot, "iv_rank": float(feats.get('iv_rank', 0))}}
+    best, rest = res["candidates"][0], res["candidates"][1:]
+    legs = [{"type": l["type"].lower(), "action": l["action"].lower(), "strike": l["strike"], "expiry": l["expiry"],
+             "qty": 1, "mid": l["mid"]} for l in best["legs"]]
+    debit = best["debit"]
+    return {
+        "ticker": symbol.upper(),
+        "strategy": best["strategy"],
+        "legs": legs,
+        "debit": float(debit),
+        "max_profit": None if best["maxProfitUnbounded"] else best["maxProfit"],
+        "max_loss": best["maxLoss"],
+        "risk_reward": None if best["maxProfitUnbounded"] else best["riskReward"],
+        "pop": best["pop"],
+        "breakevens": best["breakevens"],
+        "entry_rule": f"{'Pay' if debit > 0 else 'Collect'} <= {abs(debit):.2f} net ({best['strategy']} exp {best['expiry']})",
+        "exits": {"stop_loss_pct": 50, "take_profit_pct": 100, "time_exit_days": 3},
+        "sizing": {"risk_usd": 300, "contracts": max(1, int(300 // max(best["maxLoss"], 1.0)))},
+        "context": {"spot": spot, "iv_rank": float(feats.get('iv_rank', 0)), "evaluated": res["evaluated"]},
+        "alternatives": [{k: c[k] for k in ("strategy", "expiry", "debit", "maxProfit", "maxLoss", "riskReward", "pop", "score")}
+                         for c in rest],
+    }
@@ -1,11 +1,125 @@
 # engine_gateway.py
 from __future__ import annotations
-import threading
-from typing import List, Dict, Any, Optional
+import heapq, itertools, logging, os, queue, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from engine.signals.snapshots import SharedResults
 
 class EngineUnavailable(RuntimeError):
     pass
 
+class MicroBatcher:
+    """
+    Coalesces concurrent calls into one `fn(items)` call. Requests queue up; a single worker
+    takes the first, keeps collecting until `max_batch` items or `max_wait_ms` after it, runs
+    `fn` on the concatenation and hands each caller its slice through a Future. `fn` must
+    return one result per item, in order; its exception goes to every caller in the batch.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], Sequence[Any]], *, max_batch: int = 64,
+                 max_wait_ms: float = 5.0, name: str = "microbatch"):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.stats = {"requests": 0, "items": 0, "batches": 0}
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, items: Sequence[Any]) -> Future:
+        fut: Future = Future()
+        items = list(items)
+        if not items:
+            fut.set_result([])
+            return fut
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._worker.start()
+        self._q.put((items, fut))
+        return fut
+
+    def __call__(self, items: Sequence[Any], timeout: Optional[float] = None) -> List[Any]:
+        return self.submit(items).result(timeout)
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            n = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while n < self.max_batch:
+                left = deadline - time.perf_counter()
+                if left <= 0:
+                    break
+                try:
+                    nxt = self._q.get(timeout=left)
+                except queue.Empty:
+                    break
+                batch.append(nxt)
+                n += len(nxt[0])
+            self._run(batch)
+
+    def _run(self, batch: List[Any]) -> None:
+        flat = [x for items, _ in batch for x in items]
+        self.stats["requests"] += len(batch)
+        self.stats["items"] += len(flat)
+        self.stats["batches"] += 1
+        try:
+            out = list(self.fn(flat))
+            if len(out) != len(flat):
+                raise EngineUnavailable(f"batch returned {len(out)} results for {len(flat)} items")
+        except BaseException as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        i = 0
+        for items, fut in batch:
+            fut.set_result(out[i:i + len(items)])
+            i += len(items)
+
+
+class Deadlines:
+    """
+    One daemon thread that runs callbacks at their deadlines, shared by every request
+    instead of a Timer thread each. Callbacks must be quick and idempotent; an entry is
+    never cancelled, it just fires late into a request that has already moved on.
+    """
+
+    def __init__(self, name: str = "deadlines"):
+        self.name = name
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, fn: Callable[[], None]) -> None:
+        with self._cond:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._worker.start()
+            heapq.heappush(self._heap, (time.perf_counter() + delay, next(self._seq), fn))
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.perf_counter():
+                    self._cond.wait(self._heap[0][0] - time.perf_counter() if self._heap else None)
+                fn = heapq.heappop(self._heap)[2]
+            try:
+                fn()
+            except Exception as e:
+                logging.warning("%s callback failed: %r", self.name, e)
+
+_DEADLINES = Deadlines("gateway-deadlines")
+
+
+def _fetch_features(symbol: str) -> Dict[str, Any]:
+    from engine.datasources.integrations.schwab_adapter import fetch_features
+    return fetch_features(os.getenv("ENGINE_GATEWAY_UID", "demo-user"), symbol)
+
 class EngineGateway:
     """
     Thread-safe, lazy-loaded wrapper around your AI engine.
@@ -15,11 +129,25 @@ class EngineGateway:
     _instance: Optional["EngineGateway"] = None
     _lock = threading.Lock()
 
-    def __init__(self) -> None:
+    def __init__(self, engine: Any = None, *,
+                 features_fn: Callable[[str], Dict[str, Any]] = _fetch_features) -> None:
         self._engine = None
         self._loaded = False
         self._load_error: Optional[str] = None
-        self._load_engine()
+        self._features_fn = features_fn
+        self.feature_timeout = float(os.getenv("ENGINE_FEATURE_TIMEOUT_SEC", "2"))
+        self._io = ThreadPoolExecutor(max_workers=int(os.getenv("ENGINE_GATEWAY_IO_WORKERS", "8")),
+                                      thread_name_prefix="gateway-io")
+        # one fetch per symbol across concurrent requests, reused for a few seconds
+        self._features = SharedResults(ttl_sec=float(os.getenv("ENGINE_FEATURE_TTL_SEC", "15")))
+        # only the model call is micro-batched; feature I/O happens before enqueueing
+        self._signals = MicroBatcher(self._infer, max_batch=int(os.getenv("ENGINE_BATCH_MAX", "64")),
+                                     max_wait_ms=float(os.getenv("ENGINE_BATCH_WAIT_MS", "5")),
+                                     name="gateway-signals")
+        if engine is not None:
+            self._engine, self._loaded = engine, True
+        else:
+            self._load_engine()
 
     @classmethod
     def instance(cls) -> "EngineGateway":
@@ -31,10 +159,7 @@ class EngineGateway:
     # ---- internal ---------------------------------------------------------
     def _load_engine(self) -> None:
         try:
-            # TODO: Adjust these imports to your actual engine modules
-            # Examples seen in your codebase: StrategyConfig, PocketOptionsAIEngine, etc.
-            from ai.pocket_option_ai_engine import PocketOptionsAIEngine  # <-- adjust if different
-            from ai.strategy_config import StrategyConfig                  # <-- adjust if different
+            from pocket_option_ai_engine import PocketOptionsAIEngine, StrategyConfig
 
             cfg = StrategyConfig()  # or StrategyConfig.from_env()
             self._engine = PocketOptionsAIEngine(cfg)
@@ -49,54 +174,97 @@ class EngineGateway:
         if not self._loaded or self._engine is None:
             raise EngineUnavailable(self._load_error or "engine not loaded")
 
+    def _infer(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Batch body: one engine call over the feature rows of every coalesced request."""
+        try:
+            return self._engine.propose_batch(rows)
+        except Exception as e:
+            raise EngineUnavailable(f"Inference failed: {e}")
+
+    def _fetch(self, symbol: str) -> Dict[str, Any]:
+        return self._features.get(symbol, lambda: self._features_fn(symbol) or {})[0]
+
+    def _row(self, symbol: str, fut: Future) -> Dict[str, Any]:
+        """Fetched features, or {} (engine holds) when the fetch failed or ran past the timeout."""
+        if not fut.done():
+            logging.warning("gateway features for %s timed out after %.1fs; engine will hold", symbol,
+                            self.feature_timeout)
+            return {}
+        if fut.exception() is not None:
+            logging.warning("gateway features for %s failed: %r; engine will hold", symbol, fut.exception())
+            return {}
+        return fut.result()
+
+    def signals_future(self, symbols: List[str]) -> Future:
+        """
+        Engine actions for `symbols` (one per symbol). Features are fetched concurrently for
+        this request (time-boxed by `feature_timeout`), then the rows join the next
+        micro-batch. Never blocks the caller.
+        """
+        self._ensure_ready()
+        out: Future = Future()
+        uniq = list(dict.fromkeys(symbols))
+        if not uniq:
+            out.set_result([])
+            return out
+        futs = {s: self._io.submit(self._fetch, s) for s in uniq}
+        state = {"left": len(uniq), "sent": False}
+        lock = threading.Lock()
+
+        def deliver(bf: Future) -> None:
+            if bf.exception() is not None:
+                out.set_exception(bf.exception())
+                return
+            by_sym = dict(zip(uniq, bf.result()))
+            out.set_result([by_sym[s] for s in symbols])
+
+        def enqueue() -> None:
+            with lock:
+                if state["sent"]:
+                    return
+                state["sent"] = True
+            self._signals.submit([self._row(s, futs[s]) for s in uniq]).add_done_callback(deliver)
+
+        def fetched(_: Future) -> None:
+            with lock:
+                state["left"] -= 1
+                last = state["left"] == 0
+            if last:
+                enqueue()
+
+        _DEADLINES.call_later(self.feature_timeout, enqueue)
+        for f in futs.values():
+            f.add_done_callback(fetched)
+        return out
+
+    @staticmethod
+    def to_signals(symbols: List[str], actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Actionable (CALL/PUT) signals; HOLDs are dropped."""
+        return [{"symbol": s, "side": a["side"], "confidence": float(a.get("confidence", 0.5)),
+                 "expires_in_min": 15}
+                for s, a in zip(symbols, actions) if a.get("type") == "SINGLE"]
+
+    @staticmethod
+    def to_proposals(symbols: List[str], actions: List[Dict[str, Any]], risk_budget: float) -> List[Dict[str, Any]]:
+        sigs = EngineGateway.to_signals(symbols, actions)
+        size = min(100.0, risk_budget / max(1, len(symbols)))   # per-symbol split of the budget
+        return [{**sg, "size": size} for sg in sigs]
+
     # ---- public API -------------------------------------------------------
     def health(self) -> Dict[str, Any]:
         return {
             "loaded": self._loaded,
             "error": self._load_error,
             "engine": type(self._engine).__name__ if self._engine else None,
+            "batching": {**self._signals.stats, "maxBatch": self._signals.max_batch,
+                         "maxWaitMs": self._signals.max_wait * 1000.0},
+            "features": {**self._features.stats, "timeoutSec": self.feature_timeout},
         }
 
     def get_option_signals(self, symbols: List[str]) -> List[Dict[str, Any]]:
-        """
-        Map to your engine’s real inference method.
-        Return a JSON-serializable list of signals.
-        """
-        self._ensure_ready()
-
-        # EXAMPLE ONLY: adapt this to your engine’s method name & return schema
-        # For instance, maybe you have: self._engine.signals_for(symbols)
-        try:
-            # result = self._engine.signals_for(symbols)
-            # return result
-            # Temporary stand-in if the above method differs:
-            out = []
-            for s in symbols:
-                # Replace with actual engine outputs
-                out.append({
-                    "symbol": s,
-                    "side": "CALL",
-                    "confidence": 0.70,
-                    "expires_in_min": 15,
-                })
-            return out
-        except Exception as e:
-            raise EngineUnavailable(f"Inference failed: {e}")
+        """Blocking form of `signals_future`, mapped to JSON-serializable signals."""
+        return self.to_signals(symbols, self.signals_future(symbols).result())
 
     def propose_trades(self, symbols: List[str], risk_budget: float) -> List[Dict[str, Any]]:
-        """
-        Map to your engine’s proposal method.
-        """
-        self._ensure_ready()
-        try:
-            # result = self._engine.propose(symbols=symbols, risk_budget=risk_budget)
-            # return result
-            return [{
-                "symbol": s,
-                "side": "CALL",
-                "size": min(100.0, risk_budget / max(1, len(symbols))),  # example sizing
-                "confidence": 0.66,
-                "expires_in_min": 15,
-            } for s in symbols]
-        except Exception as e:
-            raise EngineUnavailable(f"Proposal failed: {e}")
+        """Signals sized from `risk_budget`; the model work is shared with concurrent signal calls."""
+        return self.to_proposals(symbols, self.signals_future(symbols).result(), risk_budget)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from fastapi import FastAPI, HTTPException, Query
+import asyncio
 import anyio
 
 from engine_gateway import EngineGateway, EngineUnavailable
@@ -36,9 +37,9 @@ async def get_option_signals(symbols: Optional[str] = Query(None, description="C
     gw = await _get_gateway()
     syms = [s.strip().upper() for s in (symbols or "AAPL,MSFT,NVDA").split(",") if s.strip()]
     try:
-        # Run blocking engine call in a worker thread
-        result = await anyio.to_thread.run_sync(gw.get_option_signals, syms)
-        return [OptionSignal(**r) for r in result]
+        # micro-batched with concurrent requests; awaiting the future holds no worker thread
+        actions = await asyncio.wrap_future(gw.signals_future(syms))
+        return [OptionSignal(**r) for r in gw.to_signals(syms, actions)]
     except EngineUnavailable as e:
         raise HTTPException(status_code=503, detail=str(e))
 
@@ -47,7 +48,7 @@ async def propose(req: ProposeRequest):
     gw = await _get_gateway()
     syms = [s.strip().upper() for s in req.symbols if s.strip()]
     try:
-        result = await anyio.to_thread.run_sync(gw.propose_trades, syms, req.risk_budget)
+        result = gw.to_proposals(syms, await asyncio.wrap_future(gw.signals_future(syms)), req.risk_budget)
         # Reuse OptionSignal for simplicity; or create a richer Proposal model with size/price/etc.
         return [OptionSignal(**{k: v for k, v in r.items() if k in OptionSignal.model_fields}) for r in result]
     except EngineUnavailable as e:
@@ -5,6 +5,8 @@ from adapters import schwab_async as schwab
 from adapters import tradier_async as trad
 from adapters import unusualwhales_async as uw
 from utils import iv_cache
+from engine.options.chain import normalize_chain, atm_ivs
+from engine.options.iv import fill_greeks
 
 def ema(series: List[float], span: int) -> float:
     if not series or len(series) < span: return float('nan')
@@ -29,19 +31,14 @@ def spread_score_from_snap(bid: Optional[float], ask: Optional[float]) -> float:
     if bps>=40: return 0.0
     return max(0.0, min(1.0, 1-(bps-15)/25.0))
 
-def iv_percentile_proxy(chain: dict) -> float:
+def iv_percentile_proxy(chain: dict, spot: Optional[float] = None) -> float:
     try:
-        options = chain.get('options', {}).get('option', [])
-        if not isinstance(options, list) or len(options) < 10: return 0.5
-        ivs=[]; 
-        for opt in options:
-            g=opt.get('greeks',{}); iv=g.get('mid_iv') or g.get('iv'); delta=g.get('delta')
-            if iv is None or delta is None: continue
-            if abs(abs(float(delta)) - 0.5) < 0.15: ivs.append(float(iv))
-        if not ivs: return 0.5
+        ca = fill_greeks(normalize_chain(chain), spot=spot)
+        if len(ca) < 10: return 0.5
+        ivs = atm_ivs(ca, 0.15)
+        if not ivs.size: return 0.5
         curr=float(np.median(ivs))
-        pct=sum(1 for x in ivs if x<=curr)/len(ivs)
-        return float(pct)
+        return float(np.count_nonzero(ivs<=curr)/ivs.size)
     except Exception: return 0.5
 
 def zscore_last(values: List[float]) -> float:
@@ -96,6 +93,11 @@ async def build_features(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
     for s in symbols:
         flow_map[s] = await uw.flow_series(s, 20)
 
+    def _snap_mid(sym:str)->Optional[float]:
+        s=snaps.get(sym) or {}
+        b,a=s.get('bid'),s.get('ask')
+        return (float(b)+float(a))/2.0 if b and a else None
+
     async def ivp_for_symbol(sym:str)->float:
         exps = await trad.expirations(sym)
         if not exps: return 0.5
@@ -110,16 +112,8 @@ async def build_features(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         ch=await trad.chain(sym, target, greeks=True)
         if not ch: return 0.5
         # derive current ATM-ish IV
-        options=ch.get('options',{}).get('option',[])
-        ivs=[]; 
-        for o in options:
-            g=o.get('greeks',{}); iv=g.get('mid_iv') or g.get('iv'); delta=g.get('delta')
-            try:
-                if iv is None or delta is None: continue
-                if abs(abs(float(delta))-0.5)<0.15: ivs.append(float(iv))
-            except Exception: 
-                continue
-        curr_iv = float(np.median(ivs)) if ivs else 0.0
+        ivs = atm_ivs(fill_greeks(normalize_chain(ch), spot=_snap_mid(sym)), 0.15)
+        curr_iv = float(np.median(ivs)) if ivs.size else 0.0
         if curr_iv<=0: return 0.5
         # update cache and compute percentile on history
         asof = str(today)
@@ -1,7 +1,34 @@
 import React from "react"
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer } from "recharts"
 
+function fromRisk(risk: any) {
+  // server risk profile: P/L at first expiry plus today's curve from the price x days surface
+  const { prices, pl } = risk.surface
+  return prices.map((s:number, i:number) => ({ spot: s, payoff: pl[pl.length-1][i], today: pl[0][i] }))
+}
+
 export default function PayoffChart({ suggestion }: { suggestion: any }) {
+  const risk = suggestion?.risk
+  if (risk?.ok && risk.surface) {
+    const data = fromRisk(risk)
+    return (
+      <div className="p-4 border rounded-2xl bg-white shadow-sm">
+        <div className="font-semibold mb-2">
+          Payoff · Max Profit: {risk.maxProfitUnbounded ? "∞" : risk.maxProfit} · Max Loss: {risk.maxLossUnbounded ? "∞" : risk.maxLoss}
+          {risk.breakevens?.length ? ` · BE: ${risk.breakevens.join(", ")}` : ""}
+        </div>
+        <ResponsiveContainer width="100%" height={280}>
+          <LineChart data={data}>
+            <XAxis dataKey="spot" />
+            <YAxis />
+            <Tooltip />
+            <Line type="monotone" dataKey="payoff" dot={false} />
+            <Line type="monotone" dataKey="today" dot={false} strokeDasharray="4 4" />
+          </LineChart>
+        </ResponsiveContainer>
+      </div>
+    )
+  }
   if (!suggestion?.legs) return null
   // Stub: plot payoff vs spot around strikes
   const strikes = suggestion.legs.map((l:any)=>l.strike).filter(Boolean)
@@ -1,7 +1,7 @@
 # pocket_option_ai_engine.py
 from __future__ import annotations
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from ai import AIEngine  # requires ai/__init__.py to export AIEngine
 
 class StrategyConfig(dict):
@@ -21,3 +21,7 @@ class PocketOptionsAIEngine:
         Returns: {"type":"HOLD"| "SINGLE", "side"?: "CALL"|"PUT", "confidence": float, ...}
         """
         return self._engine.propose(symbol=symbol, features=features, spot=spot)
+
+    def propose_batch(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One decision per feature dict, scored in a single model call."""
+        return self._engine.propose_batch(features)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import os, sys, time, json, logging, sqlite3
+import os, sys, time, json, logging, sqlite3, threading
 from pathlib import Path
 from functools import wraps
 
@@ -67,12 +67,65 @@ app.jinja_loader = ChoiceLoader([
 ])
 scheduler = None  # global
 
+EXPECTED_MOVE_REFRESH_MIN = int(os.getenv("EXPECTED_MOVE_REFRESH_MIN", "5"))
+
+def _expected_move_symbols():
+    """Watchlists (bot + options bot) plus the resolved scan universe the picks/signals pipeline uses."""
+    syms = set(AI_BOT.get("symbols") or [])
+    try: syms |= set(options_ai_bot.symbols)
+    except NameError: pass
+    from engine.signals.universe import UNIVERSE
+    syms |= set(UNIVERSE.symbols())
+    return sorted(s.upper() for s in syms if s)
+
+def _refresh_expected_moves():
+    from engine.options.expected_move import refresh
+    try:
+        refresh(_expected_move_symbols())
+    except Exception as e:
+        logging.warning("expected-move refresh failed: %r", e)
+
+UNIVERSE_REFRESH_MIN = int(os.getenv("UNIVERSE_REFRESH_MIN", "30"))
+
+def _refresh_universe(config_only: bool = False):
+    from engine.signals.universe import UNIVERSE
+    try:
+        UNIVERSE.check_config() if config_only else UNIVERSE.refresh()
+    except Exception as e:
+        logging.warning("universe refresh failed: %r", e)
+
+PICKS_REFRESH_MIN = int(os.getenv("PICKS_REFRESH_MIN", "5"))
+PICKS_OFFHOURS_MAX_AGE_SEC = int(os.getenv("PICKS_OFFHOURS_MAX_AGE_SEC", str(6 * 3600)))
+
+def _precompute_picks():
+    """Picks + default signals: every interval in RTH; off-hours only when missing or very old."""
+    from engine.signals.snapshots import market_open
+    rth = market_open()
+    for store in (PICKS, SIGNALS):
+        age = store.age()
+        if rth or age is None or age > PICKS_OFFHOURS_MAX_AGE_SEC:
+            store.run()
+
 def _start_scheduler_once():
+    import datetime as _dt
     global scheduler
     if scheduler is None or not scheduler.running:
         scheduler = BackgroundScheduler(daemon=True)
-        # Example job wiring (only if you actually have these funcs):
-        # scheduler.add_job(my_periodic_task, 'interval', minutes=5, id='my_periodic_task', replace_existing=True)
+        first = _dt.datetime.now() + _dt.timedelta(seconds=5)     # let the module finish importing
+        # straddle-implied expected moves / σ-cones, read by suggestions, checklist audit and paper preview
+        scheduler.add_job(_refresh_expected_moves, 'interval', minutes=EXPECTED_MOVE_REFRESH_MIN,
+                          id='expected_moves', replace_existing=True, max_instances=1, coalesce=True,
+                          next_run_time=first)
+        # scan universe (config/universe.yaml + most-actives); file edits picked up within 30s
+        scheduler.add_job(_refresh_universe, 'interval', minutes=UNIVERSE_REFRESH_MIN,
+                          id='universe', replace_existing=True, max_instances=1, coalesce=True,
+                          next_run_time=first)
+        scheduler.add_job(_refresh_universe, 'interval', seconds=30, kwargs={"config_only": True},
+                          id='universe_config_watch', replace_existing=True, max_instances=1, coalesce=True)
+        # versioned pick/signal snapshots served by /api/ai_picks and /api/ai/options/signals
+        scheduler.add_job(_precompute_picks, 'interval', minutes=PICKS_REFRESH_MIN,
+                          id='picks_precompute', replace_existing=True, max_instances=1, coalesce=True,
+                          next_run_time=first + _dt.timedelta(seconds=10))
         scheduler.start()
 
 # Call this AFTER app is created and configured, but BEFORE app.run():
@@ -401,15 +454,27 @@ for _folder in ["assets","css","js","img","images","fonts","media","static"]:
 
 from flask import request, jsonify
 
+from engine.signals.snapshots import SnapshotStore
+
+PICKS_N = int(os.getenv("PICKS_N", "10"))
+
+def _compute_picks():
+    import asyncio
+    from engine.signals.generate_picks_live import generate_picks_live
+    return asyncio.run(generate_picks_live(PICKS_N))
+
+PICKS = SnapshotStore("picks", _compute_picks, max_age_sec=2 * 60 * PICKS_REFRESH_MIN)
+
 @app.get("/api/ai_picks")
 def api_ai_picks():
-    # Return a tiny sample so the page can render something
+    # latest precomputed snapshot; ?refresh=1 (or a stale/missing one) kicks a background run
+    snap = PICKS.latest()
+    if request.args.get("refresh") in ("1", "true") or snap is None or snap["stale"]:
+        PICKS.refresh_async()
     return jsonify({
-        "picks": [
-            {"symbol": "AAPL", "side": "BUY", "confidence": 0.71},
-            {"symbol": "MSFT", "side": "SELL", "confidence": 0.58},
-        ],
-        "ts": int(time.time())
+        "picks": snap["data"] if snap else [],
+        "ts": int(snap["asOf"]) if snap else int(time.time()),
+        "snapshot": PICKS.meta(),
     })
 
 @app.get("/api/audit/summary")
@@ -430,9 +495,42 @@ def api_orders():
 def api_positions():
     return jsonify({"positions": []})
 
+from engine.options.portfolio import PORTFOLIOS, positions_from_schwab
+
+def _schwab_marks(quotes) -> dict:
+    """Schwab quotes payload -> {symbol: mark/last}."""
+    out = {}
+    for sym, q in (quotes or {}).items():
+        qq = (q or {}).get("quote") or q or {}
+        px = qq.get("mark") or qq.get("lastPrice") or qq.get("closePrice")
+        if px: out[sym.upper()] = float(px)
+    return out
+
+def _surface_iv(symbol, K, T):
+    from engine.options.surface import SURFACES
+    vs = SURFACES.peek(symbol)
+    return vs.iv(K, T) if vs is not None and len(vs) else None
+
 @app.get("/api/positions/risk")
 def api_positions_risk():
-    return jsonify({"maxRisk": 0, "exposure": 0, "notes": []})
+    """Net delta/gamma/vega/theta by symbol and total, plus spot x vol shock P/L (cached per account snapshot)."""
+    uid = getattr(current_user, "id", None)
+    if not uid or not getattr(current_user, "is_authenticated", False):
+        return jsonify({"maxRisk": 0, "exposure": 0, "notes": ["sign in to load positions"]})
+    try:
+        c = SchwabClient(uid)
+        acct = request.args.get("account_id")
+        loader = ((lambda: positions_from_schwab(c.positions(acct))) if acct
+                  else (lambda: positions_from_schwab(c.accounts(fields="positions"))))
+        pr = PORTFOLIOS.load(f"{uid}:{acct or '*'}", loader)
+        syms = [s for s in pr.symbols.tolist() if s]
+        if syms:
+            # only legs on underlyings whose mark moved are re-priced
+            pr.update_quotes(_schwab_marks(c.quotes(syms)), iv=_surface_iv)
+        return jsonify({**pr.report(), "notes": []})
+    except Exception as e:
+        logging.warning("positions risk failed: %r", e)
+        return jsonify({"maxRisk": 0, "exposure": 0, "notes": [f"risk unavailable: {e}"]})
 
 @app.post("/api/order/cancel")
 def api_order_cancel():
@@ -776,14 +874,21 @@ def _quote_last(symbol: str) -> Optional[float]:
 # if str(BASE_DIR) not in sys.path: sys.path.insert(0, str(BASE_DIR))
 
 # engine-backed suggestion (no AIEngine class)
-from engine.suggest import suggest_for_symbol  # C:\AI Advisor\engine\suggest.py
+from engine.suggest import suggest_for_symbol, shared_router  # C:\AI Advisor\engine\suggest.py
+from concurrent.futures import ThreadPoolExecutor
+
+# bounded pool shared by every OptionsAIBot request (engine evals + quotes are I/O bound)
+OPT_BOT_WORKERS = int(os.getenv("OPT_BOT_WORKERS", "8"))
+_OPT_BOT_POOL = ThreadPoolExecutor(max_workers=OPT_BOT_WORKERS, thread_name_prefix="opt-bot")
 
 def _engine_side_conf(symbol: str) -> Optional[dict]:
     """
     Normalize your engine output to {"side","confidence","suggestion"} for reuse.
     """
     try:
-        s = suggest_for_symbol(symbol)  # returns rich dict
+        try: ds = shared_router()
+        except Exception: ds = None
+        s = suggest_for_symbol(symbol, ds=ds)  # returns rich dict
         strat = (s.get("strategy") or "").lower()
         if any(k in strat for k in ("call", "debit")):
             side = "BUY"
@@ -813,13 +918,15 @@ OPT_DEFAULT_QTY   = int(os.getenv("OPT_DEFAULT_QTY", 1))
 OPT_ENABLE_STAGE  = os.getenv("OPT_ENABLE_STAGE", "false").lower() == "true"
 PAPER_MODE        = os.getenv("PAPER_MODE", "true").lower() == "true"  # you already inject via context
 
+_UNSET = object()   # _signal_for: "engine not evaluated yet" (a pooled None is a final answer)
+
 class OptionsAIBot:
     def __init__(self, symbols: List[str]): self.symbols = symbols
 
-    def _signal_for(self, sym: str):
-        sig = _engine_side_conf(sym)
+    def _signal_for(self, sym: str, last=None, sig=_UNSET):
+        if sig is _UNSET: sig = _engine_side_conf(sym)
         if sig: return sig
-        last = _quote_last(sym)
+        last = last if last is not None else _quote_last(sym)
         if last is None: return None
         side = "BUY" if int(time.time()) % 2 == 0 else "SELL"
         return {"side": side, "confidence": 0.55, "suggestion": None}
@@ -836,12 +943,17 @@ class OptionsAIBot:
         dte = dte or OPT_DEFAULT_DTE
         target_delta = target_delta or OPT_TARGET_DELTA
         qty = qty or OPT_DEFAULT_QTY
+        syms = list(dict.fromkeys(self.symbols))
+        # one quote and one engine eval per symbol, all in flight at once; latency ~ slowest symbol
+        quotes = {s: _OPT_BOT_POOL.submit(_quote_last, s) for s in syms}
+        engine = {s: _OPT_BOT_POOL.submit(_engine_side_conf, s) for s in syms}
         out = []
-        for sym in self.symbols:
-            sig = self._signal_for(sym)
-            if not sig: continue
-            last = _quote_last(sym)
+        for sym in syms:
+            try: last = quotes[sym].result()
+            except Exception: last = None
             if last is None: continue
+            sig = self._signal_for(sym, last=last, sig=engine[sym].result())
+            if not sig: continue
             side = sig["side"].upper()
             conf = float(sig.get("confidence", 0.5))
             sel  = self._select_contract(last, side, dte, target_delta)
@@ -852,13 +964,28 @@ class OptionsAIBot:
                 "confidence": round(conf, 3),
                 "order": {"right": sel["right"], "strike": sel["strike"], "expiry": sel["expiry_hint"], "qty": qty},
                 "selection": {"method": "engine+heuristic", "target_delta": sel["target_delta"]},
-                "engine": sig.get("suggestion")
+                "engine": sig.get("suggestion"),
+                "expected_move": _expected_move(sym, dte=dte),
             })
         return out
 
 # Instantiate with your default watchlist
 options_ai_bot = OptionsAIBot(["AAPL","MSFT","NVDA","SPY"])
 
+# default-watchlist ideas, precomputed by the scheduler (see _precompute_picks)
+SIGNALS = SnapshotStore("signals", lambda: options_ai_bot.suggestions(), max_age_sec=2 * 60 * PICKS_REFRESH_MIN)
+
+# cross-user ideas for non-snapshot requests: keyed by params + engine version, single flight, short TTL
+from engine.signals.snapshots import SharedResults
+OPT_ENGINE_VERSION = os.getenv("OPT_ENGINE_VERSION", "AI_options_v1")
+SHARED_SIGNALS = SharedResults(ttl_sec=float(os.getenv("OPT_SIGNALS_TTL_SEC", "30")))
+
+def _shared_ideas(symbols, dte, tdelta, qty):
+    key = (tuple(sorted({s.upper() for s in symbols})), dte, round(tdelta, 4), OPT_ENGINE_VERSION)
+    ideas, meta = SHARED_SIGNALS.get(key, lambda: OptionsAIBot(list(key[0])).suggestions(dte=dte, target_delta=tdelta, qty=qty))
+    # qty is per request; the shared ideas are never mutated
+    return [{**i, "order": {**i["order"], "qty": qty}} for i in ideas], meta
+
 @app.route("/api/ai/options/signals")
 @login_required
 def api_ai_options_signals():
@@ -871,9 +998,16 @@ def api_ai_options_signals():
         syms_arg = (request.args.get("symbols") or "").replace(" ", "")
         symbols = [s for s in syms_arg.split(",") if s] or options_ai_bot.symbols
 
-        # Run ideas for the requested list
-        bot = OptionsAIBot(symbols)
-        ideas = bot.suggestions(dte=dte, target_delta=tdelta, qty=qty)
+        # Default request -> latest snapshot (O(1)); anything else is computed for the request
+        default = (not syms_arg and dte == OPT_DEFAULT_DTE and tdelta == OPT_TARGET_DELTA and qty == OPT_DEFAULT_QTY)
+        snap = SIGNALS.latest() if default else None
+        if default and (request.args.get("refresh") in ("1", "true") or snap is None or snap["stale"]):
+            SIGNALS.refresh_async()
+        shared = None
+        if snap is not None:
+            ideas = snap["data"]
+        else:
+            ideas, shared = _shared_ideas(symbols, dte, tdelta, qty)
 
         # Optional: auto-stage (paper only)
         staged = []
@@ -901,7 +1035,8 @@ def api_ai_options_signals():
             finally:
                 conn.close()
 
-        return jsonify({"ideas": ideas, "staged": staged, "paper_mode": PAPER_MODE, "auto_stage": OPT_ENABLE_STAGE})
+        return jsonify({"ideas": ideas, "staged": staged, "paper_mode": PAPER_MODE, "auto_stage": OPT_ENABLE_STAGE,
+                        "snapshot": SIGNALS.meta() if snap is not None else None, "shared": shared})
     except Exception as e:
         logging.exception("api_ai_options_signals failed")
         return jsonify({"detail": str(e)}), 500
@@ -914,6 +1049,7 @@ def api_ai_options_config():
     if "dte" in body:   OPT_DEFAULT_DTE   = max(0, int(body["dte"]))
     if "delta" in body: OPT_TARGET_DELTA  = max(0.05, min(0.95, float(body["delta"])))
     if "qty" in body:   OPT_DEFAULT_QTY   = max(1, int(body["qty"]))
+    SIGNALS.refresh_async()             # snapshot was built with the old defaults
     return jsonify({"dte": OPT_DEFAULT_DTE, "delta": OPT_TARGET_DELTA, "qty": OPT_DEFAULT_QTY})
 
 #-------Quote Helper--------------
@@ -1146,77 +1282,107 @@ def audit_read(offset: int = 0, limit: int = 100):
     chunk = lines[offset: offset + limit]
     return [json.loads(x) for x in chunk], total
 
-# --- helpers (put near your other helpers) ---
-def _payoff_intrinsic(side: str, strike: float, S: float) -> float:
-    """side: 'CALL' or 'PUT' -> intrinsic value at expiration (per share)."""
-    if side == "CALL":
-        return max(0.0, S - strike)
-    return max(0.0, strike - S)
-
-def _net_debit_credit(legs):
-    """Positive = net debit paid; negative = net credit received."""
-    net = 0.0
-    for leg in legs:
-        # BUY consumes cash (+price), SELL collects cash (-price)
-        sign = +1 if leg.get("action","BUY").upper() == "BUY" else -1
-        net += sign * float(leg.get("price", 0.0))
-    return net
-
-def _width_if_vertical(legs):
-    """Assumes two legs, same expiry, same side; returns strike width (abs)."""
-    if len(legs) != 2: return 0.0
-    try:
-        return abs(float(legs[0]["strike"]) - float(legs[1]["strike"]))
-    except Exception:
-        return 0.0
+# --- risk profile: max P/L, breakevens and the price x days P/L surface for any leg set ---
+from engine.options.risk import risk_profile
+from engine.options.surface import SURFACES
 
-def _pl_expiration(symbol: str, legs, S: float, qty: int) -> float:
-    """P/L at expiration for multi/single-leg using provided entry leg prices."""
-    # intrinsic sum per share
-    intrinsic_sum = 0.0
-    for leg in legs:
-        side = leg["side"].upper()  # CALL/PUT
-        strike = float(leg["strike"])
-        intrinsic = _payoff_intrinsic(side, strike, S)
-        # BUY gains intrinsic, SELL loses intrinsic
-        mult = +1 if leg.get("action","BUY").upper() == "BUY" else -1
-        intrinsic_sum += mult * intrinsic
-    # entry cost per share (net debit positive, credit negative)
-    net = _net_debit_credit(legs)
-    # per contract multiplier 100
-    return (intrinsic_sum - net) * 100.0 * qty
-
-def _spread_stats(legs):
-    """Return maxProfit/maxLoss for verticals; for singles returns None."""
-    if len(legs) != 2: return None
-    s = legs[0]["side"].upper()
-    same_side = s == legs[1]["side"].upper()
-    same_exp = legs[0]["expiration"] == legs[1]["expiration"]
-    if not (same_side and same_exp): return None
-    width = _width_if_vertical(legs)
-    net = _net_debit_credit(legs)  # debit>0, credit<0
-    if net >= 0:  # debit spread
-        return {"type":"debit", "width": width, "net": net,
-                "maxLoss": net * 100, "maxProfit": (width - net) * 100}
-    else:        # credit spread
-        cr = -net
-        return {"type":"credit","width": width, "net": net,
-                "maxLoss": (width - cr) * 100, "maxProfit": cr * 100}
-
-def _ndist_cdf(x: float) -> float:
-    # Φ(x) using error function
-    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
-
-# --- Black–Scholes (no dividends, r≈0) ---
-def _bs_price(S: float, K: float, T_years: float, sigma: float, call_put: str) -> float:
-    if S <= 0 or K <= 0 or T_years <= 0 or sigma <= 0:
-        return 0.0
-    d1 = (math.log(S / K) + 0.5 * sigma * sigma * T_years) / (sigma * math.sqrt(T_years))
-    d2 = d1 - sigma * math.sqrt(T_years)
-    if call_put.upper() == "CALL":
-        return S * _ndist_cdf(d1) - K * _ndist_cdf(d2)
-    else:
-        return K * _ndist_cdf(-d2) - S * _ndist_cdf(-d1)
+def compute_risk(o: dict) -> dict:
+    """SINGLE, VERTICAL, IRON_CONDOR, COVERED_CALL (or any legs); IV from the symbol's cached surface when fitted."""
+    sym = (o.get("symbol") or "").upper()
+    spot = o.get("spot") or o.get("underlyingPrice") or _quote_last(sym)
+    if not spot:
+        return {"ok": False, "error": f"no underlying price for {sym or 'order'}"}
+    vs = SURFACES.peek(sym) if sym else None
+    return risk_profile(o, spot=float(spot), iv=vs.iv if vs is not None and len(vs) else None)
+
+from engine.options.montecarlo import monte_carlo
+from engine.options.expected_move import EXPECTED_MOVES
+
+def _expected_move(symbol, *, expiry=None, dte=None) -> dict | None:
+    """Precomputed straddle move / σ-cone for the expiry (or the one nearest `dte` days); never fetches."""
+    if not symbol:
+        return None
+    if expiry is None and dte:
+        import datetime as _dt
+        expiry = (_dt.date.today() + _dt.timedelta(days=int(dte))).isoformat()
+    return EXPECTED_MOVES.get(symbol, expiry)
+
+@app.get("/api/expected_move")
+@login_required
+def api_expected_move():
+    sym = (request.args.get("symbol") or "").upper()
+    em = _expected_move(sym, expiry=request.args.get("expiry"), dte=request.args.get("dte", type=int))
+    if em is None:
+        return jsonify({"ok": False, "error": f"no expected move cached for {sym}",
+                        "lastRun": EXPECTED_MOVES.last_run}), 404
+    return jsonify({"ok": True, **em})
+
+# --- AIEngine models: shared registry (load time / memory, hot swap) ---
+from ai.registry import REGISTRY as MODEL_REGISTRY
+
+@app.get("/api/ai/models")
+@login_required
+@admin_required
+def api_ai_models():
+    from ai.engine import SCHEMA
+    return jsonify({"ok": True, **MODEL_REGISTRY.stats(), "featureSchema": SCHEMA.report()})
+
+@app.post("/api/ai/models/swap")
+@login_required
+@admin_required
+def api_ai_models_swap():
+    """Load a new model version in the background; engines switch once it has loaded."""
+    data = request.get_json(silent=True) or {}
+    path = data.get("path") or os.getenv("AI_MODEL_PATH")
+    if not path:
+        return jsonify({"ok": False, "error": "path required"}), 400
+    MODEL_REGISTRY.swap(path, source=data.get("source"), version=data.get("version"))
+    return jsonify({"ok": True, "path": path, "status": "loading"}), 202
+
+# out-of-core training over sandbox datasets (ai/train.py); one job at a time
+_TRAIN_JOB = {"running": False, "last": None, "error": None}
+
+@app.post("/api/ai/models/train")
+@login_required
+@admin_required
+def api_ai_models_train():
+    from ai.train import train as train_model
+    from ai.sandbox import _SANDBOX_DIR
+    if _TRAIN_JOB["running"]:
+        return jsonify({"ok": False, "error": "training already running"}), 409
+    data = request.get_json(silent=True) or {}
+    sources = data.get("sources") or [_SANDBOX_DIR]
+
+    def run():
+        _TRAIN_JOB.update(running=True, error=None)
+        try:
+            card = train_model(sources, out_dir=os.getenv("AI_MODEL_DIR", "models"),
+                               epochs=int(data.get("epochs", 1)), activate=bool(data.get("activate", True)))
+            _TRAIN_JOB["last"] = {k: v for k, v in card.items() if k != "featureStats"}
+        except Exception as e:
+            _TRAIN_JOB["error"] = repr(e)
+        finally:
+            _TRAIN_JOB["running"] = False
+
+    threading.Thread(target=run, name="model-train", daemon=True).start()
+    return jsonify({"ok": True, "status": "training", "sources": sources}), 202
+
+@app.get("/api/ai/models/train")
+@login_required
+@admin_required
+def api_ai_models_train_status():
+    return jsonify({"ok": True, **_TRAIN_JOB})
+
+def compute_pop(o: dict, *, budget_ms: float = 150.0) -> dict:
+    """Monte Carlo POP / EV / tail loss at first expiry; smile-consistent paths when the symbol has a surface."""
+    sym = (o.get("symbol") or "").upper()
+    spot = o.get("spot") or o.get("underlyingPrice") or _quote_last(sym)
+    if not spot:
+        return {"ok": False, "error": f"no underlying price for {sym or 'order'}"}
+    vs = SURFACES.peek(sym) if sym else None
+    fitted = vs is not None and len(vs)
+    return {"ok": True, **monte_carlo(o, spot=float(spot), iv=vs.iv if fitted else None,
+                                      smile=vs.iv if fitted else None, budget_ms=budget_ms)}
 
 def _annualized_hv(closes: list[float]) -> float:
     if not closes or len(closes) < 22:
@@ -1516,11 +1682,13 @@ def api_paper_options_preview():
     duration  = (data.get("duration")  or "DAY").upper()
     limit_px  = data.get("price")
 
-    # ---- Optional: compute spread stats if it's a 2-leg vertical ----
+    # ---- Risk profile (max P/L, breakevens, P/L surface) for any leg set ----
     try:
-        stats = _spread_stats(legs)
+        risk = compute_risk({"symbol": symbol, "quantity": qty, "price": limit_px, "legs": legs})
     except Exception:
-        stats = None
+        risk = None
+    stats = ({k: risk[k] for k in ("netDebit", "maxProfit", "maxLoss", "breakevens")}
+             if risk and risk.get("ok") else None)
 
     # ---- Simple AI decision stub (keep your old behavior) ----
     # If you want the older BUY/SELL preview based on side, infer from first leg:
@@ -1528,11 +1696,21 @@ def api_paper_options_preview():
     # Old minimal preview style:
     # decision_min = {"signal": "BUY" if first_side == "CALL" else "SELL", "confidence": 93.4}
     # More descriptive combined style:
+    # confidence = simulated probability of profit at first expiry (percent)
+    try:
+        prob = compute_pop({"symbol": symbol, "quantity": qty, "price": limit_px, "legs": legs})
+    except Exception:
+        prob = None
+    ok = bool(prob and prob.get("ok"))
+    exp0 = next((l.get("expiration") or l.get("expiry") for l in legs if l.get("expiration") or l.get("expiry")), None)
     decision = {
         "signal": "ENTER",
         "direction": ("LONG_CALL" if first_side == "CALL" else "LONG_PUT"),
-        "confidence": 93.4,
-        "notes": ["Preview with guardrails"]
+        "confidence": round(prob["pop"] * 100.0, 1) if ok else None,
+        "probability": ({k: prob[k] for k in ("pop", "ev", "tailLoss", "var95", "paths", "horizonDays")}
+                        if ok else None),
+        "expectedMove": _expected_move(symbol, expiry=exp0),
+        "notes": ["Preview with guardrails"] + ([] if ok else ["probability unavailable"])
     }
 
     payload = {
@@ -1542,7 +1720,8 @@ def api_paper_options_preview():
         "orderType": orderType,
         "duration": duration,
         "limitPrice": limit_px,
-        "spread": stats
+        "spread": stats,
+        "risk": risk
     }
 
     # ---- Audit (best-effort) ----
@@ -1683,8 +1862,12 @@ def api_trade_preview():
     o = request.get_json(force=True)
     # your existing max P/L helper; supports SINGLE, VERTICAL, IRON_CONDOR, COVERED_CALL
     risk = compute_risk(o)
+    try:
+        prob = compute_pop(o)
+    except Exception as e:
+        prob = {"ok": False, "error": str(e)}
     sw = map_to_schwab_order(o)
-    return {"ok": True, "risk": risk, "schwabOrder": sw}
+    return {"ok": True, "risk": risk, "probability": prob, "schwabOrder": sw}
 
 # ---- Submit: honor ENABLE_TRADING/PAPER_MODE; schedule MOC/LOC; paper -> simulate/audit; live -> Schwab ----
 
@@ -1800,11 +1983,14 @@ def api_trade_submit():
 @login_required
 def api_paper_checklist_audit():
     payload = request.get_json(force=True)  # {symbol, plan, checks:{...}, legs?, qty?, spot?}
+    legs = payload.get("legs") or []
+    exp0 = next((l.get("expiration") or l.get("expiry") for l in legs if isinstance(l, dict)), None)
+    em = _expected_move(payload.get("symbol"), expiry=exp0)
     try:
-        audit_write("paper.checklist", payload)
+        audit_write("paper.checklist", {**payload, "expectedMove": em})
     except Exception:
         pass
-    return {"status":"ok"}
+    return {"status":"ok", "expectedMove": em}
 
 
 
@@ -0,0 +1,42 @@
+import random
+import numpy as np
+from ai.engine import AIEngine, FEATURE_KEYS
+
+def _rows(n=300):
+    random.seed(3)
+    rows = []
+    for _ in range(n):
+        f = {k: round(random.uniform(-2, 2) + (50 if k == "rsi" else 100 if k in ("close", "prev_close", "vwap", "ma_fast", "ma_slow") else 0), 3)
+             for k in FEATURE_KEYS if random.random() < 0.8}
+        if random.random() < 0.1: f["prev_close"] = 0
+        if random.random() < 0.05: f["rsi"] = "n/a"
+        rows.append(f)
+    return rows + [{}, {"other": 1.0}]
+
+class _Proba:
+    classes_ = np.array(["CALL", "PUT"])
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-np.asarray(X, float)[:, FEATURE_KEYS.index("macd")]))
+        return np.column_stack([p, 1 - p])
+
+class _Labels:
+    def predict(self, X):
+        return ["UP" if x[0] > 100 else "DOWN" if x[0] > 99 else "?" for x in np.asarray(X, float)]
+
+def test_heuristic_batch_matches_propose():
+    eng, rows = AIEngine(), _rows()
+    assert eng.propose_batch(rows) == [eng._propose_one(r, None) for r in rows]
+
+def test_model_batch_matches_propose():
+    for model in (_Proba(), _Labels()):
+        eng, rows = AIEngine(), _rows()
+        eng.model = model
+        rows = [r for r in rows if r.get("rsi") != "n/a"]     # _vectorize rejects text values
+        assert eng.propose_batch(rows) == [eng._propose_one(r, None) for r in rows]
+
+def test_array_input():
+    eng = AIEngine()
+    X = np.full((2, len(FEATURE_KEYS)), np.nan)
+    X[0, FEATURE_KEYS.index("rsi")] = 70
+    assert eng.propose_batch(X) == [{"type": "SINGLE", "side": "CALL", "confidence": 1.0},
+                                    {"type": "HOLD", "confidence": 0.5}]
@@ -0,0 +1,76 @@
+import threading, time
+import pytest
+from ai.engine import AIEngine
+from engine_gateway import EngineGateway, EngineUnavailable, MicroBatcher
+
+def test_microbatcher_coalesces_and_slices():
+    calls = []
+    def fn(items):
+        calls.append(list(items)); time.sleep(0.01); return [x * 10 for x in items]
+    mb = MicroBatcher(fn, max_batch=1000, max_wait_ms=30)
+    out, ts = {}, []
+    for i in range(20):
+        ts.append(threading.Thread(target=lambda i=i: out.__setitem__(i, mb([i, i + 100]))))
+    for t in ts: t.start()
+    for t in ts: t.join()
+    assert all(out[i] == [i * 10, (i + 100) * 10] for i in range(20))
+    assert len(calls) < 20 and mb.stats["requests"] == 20 and mb.stats["items"] == 40
+
+def test_microbatcher_caps_batch_and_propagates_errors():
+    sizes = []
+    mb = MicroBatcher(lambda xs: sizes.append(len(xs)) or xs, max_batch=4, max_wait_ms=50)
+    futs = [mb.submit([i, i]) for i in range(6)]
+    assert [f.result(2) for f in futs] == [[i, i] for i in range(6)] and max(sizes) <= 4
+    bad = MicroBatcher(lambda xs: xs[:-1])
+    with pytest.raises(EngineUnavailable):
+        bad([1, 2])
+
+class _Engine:
+    def __init__(self): self.calls, self.eng = [], AIEngine()
+    def propose_batch(self, feats):
+        self.calls.append(len(feats)); return self.eng.propose_batch(feats)
+
+def test_gateway_shares_model_work_across_requests():
+    feats = {"AAPL": {"rsi": 70, "macd": 1}, "MSFT": {"rsi": 30, "macd": -1}, "NVDA": {}}
+    fetched = []
+    eng = _Engine()
+    gw = EngineGateway(eng, features_fn=lambda s: fetched.append(s) or time.sleep(0.02) or feats[s])
+    gw._signals.max_wait = 0.05
+    res = {}
+    ts = [threading.Thread(target=lambda k=k: res.__setitem__(k, gw.get_option_signals(["AAPL", "MSFT", "NVDA"])))
+          for k in range(8)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    want = [{"symbol": "AAPL", "side": "CALL", "confidence": 1.0, "expires_in_min": 15},
+            {"symbol": "MSFT", "side": "PUT", "confidence": 1.0, "expires_in_min": 15}]
+    assert all(r == want for r in res.values())
+    assert sorted(fetched) == ["AAPL", "MSFT", "NVDA"]            # one fetch per symbol across requests
+    assert len(eng.calls) < 8 and sum(eng.calls) == 24
+    assert [p["size"] for p in gw.propose_trades(["AAPL", "MSFT"], 100.0)] == [50.0, 50.0]
+    assert gw.health()["batching"]["requests"] == 9
+
+def test_slow_feature_fetch_is_time_boxed_and_not_head_of_line(caplog):
+    def features(s):
+        if s == "SLOW":
+            time.sleep(1.0)
+        return {"rsi": 70, "macd": 1}
+    gw = EngineGateway(_Engine(), features_fn=features)
+    gw.feature_timeout = 0.2
+    t0 = time.perf_counter()
+    slow = gw.signals_future(["SLOW", "AAPL"])
+    fast = gw.signals_future(["MSFT"])
+    assert fast.result(2)[0]["side"] == "CALL" and time.perf_counter() - t0 < 0.15   # not behind SLOW
+    acts = slow.result(2)
+    assert time.perf_counter() - t0 < 0.6 and acts[0]["type"] == "HOLD" and acts[1]["side"] == "CALL"
+    assert any("SLOW timed out" in r.getMessage() for r in caplog.records)
+
+def test_proposals_split_budget_per_symbol_without_timer_threads():
+    feats = {"AAPL": {"rsi": 70, "macd": 1}, "MSFT": {}, "NVDA": {}}
+    gw = EngineGateway(_Engine(), features_fn=lambda s: feats[s])
+    props = gw.propose_trades(["AAPL", "MSFT", "NVDA"], 90.0)
+    assert [(p["symbol"], p["size"]) for p in props] == [("AAPL", 30.0)]      # HOLDs still count toward the split
+    futs = [gw.signals_future(["AAPL", "MSFT"]) for _ in range(50)]
+    assert all(len(f.result(2)) == 2 for f in futs)
+    # deadlines (feature_timeout) are still pending: one shared thread holds them, no Timer per request
+    assert not any(isinstance(t, threading.Timer) for t in threading.enumerate())
+    assert sum(t.name == "gateway-deadlines" for t in threading.enumerate()) == 1
@@ -0,0 +1,31 @@
+import datetime as dt
+import numpy as np
+from engine.options.expected_move import expected_moves, MoveCache
+
+TODAY = dt.date(2030, 1, 1)
+
+def _chain(bid=2.0, ask=2.2, vol=None):
+    legs = {f"{k}.0": [{"symbol": f"{k}", "strikePrice": k, "bid": bid, "ask": ask,
+                        **({"volatility": vol} if vol else {})}] for k in (95, 100, 105)}
+    return {"symbol": "XYZ", "underlyingPrice": 101.0,
+            "callExpDateMap": {"2030-01-31:30": legs}, "putExpDateMap": {"2030-01-31:30": legs}}
+
+def test_straddle_move_and_cone():
+    m, = expected_moves(_chain(vol=20), today=TODAY)
+    assert m["strike"] == 100.0 and abs(m["move"] - 4.2) < 1e-9 and m["dte"] == 30
+    lo, hi = m["cone"]["1"]
+    sd = 0.20 * np.sqrt(30 / 365)
+    assert abs(lo - 101 * np.exp(-sd)) < 1e-3 and abs(hi - 101 * np.exp(sd)) < 1e-3
+    assert m["cone"]["2"][0] < lo and m["cone"]["2"][1] > hi
+    # no vendor IV: backed out of the straddle, which round-trips to the move
+    iv = expected_moves(_chain(), today=TODAY)[0]["iv"]
+    assert abs(0.7979 * 101 * iv * np.sqrt(30 / 365) - 4.2) < 1e-3
+
+def test_cache_freshness():
+    c = MoveCache(max_age_sec=60)
+    assert c.get("XYZ") is None
+    c.put("xyz", 101.0, expected_moves(_chain(), today=TODAY), source="test")
+    e = c.get("XYZ", "2030-02-03")
+    assert e["stale"] is False and e["ageSec"] < 1 and e["expiries"][0]["expiry"] == "2030-01-31"
+    c._data["XYZ"]["asOf"] -= 120
+    assert c.get("XYZ")["stale"] is True
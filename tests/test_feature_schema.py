@@ -0,0 +1,57 @@
+import numpy as np
+from ai.engine import AIEngine, FEATURE_KEYS, SCHEMA
+from ai.schema import FeatureSchema
+from ai import sandbox as sb
+
+def test_compiled_mapping_and_report():
+    fs = FeatureSchema(FEATURE_KEYS)
+    m = fs.compile("sandbox", sb.FEATURE_COLS)
+    assert fs.compile("sandbox", sb.FEATURE_COLS) is m
+    r = m.report()
+    assert r["mapped"] == {"ma_fast": "ema9", "ma_slow": "ema20", "rsi": "rsi14"}
+    assert r["unmapped"] == ["ret1"] and "close" in r["missing"] and "rsi" not in r["missing"]
+    X = m.matrix([[1.0, 2.0, 60.0, 0.01]])
+    assert X.shape == (1, len(FEATURE_KEYS)) and X[0, FEATURE_KEYS.index("rsi")] == 60.0
+    assert np.isnan(X[0, FEATURE_KEYS.index("close")])
+
+def test_dicts_prefer_canonical_names_and_skip_bad_values():
+    fs = FeatureSchema(FEATURE_KEYS)
+    X, present = fs.from_dicts([{"rsi14": 10, "rsi": 70, "ema9": "x"}, None, {"rsi14": 30}])
+    j = FEATURE_KEYS.index("rsi")
+    assert X[0, j] == 70 and X[2, j] == 30 and not present[1].any()
+    assert not present[0, FEATURE_KEYS.index("ma_fast")] and len(fs.report()) == 2
+
+def test_engine_reads_producer_names():
+    eng = AIEngine()
+    feats = {"ema9": 101.0, "ema20": 100.0, "rsi14": 70.0, "stoch_k": 80.0}
+    assert eng.propose(symbol="X", features=feats) == {"type": "SINGLE", "side": "CALL", "confidence": 1.0}
+    F = np.array([[101.0, 100.0, 70.0, 0.0], [99.0, 100.0, 30.0, 0.0]])
+    acts = eng.propose_batch(sb.SANDBOX_FEATURES.matrix(F))
+    assert [a["side"] for a in acts] == ["CALL", "PUT"]
+    assert any(r["producer"] == "sandbox" for r in SCHEMA.report())
+
+def test_propose_unchanged_for_canonical_keys_and_maps_producer_names():
+    class Proba:
+        classes_ = np.array(["CALL", "PUT"])
+        def predict_proba(self, X):
+            p = 1 / (1 + np.exp(-np.asarray(X, float)[:, FEATURE_KEYS.index("macd")]))
+            return np.column_stack([p, 1 - p])
+    rng = np.random.default_rng(4)
+    level = {"rsi": 50, "close": 100, "prev_close": 100, "vwap": 100, "ma_fast": 100, "ma_slow": 100}
+    rows = [{k: float(rng.normal(level.get(k, 0), 3))
+             for k in FEATURE_KEYS if rng.random() < 0.8} for _ in range(200)] + [{}]
+    for model in (None, Proba()):
+        eng = AIEngine(); eng.model = model
+        assert [eng.propose(symbol="X", features=r) for r in rows] == [eng._propose_one(r, None) for r in rows]
+    # sandbox-named features: ignored by the scalar path (HOLD), mapped by propose (SINGLE)
+    feats = dict(zip(sb.FEATURE_COLS, (101.0, 100.0, 70.0, 0.0)))
+    eng = AIEngine()
+    assert eng._propose_one(feats, None)["type"] == "HOLD" and eng.propose(symbol="X", features=feats)["type"] == "SINGLE"
+
+def test_mapping_cache_is_bounded_lru():
+    fs = FeatureSchema(FEATURE_KEYS, max_maps=3)
+    first = fs.compile("dict", ("rsi",))
+    for i in range(5):
+        fs.compile("dict", ("rsi", f"k{i}"))
+        assert fs.compile("dict", ("rsi",)) is first      # recently used layouts stay cached
+    assert len(fs.report()) == 3 and fs.compile("dict", ("rsi", "k0")) is not None
@@ -0,0 +1,27 @@
+import dataclasses
+import datetime as dt
+import numpy as np
+from engine.options.chain import from_rows
+from engine.options.iv import implied_vol, fill_greeks
+from engine.options.pricing import bs_price, bs_greeks
+
+def test_batch_iv_roundtrip():
+    rng = np.random.default_rng(0)
+    n = 2000
+    K = rng.uniform(60, 140, n); T = rng.uniform(2, 400, n) / 365; sig = rng.uniform(0.08, 1.5, n)
+    right = np.where(rng.random(n) < 0.5, "CALL", "PUT")
+    px = bs_price(100.0, K, T, sig, right, r=0.02)
+    iv = implied_vol(px, 100.0, K, T, right, r=0.02)
+    ok = bs_greeks(100.0, K, T, sig, right, r=0.02)["vega"] > 1e-4     # IV identifiable from price
+    assert ok.mean() > 0.95 and np.allclose(iv[ok], sig[ok], atol=1e-6)
+    assert np.isnan(implied_vol(0.5, 100.0, 90.0, 0.1, "CALL"))       # below intrinsic
+
+def test_fill_greeks_only_missing():
+    exp = dt.date(2030, 2, 1)
+    T = (exp - dt.date(2030, 1, 1)).days / 365
+    rows = [{"type": "call", "expiry": str(exp), "strike": k, "delta": d,
+             "mid": float(bs_price(100.0, k, T, 0.3, "CALL"))} for k, d in ((95, 0.7), (105, None))]
+    ca = dataclasses.replace(from_rows(rows), underlying=100.0)
+    out = fill_greeks(ca, today=dt.date(2030, 1, 1))
+    assert out.delta[0] == 0.7 and abs(out.iv[1] - 0.3) < 1e-6
+    assert abs(out.delta[1] - bs_greeks(100.0, 105, T, 0.3, "CALL")["delta"]) < 1e-6
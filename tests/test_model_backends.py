@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from ai.backends import LinearProba, compile_model
+
+def _data(k=3):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 9))
+    return X, rng.integers(0, k, 300) if k > 2 else np.where(X[:, 0] + X[:, 4] > 0, "CALL", "PUT")
+
+@pytest.mark.parametrize("k", [2, 3])
+def test_linear_backend_matches_sklearn(k):
+    X, y = _data(k)
+    m = LogisticRegression().fit(X, y)
+    rt, info = compile_model(m, backend="numpy")
+    assert isinstance(rt, LinearProba) and info["backend"] == "numpy-linear" and info["maxAbsErr"] < 1e-9
+    np.testing.assert_allclose(rt.predict_proba(X[:5]), m.predict_proba(X[:5]), atol=1e-12)
+    assert list(rt.predict(X)) == list(m.predict(X)) and list(rt.classes_) == list(m.classes_)
+
+def test_unsupported_or_mismatched_falls_back():
+    X, y = _data()
+    rt, info = compile_model(DecisionTreeClassifier(max_depth=3).fit(X, y), backend="numpy")
+    assert rt is None and info["backend"] == "sklearn" and "numpy-linear" in info["tried"]
+    m = LogisticRegression().fit(X, y)
+    orig = LinearProba._proba
+    try:
+        LinearProba._proba = lambda self, X: orig(self, X)[:, ::-1]       # a "compiler" that gets it wrong
+        rt, info = compile_model(m, backend="numpy")
+    finally:
+        LinearProba._proba = orig
+    assert rt is None and info["tried"]["numpy-linear"].startswith("mismatch")
+    assert compile_model(m, backend="sklearn")[0] is None
+
+def test_runtime_error_uses_original():
+    X, y = _data()
+    m = LogisticRegression().fit(X, y)
+    rt, _ = compile_model(m, backend="numpy")
+    np.testing.assert_allclose(rt.predict_proba(X[:3].tolist()), m.predict_proba(X[:3]))
+    rt.W = None                                                            # runtime broken after load
+    np.testing.assert_allclose(rt.predict_proba(X[:3]), m.predict_proba(X[:3]))
+
+def test_onnx_backend_when_installed():
+    pytest.importorskip("onnxruntime"); pytest.importorskip("skl2onnx")
+    X, y = _data()
+    rt, info = compile_model(LogisticRegression().fit(X, y), backend="onnx")
+    assert info["backend"] == "onnxruntime" and info["maxAbsErr"] < 1e-4
@@ -0,0 +1,42 @@
+import os
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from ai.engine import AIEngine, FEATURE_KEYS
+from ai.registry import ModelRegistry
+import ai.engine as engine_mod
+
+def _fit(path, sign):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(FEATURE_KEYS)))
+    y = np.where(sign * X[:, FEATURE_KEYS.index("macd")] > 0, "CALL", "PUT")
+    joblib.dump(LogisticRegression().fit(X, y), path)
+
+def test_load_once_mmap_and_hot_swap(tmp_path, monkeypatch):
+    reg = ModelRegistry(mmap_mode="r")
+    monkeypatch.setattr(engine_mod, "REGISTRY", reg)
+    path = str(tmp_path / "m.joblib")
+    _fit(path, +1)
+    a, b = AIEngine(path), AIEngine(path)
+    assert a.model is b.model is not None
+    st = reg.stats()
+    assert len(st["models"]) == 1 and st["models"][0]["active"] and st["models"][0]["mmapBytes"] > 0
+    feats = {"macd": 3.0}
+    assert a.propose(symbol="X", features=feats)["side"] == "CALL"
+
+    new = str(tmp_path / "m2.joblib")
+    _fit(new, -1)
+    reg.swap(path, source=new).join()
+    assert a.propose(symbol="X", features=feats)["side"] == "PUT" and b.model is a.model
+    assert reg.stats()["slots"][os.path.abspath(path)]["version"] == reg.stats()["models"][-1]["version"]
+
+def test_failed_swap_keeps_current(tmp_path, monkeypatch):
+    reg = ModelRegistry()
+    monkeypatch.setattr(engine_mod, "REGISTRY", reg)
+    path = str(tmp_path / "m.joblib")
+    _fit(path, +1)
+    eng = AIEngine(path)
+    before = eng.model
+    s = reg.swap(path, source=str(tmp_path / "missing.joblib"), background=False)
+    assert eng.model is before and s.error
+    assert AIEngine(str(tmp_path / "nope.joblib")).model is None
@@ -0,0 +1,48 @@
+import datetime as dt
+import math
+from engine.options.montecarlo import monte_carlo
+
+TODAY = dt.date(2030, 1, 1)
+CALL = {"side": "CALL", "strike": 100, "expiration": "2030-03-02", "price": 3.0}
+
+def _analytic_pop(S, be, sig, T):
+    return 0.5 * (1 + math.erf((math.log(S / be) - 0.5 * sig * sig * T) / (sig * math.sqrt(T)) / math.sqrt(2)))
+
+def test_pop_matches_gbm_closed_form_in_process():
+    r = monte_carlo(CALL, spot=100.0, iv=0.3, paths=200_000, seed=7, today=TODAY, pool=None, budget_ms=1e6)
+    assert r["paths"] == 200_000 and not r["truncated"]
+    assert abs(r["pop"] - _analytic_pop(100.0, 103.0, 0.3, 60 / 365)) < 0.005
+    assert abs(r["tailLoss"] - 300.0) < 2 and r["worst"] == -300.0 and sum(r["distribution"]["counts"]) == r["paths"]
+
+def test_seeded_runs_repeat_and_budget_truncates():
+    a = monte_carlo(CALL, spot=100.0, iv=0.3, paths=100_000, seed=1, today=TODAY, pool=None, budget_ms=1e6)
+    b = monte_carlo(CALL, spot=100.0, iv=0.3, paths=100_000, seed=1, today=TODAY, pool=None, budget_ms=1e6)
+    assert a["pop"] == b["pop"] and a["ev"] == b["ev"]
+    c = monte_carlo(CALL, spot=100.0, iv=0.3, paths=2_000_000, chunk=10_000, min_paths=10_000,
+                    seed=1, today=TODAY, pool=None, budget_ms=0)
+    assert c["truncated"] and c["paths"] == 10_000
+
+class _SlowPool:
+    """Runs each chunk on a timer thread after `delay` s (a pool slower than the budget)."""
+    def __init__(self, delay):
+        self.delay = delay
+    def submit(self, fn, arg):
+        import threading
+        from concurrent.futures import Future
+        f = Future()
+        threading.Timer(self.delay, lambda: f.set_running_or_notify_cancel() and f.set_result(fn(arg))).start()
+        return f
+
+def test_pool_blocks_past_deadline_until_min_paths(monkeypatch):
+    import engine.options.montecarlo as mc
+    calls = []
+    real_wait = mc.wait
+    def counting_wait(fs, timeout=None, return_when=None):
+        calls.append(timeout)
+        return real_wait(fs, timeout=timeout, return_when=return_when)
+    monkeypatch.setattr(mc, "wait", counting_wait)
+    r = monte_carlo(CALL, spot=100.0, iv=0.3, paths=40_000, chunk=10_000, min_paths=20_000, seed=1,
+                    today=TODAY, pool=_SlowPool(0.2), budget_ms=0.001)
+    assert r["paths"] >= 20_000
+    # a polling loop would call wait() thousands of times in 0.2 s; blocking needs one per chunk at most
+    assert len(calls) <= 4 and all(t is None for t in calls[1:])
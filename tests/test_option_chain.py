@@ -0,0 +1,47 @@
+import numpy as np
+from engine.options.chain import normalize_chain, atm_ivs, side_means
+
+def _schwab_leg(sym, k, delta, vol, bid=1.0, ask=1.2, oi=100):
+    return {"symbol": sym, "strikePrice": k, "bid": bid, "ask": ask, "delta": delta, "gamma": 0.05,
+            "volatility": vol, "openInterest": oi}
+
+SCHWAB = {
+    "symbol": "AAPL", "underlyingPrice": 190.0,
+    "callExpDateMap": {"2030-01-18:30": {"190.0": [_schwab_leg("C190", 190, 0.52, 25.0)],
+                                         "195.0": [_schwab_leg("C195", 195, -999.0, "NaN")]}},
+    "putExpDateMap": {"2030-01-18:30": {"190.0": [_schwab_leg("P190", 190, -0.48, 27.0)]}},
+}
+TRADIER = {"options": {"option": [
+    {"symbol": "X1", "strike": 100, "expiration_date": "2030-01-18", "option_type": "call", "bid": 2, "ask": 2.2,
+     "open_interest": 5, "greeks": {"delta": 0.5, "gamma": 0.1, "mid_iv": 0.3}},
+    {"symbol": "X2", "strike": 100, "expiration_date": "2030-01-18", "option_type": "put", "bid": 0, "ask": 2.1,
+     "open_interest": 7, "greeks": {"delta": -0.2, "mid_iv": 0.0, "iv": 0.35}},
+]}}
+
+def test_schwab_chain_flattens_to_columns():
+    ca = normalize_chain(SCHWAB)
+    assert len(ca) == 3 and ca.underlying == 190.0
+    assert ca.is_call.tolist() == [True, True, False]
+    assert np.isnan(ca.delta[1]) and np.isnan(ca.iv[1])          # -999 / "NaN" -> missing
+    assert np.allclose(ca.iv[[0, 2]], [0.25, 0.27]) and np.allclose(ca.mid, 1.1)
+    assert str(ca.expiry[0]) == "2030-01-18"
+    assert np.allclose(sorted(atm_ivs(ca)), [0.25, 0.27])
+    assert side_means(ca)["call_delta_mean"] == 0.52
+
+def test_tradier_chain_flattens_to_columns():
+    ca = normalize_chain(TRADIER)
+    assert ca.contract.tolist() == ["X1", "X2"] and ca.oi.tolist() == [5, 7]
+    assert ca.iv.tolist() == [0.3, 0.35]                          # mid_iv 0 falls back to iv
+    assert np.isinf(ca.spread[1]) and np.isclose(ca.spread[0], 0.2)
+    assert len(normalize_chain({})) == 0
+
+def test_indexed_chain_lookups():
+    import datetime as dt
+    from engine.options.chain import OptionChain
+    rows = [{"type":"call","expiry":e,"strike":k,"bid":1,"ask":1.2,"delta":d}
+            for e in ("2024-01-12","2024-02-02") for k,d in ((95,.7),(100,.5),(105,.35),(110,.2))]
+    oc = OptionChain(rows, today=dt.date(2024,1,1))
+    assert oc.expiry_for_dte(30) == "2024-02-02" and oc.expiries_between(0, 20) == ["2024-01-12"]
+    r = oc.nearest_delta("2024-02-02", "CALL", 0.33)
+    assert oc.ca.strike[r] == 105 and oc.ca.strike[oc.strike_offset(r, -10)] == 95
+    assert oc.strike_offset(r, 10) is None and oc.find("2024-01-12", "C", 100) is not None
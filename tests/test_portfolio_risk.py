@@ -0,0 +1,31 @@
+import datetime as dt
+import numpy as np
+from engine.options.portfolio import PortfolioRisk, PortfolioCache, parse_occ, positions_from_schwab
+from engine.options.pricing import bs_greeks
+
+TODAY = dt.date(2030, 1, 1)
+ACCT = {"securitiesAccount": {"positions": [
+    {"longQuantity": 2, "shortQuantity": 0, "instrument": {"assetType": "OPTION", "symbol": "AAPL  300215C00100000", "underlyingSymbol": "AAPL"}},
+    {"longQuantity": 0, "shortQuantity": 1, "instrument": {"assetType": "OPTION", "symbol": "AAPL  300215P00095000"}},
+    {"longQuantity": 50, "shortQuantity": 0, "instrument": {"assetType": "EQUITY", "symbol": "MSFT"}},
+]}}
+
+def test_parse_and_aggregate():
+    assert parse_occ("AAPL  300215C00100000") == {"underlying": "AAPL", "expiry": dt.date(2030, 2, 15), "is_call": True, "strike": 100.0}
+    pos = positions_from_schwab(ACCT)
+    pr = PortfolioRisk(pos, today=TODAY)
+    assert pr.update_quotes({"AAPL": 100.0, "MSFT": 400.0}) == 3
+    rep = pr.report()
+    T = 45 / 365
+    g = bs_greeks(100.0, [100, 95], T, 0.3, ["C", "P"])
+    want = 200 * g["delta"][0] - 100 * g["delta"][1]
+    assert abs(rep["bySymbol"]["AAPL"]["delta"] - want) < 1e-3 and rep["bySymbol"]["MSFT"]["delta"] == 50
+    pnl = np.array(rep["scenarios"]["pnl"])
+    assert pnl.shape == (7, 3) and abs(pnl[3, 1]) < 1e-9 and rep["maxRisk"] > 0
+    assert pr.update_quotes({"AAPL": 100.0, "MSFT": 401.0}) == 1      # only MSFT re-marked
+
+def test_cache_rebuilds_on_new_snapshot():
+    c = PortfolioCache()
+    pos = positions_from_schwab(ACCT)
+    a = c.get("acct", pos)
+    assert c.get("acct", list(pos)) is a and c.get("acct", pos[:1]) is not a
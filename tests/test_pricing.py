@@ -0,0 +1,24 @@
+import math
+import numpy as np
+from engine.options.pricing import bs_price, bs_greeks, norm_cdf
+
+def _scalar(S, K, T, v, cp):
+    N = lambda x: 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+    d1 = (math.log(S / K) + 0.5 * v * v * T) / (v * math.sqrt(T)); d2 = d1 - v * math.sqrt(T)
+    return S * N(d1) - K * N(d2) if cp == "CALL" else K * N(-d2) - S * N(-d1)
+
+def test_matches_scalar_and_parity():
+    S, K = np.array([90.0, 100.0, 110.0]), 100.0
+    got = bs_price(S, K, 0.25, 0.3, ["CALL", "PUT", "CALL"])
+    assert np.allclose(got, [_scalar(s, K, 0.25, 0.3, c) for s, c in zip(S, ["CALL", "PUT", "CALL"])], atol=1e-12)
+    c, p = bs_price(100, 95, 0.5, 0.2, "C", r=0.03, q=0.01), bs_price(100, 95, 0.5, 0.2, "P", r=0.03, q=0.01)
+    assert abs(c - p - (100 * math.exp(-0.005) - 95 * math.exp(-0.015))) < 1e-10
+    assert abs(norm_cdf(1.0) - 0.5 * (1 + math.erf(1 / math.sqrt(2)))) < 1e-15
+
+def test_greeks_and_edges():
+    g = bs_greeks(100, 100, 0.5, 0.25, ["CALL", "PUT"])
+    assert np.allclose(g["delta"][0] - g["delta"][1], 1.0) and g["gamma"][0] > 0 and np.all(g["theta"] < 0)
+    h = 1e-4
+    fd = (bs_price(100, 100, 0.5, 0.25 + h, "CALL") - bs_price(100, 100, 0.5, 0.25 - h, "CALL")) / (2 * h) / 100
+    assert abs(g["vega"][0] - fd) < 1e-6
+    assert bs_price(110, 100, 0, 0.3, "CALL") == 10.0 and bs_price(90, 100, 0.1, 0.3, "C", dtype=np.float32).dtype == np.float32
@@ -0,0 +1,17 @@
+import numpy as np
+from engine.signals.ranking import feature_matrix, top_k
+
+def test_feature_matrix_fills_missing():
+    syms, X = feature_matrix({"A": {"x": 1, "y": None}, "B": {"y": 2.5}}, ("x", "y"))
+    assert syms == ["A", "B"] and X.shape == (2, 2)
+    assert X[0, 0] == 1 and np.isnan(X[0, 1]) and np.isnan(X[1, 0]) and X[1, 1] == 2.5
+
+def test_top_k_heap_matches_sort():
+    rng = np.random.default_rng(0)
+    s = rng.normal(size=500); s[7] = np.nan
+    mask = rng.random(500) > 0.3
+    got = top_k(s, 20, mask)
+    ref = [i for i in np.argsort(-s, kind="stable") if mask[i] and np.isfinite(s[i])][:20]
+    assert got == [int(i) for i in ref]
+    assert top_k(np.array([1.0, 1.0, 0.5]), 2) == [0, 1]       # ties: earlier index first
+    assert top_k(np.array([]), 5) == []
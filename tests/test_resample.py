@@ -0,0 +1,102 @@
+import datetime as dt
+import threading, time
+from engine.datasources.resample import BarResampler, BarStore, filter_session, resample_candles
+
+def _minutes(day, start_hhmm, n, tz_offset_h=4):
+    # ET wall-clock minutes -> Schwab-style candles (UTC epoch ms)
+    h, m = start_hhmm
+    t0 = dt.datetime(*day, h, m, tzinfo=dt.timezone(dt.timedelta(hours=-tz_offset_h)))
+    out = []
+    for i in range(n):
+        ts = int((t0 + dt.timedelta(minutes=i)).timestamp() * 1000)
+        out.append({"datetime": ts, "open": 100 + i, "high": 101 + i, "low": 99 + i, "close": 100.5 + i, "volume": 10})
+    return out
+
+def test_resample_session_anchored():
+    bars = _minutes((2025, 6, 2), (9, 25), 400)  # 5 pre-market minutes, full session, 5 after close
+    five = resample_candles(bars, "5m")
+    assert len(five) == 78 and five[0]["open"] == 105 and five[0]["volume"] == 50
+    hour = resample_candles(bars, "1h")
+    assert len(hour) == 7 and hour[-1]["volume"] == 300  # 15:30-16:00 half bar
+    day = resample_candles(bars, "1d")
+    assert len(day) == 1 and day[0]["high"] == 101 + 394 and day[0]["close"] == 100.5 + 394
+
+def test_resample_dst_boundary():
+    winter = _minutes((2025, 1, 6), (9, 30), 30, tz_offset_h=5)
+    assert len(resample_candles(winter, "15m")) == 2
+
+def test_forming_bar_updates_incrementally():
+    bars = _minutes((2025, 6, 2), (9, 30), 12)
+    br = BarResampler(); br.ingest(bars[:11])
+    assert br.candles("5m")[-1]["volume"] == 10
+    br.update(bars[11])
+    assert br.candles("5m")[-1]["volume"] == 20
+    br.update({**bars[11], "high": 500.0})
+    assert br.candles("5m")[-1]["high"] == 500.0 and br.candles("5m")[-1]["volume"] == 20
+    assert br.candles("5m") == resample_candles(br.candles("1m"), "5m")
+
+def _days(n):
+    # n consecutive weekdays (Mon 2025-06-02 ..), 09:25-16:05 ET each
+    out = []
+    for d in range(n):
+        out += _minutes((2025, 6, 2 + d), (9, 25), 400)
+    return out
+
+def test_store_reloads_for_longer_period_and_trims():
+    feed = _days(5)
+    calls = []
+    def loader(sym, period):
+        calls.append(period)
+        return feed[-400:] if period == "1D" else feed
+    st = BarStore(ttl_sec=60)
+    one = st.candles("SPY", "1h", loader=loader, period="1D")
+    assert calls == ["1D"] and len(one) == 7 and st.span("SPY") == 1
+    five = st.candles("SPY", "1h", loader=loader, period="5D")
+    assert calls == ["1D", "5D"] and len(five) == 35 and st.span("SPY") == 5
+    assert st.candles("SPY", "1h", loader=loader, period="1D") == one and calls == ["1D", "5D"]
+
+def test_store_loads_once_under_concurrency():
+    n = []
+    def loader(sym, period):
+        n.append(1); time.sleep(0.05); return _days(1)
+    st = BarStore(ttl_sec=60)
+    ts = [threading.Thread(target=lambda: st.candles("QQQ", "5m", loader=loader)) for _ in range(6)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    assert len(n) == 1
+
+def test_extended_flag_matches_pass_through_filter():
+    bars = _minutes((2025, 6, 2), (9, 25), 400)
+    st = BarStore()
+    reg = st.candles("IWM", "1m", loader=lambda s, p: bars)
+    ext = st.candles("IWM", "1m", loader=lambda s, p: bars, extended=True)
+    assert reg == filter_session(bars) and len(reg) == 390 and ext == bars
+    assert len(st.candles("IWM", "5m", extended=True)) > len(st.candles("IWM", "5m"))
+
+class _PagedSession:
+    """Polygon aggs split into `pages` pages linked by next_url; records every request."""
+    def __init__(self, rows, pages):
+        n = -(-len(rows) // pages)
+        self.pages, self.calls = [rows[i:i + n] for i in range(0, len(rows), n)], []
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        i = len(self.calls) - 1
+        body = {"results": self.pages[i], **({"next_url": f"https://next/{i + 1}"} if i + 1 < len(self.pages) else {})}
+        return type("R", (), {"raise_for_status": lambda s: None, "json": lambda s: body})()
+
+def _poly(bars):
+    return [{"t": b["datetime"], "o": b["open"], "h": b["high"], "l": b["low"], "c": b["close"], "v": b["volume"]}
+            for b in bars]
+
+def test_polygon_follows_next_url_and_falls_back_past_minute_horizon(monkeypatch):
+    from engine.datasources import polygon, resample as rs
+    src = polygon.PolygonSource(); src.api_key = "k"
+    src.session = _PagedSession(_poly(_minutes((2025, 6, 2), (9, 30), 390)), pages=3)
+    five = src.candles("xyz", "5m", 78)
+    assert len(src.session.calls) == 3 and src.session.calls[1] == ("https://next/1", {"apiKey": "k"})
+    assert len(five) == 78 and five[-1]["close"] == 100.5 + 389 and "/range/1/minute/" in src.session.calls[0][0]
+    monkeypatch.setattr(rs, "MINUTE_HISTORY_SESSIONS", 0)
+    src.session = _PagedSession(_poly(_minutes((2025, 6, 2), (9, 0), 480)), pages=1)   # native 1h incl. pre/post
+    hours = src.candles("xyz", "1h", 5)
+    assert "/range/1/hour/" in src.session.calls[0][0] and len(hours) == 5
+    assert filter_session(hours) == hours and not rs.minute_history_covers("1M")
@@ -0,0 +1,30 @@
+import datetime as dt
+import numpy as np
+from engine.options.risk import risk_profile, legs_from_order
+
+TODAY = dt.date(2030, 1, 1)
+EXP = "2030-01-31"
+leg = lambda a, s, k, p=None, **kw: {"action": a, "side": s, "strike": k, "expiration": EXP, "price": p, **kw}
+
+def test_vertical_matches_closed_form():
+    o = {"symbol": "X", "quantity": 1, "legs": [leg("BUY", "CALL", 100, 3.0, quantity=1), leg("SELL", "CALL", 105, 1.0, quantity=1)]}
+    r = risk_profile(o, spot=100.0, iv=0.3, today=TODAY)
+    assert r["maxLoss"] == 200.0 and r["maxProfit"] == 300.0 and r["breakevens"] == [102.0]
+    pl = np.array(r["surface"]["pl"])
+    assert pl.shape == (len(r["surface"]["days"]), 121) and np.allclose(pl[-1], r["expiration"]["pl"])
+
+def test_condor_covered_call_and_single():
+    ic = {"legs": [leg("BUY", "PUT", 90, 0.5), leg("SELL", "PUT", 95, 1.5), leg("SELL", "CALL", 105, 1.5), leg("BUY", "CALL", 110, 0.5)]}
+    r = risk_profile(ic, spot=100.0, today=TODAY)
+    assert r["maxProfit"] == 200.0 and r["maxLoss"] == 300.0 and r["breakevens"] == [93.0, 107.0]
+    cc = {"quantity": 1, "legs": [{"asset": "STOCK", "action": "BUY", "price": 100.0}, leg("SELL", "CALL", 105, 2.0)]}
+    r = risk_profile(cc, spot=100.0, today=TODAY)
+    assert r["maxProfit"] == 700.0 and r["maxLoss"] == 9800.0 and r["breakevens"] == [98.0]
+    r = risk_profile({"side": "CALL", "strike": 100, "expiration": EXP, "price": 2.0}, spot=100.0, today=TODAY)
+    assert r["maxProfitUnbounded"] and r["maxLoss"] == 200.0 and r["breakevens"] == [102.0]
+    assert legs_from_order(cc, today=TODAY).w.tolist() == [100.0, -100.0]
+
+def test_net_limit_fills_unpriced_legs():
+    o = {"price": 2.0, "legs": [leg("BUY", "CALL", 100), leg("SELL", "CALL", 105)]}
+    r = risk_profile(o, spot=100.0, iv=0.3, today=TODAY)
+    assert abs(r["netDebit"] - 200.0) < 1e-6 and r["maxLoss"] == 200.0
@@ -0,0 +1,59 @@
+import json, random
+from ai import sandbox as sb
+
+def test_feature_matrix_matches_window_features():
+    random.seed(7)
+    closes = [100.0]
+    for _ in range(400): closes.append(round(closes[-1] * (1 + random.gauss(0, 0.002)), 4))
+    closes += [closes[-1]] * 20  # flat tail exercises the RSI avg_loss == 0 branch
+    candles = [{"close": c} for c in closes]
+    F = sb._feature_matrix(closes).tolist(); S = sb._rolling_hv(closes).tolist()
+    for i in range(30, len(closes) + 1):
+        assert json.dumps(dict(zip(sb.FEATURE_COLS, F[i]))) == json.dumps(sb._features_from_window(candles[i-30:i]))
+        assert S[i] == sb._annualized_hv(closes[i-30:i])
+
+def _baseline_price(S, K, T, sigma, side):
+    # the sandbox's original scalar erf pricer, kept here as the reproducibility reference
+    import math
+    N = lambda x: 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+    if S <= 0 or K <= 0 or T <= 0 or sigma <= 0: return 0.0
+    d1 = (math.log(S / K) + 0.5 * sigma * sigma * T) / (sigma * math.sqrt(T)); d2 = d1 - sigma * math.sqrt(T)
+    return S * N(d1) - K * N(d2) if side.upper() == "CALL" else K * N(-d2) - S * N(-d1)
+
+def _run(tmp_path, monkeypatch, step=5, expiry_days=7):
+    random.seed(3)
+    closes = [100.0]
+    for _ in range(300): closes.append(round(closes[-1] * (1 + random.gauss(0, 0.003)), 4))
+    class FakeClient:
+        def __init__(self, uid): pass
+        def price_history(self, symbol, period, interval):
+            return {"candles": [{"datetime": 60_000 * k, "close": c} for k, c in enumerate(closes)]}
+    monkeypatch.setattr(sb, "SchwabClient", FakeClient)
+    monkeypatch.setattr(sb, "current_user", type("U", (), {"id": "u1"})())
+    sb._sessions["t"] = {"out_dir": str(tmp_path)}
+    sb._run_sandbox("t", symbol="XYZ", period="1D", interval="1m", expiry_days=expiry_days, policy="rule", step=step)
+    assert sb._sessions["t"]["status"] == "done", sb._sessions["t"]
+    return closes, [json.loads(l) for l in open(tmp_path / "dataset.jsonl")]
+
+def test_sandbox_prices_singles_with_exact_erf(tmp_path, monkeypatch):
+    closes, rows = _run(tmp_path, monkeypatch)
+    singles = [r for r in rows if r["action"]["type"] == "SINGLE"]
+    assert singles
+    for r in singles:
+        i = r["t"] // 60_000
+        sigma = sb._annualized_hv(closes[i - 30:i]) or 0.2
+        side = r["action"]["side"]
+        entry = _baseline_price(r["S0"], r["K"], 7 / 252.0, sigma, side)
+        exitp = _baseline_price(r["S1"], r["K"], (7 - 5 / 390.0) / 252.0, sigma, side)
+        assert (r["entry"], r["exit"], r["reward"]) == (entry, exitp, (exitp - entry) * 100.0)
+
+def test_sandbox_rows_keep_baseline_schema_and_export_labels(tmp_path, monkeypatch):
+    closes, rows = _run(tmp_path, monkeypatch)
+    for r in rows:
+        keys = ["session", "t", "symbol", "S0", "features", "action", "expiry_days", "interval"]
+        keys += ["K", "entry", "exit", "S1"] if r["action"]["type"] == "SINGLE" else []
+        assert list(r) == keys + ["reward", "next_features", "done"]
+    assert any(r["action"]["type"] == "HOLD" for r in rows)
+    train = [json.loads(l) for l in open(tmp_path / "train.jsonl")]
+    assert [(t["t"], t["S0"], t["features"]) for t in train] == [(r["t"], r["S0"], r["features"]) for r in rows]
+    assert [t["S1"] for t in train] == [closes[r["t"] // 60_000 + 5] for r in rows]
@@ -0,0 +1,51 @@
+import datetime as dt
+import threading
+from engine.signals.snapshots import SharedResults, SnapshotStore, market_open, EASTERN
+
+def test_snapshot_versions_and_overlap():
+    gate, n = threading.Event(), []
+    def compute():
+        n.append(1); gate.wait(2); return {"run": len(n)}
+    s = SnapshotStore("t", compute, max_age_sec=60)
+    assert s.latest() is None and s.refresh_async()
+    assert s.run() is False and s.refresh_async() is False      # overlapping runs are refused
+    gate.set()
+    while s.running: pass
+    snap = s.latest()
+    assert snap["version"] == 1 and snap["data"] == {"run": 1} and snap["stale"] is False and len(n) == 1
+    assert s.run() and s.latest()["version"] == 2
+    s.history[-1]["asOf"] -= 120
+    assert s.latest()["stale"] is True and "data" not in s.meta()
+
+def test_snapshot_keeps_last_good_on_error():
+    s = SnapshotStore("t", lambda: 1 / 0)
+    assert s.run() is False and s.latest() is None and "ZeroDivisionError" in s.last_error["error"]
+
+def test_market_open():
+    et = lambda *a: EASTERN.localize(dt.datetime(*a))
+    assert market_open(et(2025, 6, 2, 10, 0)) and not market_open(et(2025, 6, 2, 16, 0))
+    assert not market_open(et(2025, 6, 7, 11, 0))              # Saturday
+
+def test_shared_results_single_flight_and_ttl():
+    gate, n = threading.Event(), []
+    def compute():
+        n.append(1); gate.wait(2); return [len(n)]
+    sr, out = SharedResults(ttl_sec=60), []
+    ts = [threading.Thread(target=lambda: out.append(sr.get(("SPY",), compute))) for _ in range(4)]
+    for t in ts: t.start()
+    while not n: pass
+    gate.set()
+    for t in ts: t.join()
+    assert len(n) == 1 and all(v == [1] for v, _ in out)
+    assert sorted(m["source"] for _, m in out).count("computed") == 1
+    assert sr.get(("SPY",), compute)[1]["source"] == "cached" and len(n) == 1
+    sr._done[("SPY",)] = (sr._done[("SPY",)][0] - 120, [1])
+    assert sr.get(("SPY",), compute) == ([2], {"source": "computed", "ageSec": 0.0})
+
+def test_shared_results_errors_are_not_cached():
+    sr = SharedResults(ttl_sec=60)
+    try:
+        sr.get("k", lambda: 1 / 0); assert False
+    except ZeroDivisionError:
+        pass
+    assert sr.get("k", lambda: 7)[0] == 7
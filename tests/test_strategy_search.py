@@ -0,0 +1,47 @@
+import datetime as dt
+import numpy as np
+from engine.options.chain import OptionChain
+from engine.options.pricing import bs_price
+from engine.options.search import search_strategies, pareto_front
+from engine.strategies.options import pick_bull_call_spread
+
+TODAY = dt.date.today()
+
+def _chain(S=100.0, days=(7, 14, 21, 28, 45, 60), strikes=np.arange(70, 131, 1.0), iv=0.25):
+    cm, pm = {}, {}
+    for d in days:
+        e = (TODAY + dt.timedelta(days=d)).isoformat()
+        for call, m in ((True, cm), (False, pm)):
+            px = bs_price(S, strikes, d / 365, iv, call)
+            m[f"{e}:{d}"] = {f"{k}": [{"symbol": f"{'C' if call else 'P'}{d}_{k}", "strikePrice": k, "openInterest": 100,
+                                       "bid": round(max(p - 0.03, 0.01), 2), "ask": round(p + 0.03, 2), "volatility": iv * 100}]
+                             for k, p in zip(strikes, px)}
+    return {"symbol": "XYZ", "underlyingPrice": S, "callExpDateMap": cm, "putExpDateMap": pm}
+
+def test_pareto_front_matches_brute_force():
+    F = np.random.default_rng(1).normal(size=(300, 4))
+    ref = [not any((F[j] >= F[i]).all() and (F[j] > F[i]).any() for j in range(300)) for i in range(300)]
+    assert pareto_front(F).tolist() == ref
+
+def test_search_enumerates_all_kinds_and_prices_consistently():
+    oc = OptionChain(_chain())
+    res = search_strategies(oc, limit=2000, min_net=0, min_rr=0, min_pop=0)
+    assert res["ok"] and res["evaluated"] > 10_000
+    for c in res["candidates"]:
+        ks = [l["strike"] for l in c["legs"]]
+        if c["strategy"].endswith("_spread"):
+            assert abs(c["maxProfit"] + c["maxLoss"] - 100 * abs(ks[0] - ks[1])) < 1e-6
+        assert 0 <= c["pop"] <= 1 and c["maxLoss"] > 0
+    for kind in ("iron_condor", "call_calendar", "put_calendar", "long_straddle"):
+        c = search_strategies(oc, only=(kind,), limit=1)["candidates"][0]
+        lo, hi = c["breakevens"]
+        assert lo < 100 < hi and 0 < c["pop"] < 1
+        if kind == "iron_condor":
+            ks = [l["strike"] for l in c["legs"]]
+            assert ks[0] < ks[1] < ks[2] < ks[3] and c["debit"] < 0
+
+def test_bull_call_spread_uses_search():
+    out = pick_bull_call_spread(_chain(), 100.0, width=5)
+    buy, sell = out["legs"]
+    assert out["strategy"] == "bull_call_spread" and 0 < sell["strikePrice"] - buy["strikePrice"] <= 5
+    assert 0 < out["debit"] < 5 and 0 < out["pop"] < 1
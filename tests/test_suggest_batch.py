@@ -0,0 +1,36 @@
+import threading, time
+import numpy as np
+import pandas as pd
+from engine.features.technical import make_feats, make_feats_panel
+from engine.suggest import suggest_batch
+from test_strategy_search import _chain
+
+class FakeRouter:
+    def __init__(self): self.live, self.peak, self.lock = 0, 0, threading.Lock()
+    def _io(self, sec):
+        with self.lock: self.live += 1; self.peak = max(self.peak, self.live)
+        time.sleep(sec)
+        with self.lock: self.live -= 1
+    def candles(self, symbol, tf, n):
+        self._io(0.05)
+        if symbol == "BAD": raise RuntimeError("boom")
+        c = 100 + np.random.default_rng(len(symbol)).normal(size=60).cumsum() * 0.1
+        return [{"close": x, "high": x + 1, "low": x - 1} for x in c]
+    def options_chain(self, symbol, expiry=None):
+        self._io(0.05); return _chain()
+
+def test_panel_features_match_per_symbol():
+    rng = np.random.default_rng(0)
+    frames = [pd.DataFrame({"symbol": s, "close": c, "high": c + 1, "low": c - 1})
+              for s in "ABC" for c in [100 + rng.normal(size=int(rng.integers(30, 60))).cumsum()]]
+    cols = ["ema9", "ema20", "rsi14", "stoch14", "trend_up"]
+    got = make_feats_panel(pd.concat(frames, ignore_index=True))[cols].to_numpy(float)
+    ref = pd.concat([make_feats(f.reset_index(drop=True)) for f in frames], ignore_index=True)[cols].to_numpy(float)
+    assert np.allclose(got, ref, equal_nan=True)
+
+def test_batch_fetches_concurrently_and_streams_errors():
+    ds = FakeRouter()
+    out = {r["ticker"]: r for r in suggest_batch(["aaa", "BAD", "cc", "AAA"], ds=ds)}
+    assert set(out) == {"AAA", "BAD", "CC"} and ds.peak > 1
+    assert out["BAD"]["error"] == "market_data_error"
+    assert out["AAA"]["strategy"] and out["CC"]["legs"]
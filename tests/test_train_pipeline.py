@@ -0,0 +1,52 @@
+import json
+import numpy as np
+from ai import train as tr
+from ai.engine import AIEngine, FEATURE_KEYS
+from ai.registry import ModelRegistry
+import ai.engine as engine_mod
+
+def _write_runs(tmp_path, runs=3, n=1500):
+    rng = np.random.default_rng(5)
+    for r in range(runs):
+        d = tmp_path / f"run{r}"; d.mkdir()
+        with open(d / "dataset.jsonl", "w") as f:
+            for _ in range(n):
+                rsi = float(rng.uniform(10, 90)); e20 = 100 + float(rng.normal())
+                up = rsi + rng.normal(0, 8) > 50
+                s0 = 100.0; s1 = s0 + (0.5 if up else -0.5)
+                f.write(json.dumps({"S0": s0, "S1": s1, "features": {"ema9": e20 + rng.normal(0, .1), "ema20": e20,
+                                                                      "rsi14": rsi, "ret1": 0.0}}) + "\n")
+        (d / "dataset.csv").write_text("")
+    with open(tmp_path / "run0" / "dataset.jsonl", "a") as f:      # flat/unlabelled bars are skipped
+        f.write(json.dumps({"S0": 1.0, "S1": 1.0, "features": {}}) + "\n" + json.dumps({"S0": 1.0}) + "\n")
+
+def test_running_stats_match_numpy():
+    X = np.random.default_rng(0).normal(3, 2, size=(1000, 4))
+    s = tr.RunningStats(4)
+    for i in range(0, 1000, 137): s.update(X[i:i + 137])
+    np.testing.assert_allclose(s.mean, X.mean(0)); np.testing.assert_allclose(s.std, X.std(0, ddof=1))
+    assert s.n == 1000 and (s.min == X.min(0)).all()
+
+def test_streaming_train_exports_and_activates(tmp_path, monkeypatch):
+    _write_runs(tmp_path)
+    reg = ModelRegistry()
+    monkeypatch.setattr(engine_mod, "REGISTRY", reg)
+    slot = str(tmp_path / "live.joblib")
+    card = tr.train([str(tmp_path / "run*")], out_dir=str(tmp_path / "models"), epochs=3, chunk_rows=400,
+                    registry=reg, slot_path=slot)
+    assert card["rows"] == 4500 and len(card["sources"]) == 3 and card["holdoutAccuracy"] > 0.8
+    assert card["featureStats"]["rsi"]["max"] <= 90 and card["featureStats"]["close"]["std"] == 0.0
+    assert card["activated"]["error"] is None and json.load(open(card["path"][:-7] + ".json"))["version"] == card["version"]
+    st = reg.stats()
+    assert st["slots"][slot]["version"] == card["version"]
+    assert [m["backend"]["backend"] for m in st["models"]] == ["numpy-linear"]
+    eng = AIEngine(slot)
+    acts = eng.propose_batch([{"ema9": 100, "ema20": 100, "rsi14": 85}, {"ema9": 100, "ema20": 100, "rsi14": 15}])
+    assert [a.get("side") for a in acts] == ["CALL", "PUT"]
+
+def test_dataset_files_prefer_training_export(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir(); (tmp_path / name / "dataset.jsonl").write_text("")
+    tr.write_training_rows(str(tmp_path / "a" / tr.TRAIN_FILE), [{"t": 1, "S0": 1.0, "features": {}}], [2.0])
+    assert tr.dataset_files([str(tmp_path)]) == [str(tmp_path / "a" / "train.jsonl"), str(tmp_path / "b" / "dataset.jsonl")]
+    assert [y.tolist() for _, y in tr.iter_chunks([str(tmp_path / "a" / "train.jsonl")])] == [["CALL"]]
@@ -0,0 +1,29 @@
+import os
+from engine.signals.universe import UniverseManager
+
+CFG = """allowlist: [AAPL, msft]
+sector_leaders:
+  tech: [AAPL, NVDA]
+fallback_most_actives: true
+universe_size: 5
+"""
+
+def test_universe_merges_config_and_most_actives(tmp_path):
+    p = tmp_path / "universe.yaml"; p.write_text(CFG)
+    calls = []
+    fetch = lambda n: calls.append(n) or [{"symbol": s, "volume": 1} for s in ("SPY", "NVDA", "QQQ", "IWM", "AMD")]
+    u = UniverseManager(p, fetch_most_actives=fetch)
+    assert u.symbols() == ["AAPL", "MSFT", "NVDA"] and calls == []     # readers never fetch
+    assert u.refresh() == 5 and calls == [5]
+    assert u.symbols() == ["AAPL", "MSFT", "NVDA", "SPY", "QQQ"]
+    m = u.meta("nvda")
+    assert m["sources"] == ["sector_leader", "most_active"] and m["sector"] == "tech" and m["rank"] == 2
+
+def test_universe_rebuilds_on_file_change(tmp_path):
+    p = tmp_path / "universe.yaml"; p.write_text(CFG)
+    u = UniverseManager(p, fetch_most_actives=lambda n: [{"symbol": "SPY"}])
+    u.refresh()
+    assert u.check_config() is False
+    p.write_text(CFG.replace("msft", "LLY").replace("true", "false"))
+    os.utime(p, (1, 1))
+    assert u.check_config() is True and u.symbols() == ["AAPL", "LLY", "NVDA"]
@@ -0,0 +1,41 @@
+import datetime as dt
+import numpy as np
+from engine.options.surface import VolSurface, SurfaceCache
+
+TODAY = dt.date(2030, 1, 1)
+
+def _chain(iv30=0.25, iv90=0.30, skew=0.2):
+    legs = lambda iv0, put: {f"{k}.0": [{"symbol": f"{k}", "strikePrice": k, "bid": 1, "ask": 1.1, "openInterest": 10,
+                                         "volatility": 100*(iv0 + skew*np.log(k/100)**2 - (0.05*np.log(k/100) if put else 0))}]
+                             for k in range(80, 125, 5)}
+    return {"symbol": "XYZ", "underlyingPrice": 100.0,
+            "callExpDateMap": {"2030-01-31:30": legs(iv30, False), "2030-04-01:90": legs(iv90, False)},
+            "putExpDateMap": {"2030-01-31:30": legs(iv30, True), "2030-04-01:90": legs(iv90, True)}}
+
+def test_surface_fits_smile_and_interpolates_tenor():
+    vs = VolSurface("XYZ", today=TODAY)
+    assert vs.fit(_chain()) == 2
+    assert abs(vs.iv(100, 30/365) - 0.25) < 2e-3 and abs(vs.iv(100, 90/365) - 0.30) < 2e-3
+    mid = float(vs.iv(100, 60/365))
+    assert 0.25 < mid < 0.30 and vs.iv([90, 100, 110], 30/365).shape == (3,)
+    assert vs.fit(_chain()) == 0                  # unchanged quotes: nothing refit
+    assert vs.fit(_chain(iv90=0.35)) == 1
+
+def test_surface_cache_ttl():
+    c, calls = SurfaceCache(ttl_sec=60), []
+    load = lambda s: calls.append(s) or _chain()
+    c.get("xyz", load); c.get("XYZ", load)
+    assert calls == ["xyz"] and len(c.peek("XYZ")) >= 1
+
+def test_same_tenor_expiries_share_a_row_and_0dte_query_is_finite():
+    legs = lambda iv0: {f"{k}.0": [{"symbol": f"{k}", "strikePrice": k, "bid": 1, "ask": 1.1, "openInterest": 10,
+                                    "volatility": 100 * iv0}] for k in range(80, 125, 5)}
+    exp = {"2030-01-01:0": legs(0.40), "2030-01-02:1": legs(0.30), "2030-01-31:30": legs(0.25)}
+    vs = VolSurface("XYZ", today=TODAY)
+    assert vs.fit({"symbol": "XYZ", "underlyingPrice": 100.0, "callExpDateMap": exp, "putExpDateMap": exp}) == 3
+    spot, T, W = vs.grid
+    assert T.size == 2 and W.shape == (2, 41) and np.all(np.diff(T) > 0)
+    for t in (0.0, 0.5 / 365, 1 / 365, 10 / 365):
+        v = float(vs.iv(100, t))
+        assert np.isfinite(v) and 0.25 <= v <= 0.40
+    assert abs(float(vs.iv(100, 1 / 365)) - np.sqrt((0.40 ** 2 + 0.30 ** 2) / 2)) < 2e-3